@@ -0,0 +1,34 @@
+"""Worker Threads of the Async Path.
+
+The async path (see lambda_function.lambda_handler_async) still makes blocking calls: the provider
+requests on the pooled requests sessions, and the storage calls of the cache tiers. They run off the
+event loop, on worker threads. The event loop's default executor (used by asyncio.to_thread) only has
+min(32, CPU count + 4) threads, i.e. 6 on a 2-vCPU Lambda, which would cap a batch far below the
+concurrency of the sync path. These calls therefore run on a dedicated pool, sized like the sync path:
+one thread per city fetched concurrently (BATCH_FETCH_MAX_WORKERS), plus the provider fetch pool
+(PROVIDER_FETCH_MAX_WORKERS).
+
+Configuration (environment variables):
+    ASYNC_MAX_WORKERS: Worker threads of the async path (default BATCH_FETCH_MAX_WORKERS +
+        PROVIDER_FETCH_MAX_WORKERS, i.e. 24).
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+ASYNC_MAX_WORKERS = int(os.getenv('ASYNC_MAX_WORKERS', int(os.getenv('BATCH_FETCH_MAX_WORKERS', 16))
+                                  + int(os.getenv('PROVIDER_FETCH_MAX_WORKERS', 8))))
+_executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_WORKERS, thread_name_prefix="async-worker")
+
+
+async def run_blocking(function: Callable, *args) -> Any:
+    """Runs a blocking function on the async path's worker threads, returning (or raising) its outcome.
+
+        Like asyncio.to_thread, the caller's context variables are visible to the function.
+    """
+    call = functools.partial(contextvars.copy_context().run, function, *args)
+    return await asyncio.get_running_loop().run_in_executor(_executor, call)
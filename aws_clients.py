@@ -0,0 +1,76 @@
+"""Lazily Constructed, Shared AWS Clients.
+
+Importing boto3 and building a DynamoDB resource takes a few hundred milliseconds, which
+used to be spent at import time of lambda_function, i.e. on every cold start and in every
+test or tool importing it. boto3 is now only imported, and the DynamoDB resource and tables
+only built, the first time they are needed. They are then cached for the lifetime of the
+process, so warm invocations (and every module of the application) share them.
+
+botocore's default timeouts (60 s connect and read, with retries) exceed any Lambda timeout,
+so a slow DynamoDB call could outlive the invocation: the clients are built with bounded
+DYNAMODB_CONNECT_TIMEOUT (default 1 s) and DYNAMODB_READ_TIMEOUT (default 2 s) timeouts and
+DYNAMODB_MAX_ATTEMPTS (default 3) attempts. Timeouts are a client setting in botocore, not
+a per-call one, so the request deadline (see deadline) cannot cap them further.
+"""
+
+import os
+import threading
+from typing import Any, Dict
+
+DEFAULT_AWS_REGION = 'eu-north-1'
+# The table of the IPs' audit trails (last access time and city history)
+IP_TABLE_NAME = "RequestIPLogs"
+DEFAULT_DYNAMODB_CONNECT_TIMEOUT_SECONDS = 1.0
+DEFAULT_DYNAMODB_READ_TIMEOUT_SECONDS = 2.0
+DEFAULT_DYNAMODB_MAX_ATTEMPTS = 3
+
+_lock = threading.Lock()
+_dynamodb_resource = None
+_dynamodb_tables: Dict[str, Any] = {}
+
+
+def get_aws_region() -> str:
+    """Returns the AWS region clients are built for."""
+    return os.environ.get('AWS_REGION', DEFAULT_AWS_REGION)
+
+
+def get_dynamodb_resource():
+    """Returns the process-wide boto3 DynamoDB resource, importing boto3 and building it on first use."""
+    global _dynamodb_resource
+
+    if _dynamodb_resource is None:
+        # boto3 sessions are not thread safe, so the resource is built under the lock
+        with _lock:
+            if _dynamodb_resource is None:
+                import boto3
+                from botocore.config import Config
+                config = Config(
+                    connect_timeout=float(os.environ.get('DYNAMODB_CONNECT_TIMEOUT',
+                                                         DEFAULT_DYNAMODB_CONNECT_TIMEOUT_SECONDS)),
+                    read_timeout=float(os.environ.get('DYNAMODB_READ_TIMEOUT', DEFAULT_DYNAMODB_READ_TIMEOUT_SECONDS)),
+                    retries={'mode': 'standard',
+                             'max_attempts': int(os.environ.get('DYNAMODB_MAX_ATTEMPTS', DEFAULT_DYNAMODB_MAX_ATTEMPTS))})
+                _dynamodb_resource = boto3.resource('dynamodb', region_name=get_aws_region(), config=config)
+    return _dynamodb_resource
+
+
+def get_dynamodb_table(table_name: str):
+    """Returns the process-wide boto3 Table object of a DynamoDB table, building it on first use."""
+    table = _dynamodb_tables.get(table_name)
+
+    if table is None:
+        dynamodb = get_dynamodb_resource()
+        with _lock:
+            table = _dynamodb_tables.get(table_name)
+            if table is None:
+                table = _dynamodb_tables[table_name] = dynamodb.Table(table_name)
+    return table
+
+
+def reset_clients():
+    """Drops the cached resource and tables, e.g. after changing the region or credentials."""
+    global _dynamodb_resource
+
+    with _lock:
+        _dynamodb_resource = None
+        _dynamodb_tables.clear()
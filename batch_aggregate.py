@@ -0,0 +1,231 @@
+"""Offline Bulk Weather Aggregation Tool.
+
+Pushes a JSONL file of city lookups through fetch_city_weather_data outside of Lambda,
+streaming the results as JSONL and printing a throughput/latency summary.
+
+Each input line is either a JSON object with a 'city' key ({"city": "London"}) or a
+JSON string ("London"). Each output line holds the input line number, the city, and
+either the aggregated weather or the error the lookup failed with. Results are written
+in completion order.
+
+Lookups are handed to the workers in chunks of consecutive lines: a worker first resolves
+the coordinates of its chunk's cities from the geocode cache, fetches the OpenMeteo data of
+those it knows in one batched request, then looks its cities up one after the other.
+
+Input lines are read lazily and at most twice the concurrency level of chunks are in
+flight at any time, while latencies are summarized by a fixed-size histogram, so memory
+use stays flat regardless of the input size. Log lines go to stderr, keeping stdout
+for the results.
+
+Usage:
+    python batch_aggregate.py cities.jsonl [--output results.jsonl] [--concurrency 16] [--chunk-size 10]
+                              [--processes]
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional, TextIO, Tuple
+
+import city_weather_data
+from city_weather_data import CityWeatherDataCityNotFoundError, CityWeatherDataFetchError
+from open_meteo import OpenMeteoResponse
+
+DEFAULT_CHUNK_SIZE = 10
+
+
+class LatencyHistogram:
+    """A constant-memory latency histogram with logarithmic buckets (about 2.5% relative precision).
+
+        Attributes:
+            count: Number of recorded latencies.
+    """
+    MIN_MS = 0.01
+    GROWTH = 1.05
+    NUM_BUCKETS = 512  # covers up to ~0.01ms * 1.05^512, i.e. hours
+
+    def __init__(self):
+        self.count = 0
+        self._buckets = [0] * self.NUM_BUCKETS
+
+    def record(self, latency_ms: float):
+        """Records a latency, in milliseconds."""
+        index = 0 if latency_ms <= self.MIN_MS else int(math.log(latency_ms / self.MIN_MS, self.GROWTH)) + 1
+        self._buckets[min(index, self.NUM_BUCKETS - 1)] += 1
+        self.count += 1
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Returns the upper bound of the bucket holding the given percentile, or None if nothing was recorded."""
+        if self.count == 0:
+            return None
+
+        rank = max(1, math.ceil(self.count * percent / 100))
+        cumulative = 0
+        for index, bucket_count in enumerate(self._buckets):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return self.MIN_MS * self.GROWTH ** index
+        return None
+
+
+def read_city_requests(lines: TextIO) -> Iterator[Tuple[int, Optional[str]]]:
+    """Lazily parses a JSONL stream of city lookups.
+
+        Yields:
+            (line_number, city) pairs, city being None for a line that holds no valid lookup.
+            Blank lines are skipped.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, None
+            continue
+
+        city = request.get('city') if isinstance(request, dict) else request
+        yield line_number, city if isinstance(city, str) and city.strip() else None
+
+
+def aggregate_city(city: str, coordinates: Optional[Tuple[float, float]] = None,
+                   open_meteo_fetch: Optional[Callable[[], OpenMeteoResponse]] = None) -> dict:
+    """Looks a city up, returning a JSON-serializable result record (without the line number).
+
+        Args:
+            city: The city to look up.
+            coordinates: The city's known coordinates, if any.
+            open_meteo_fetch: Returns the city's OpenMeteo response from a batched request, if any.
+    """
+    start = time.perf_counter()
+    try:
+        weather_data = city_weather_data.fetch_city_weather_data(city, coordinates,
+                                                                 open_meteo_fetch=open_meteo_fetch)
+        record = {"city": city, "status": 200, "weather": weather_data.to_dict()}
+    except CityWeatherDataCityNotFoundError:
+        record = {"city": city, "status": 404, "error": "Not found"}
+    except CityWeatherDataFetchError as e:
+        record = {"city": city, "status": 503, "error": "Service Unavailable", "details": repr(e)}
+    except Exception as e:
+        # an unexpected error fails its own line, never the whole run
+        record = {"city": city, "status": 500, "error": "Internal Server Error", "details": repr(e)}
+
+    record["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+
+def aggregate_cities(cities: List[str]) -> List[dict]:
+    """Looks a chunk of cities up, the OpenMeteo data of those with known coordinates in one batched request.
+
+        Returns:
+            The result record of each city (see aggregate_city), in order.
+    """
+    coordinates_by_city = {city: city_weather_data.get_uncached_city_coordinates(city) for city in cities}
+    open_meteo_fetches = city_weather_data.submit_open_meteo_batch(coordinates_by_city)
+    return [aggregate_city(city, coordinates_by_city[city], open_meteo_fetches.get(city)) for city in cities]
+
+
+def redirect_worker_logs_to_stderr():
+    """Process pool initializer, keeping the workers' log lines off the results stream."""
+    sys.stdout = sys.stderr
+
+
+def run(requests: Iterator[Tuple[int, Optional[str]]], output: TextIO, concurrency: int,
+        use_processes: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Looks every request up with bounded concurrency, streaming result records to output.
+
+        Args:
+            requests: (line_number, city) pairs, as yielded by read_city_requests.
+            output: Stream the JSONL result records are written to.
+            concurrency: Number of worker threads (or processes).
+            use_processes: Whether to fan out over processes instead of threads.
+            chunk_size: Number of lookups handed to a worker at once (see aggregate_cities).
+
+        Returns:
+            A summary dictionary: counts, elapsed time, throughput and latency percentiles.
+    """
+    executor = ProcessPoolExecutor(max_workers=concurrency, initializer=redirect_worker_logs_to_stderr) \
+        if use_processes else ThreadPoolExecutor(max_workers=concurrency)
+    max_in_flight = 2 * concurrency
+    histogram = LatencyHistogram()
+    counts = {"total": 0, "ok": 0, "not_found": 0, "failed": 0, "invalid": 0}
+    in_flight: dict[Future, List[int]] = {}
+    chunk: List[Tuple[int, str]] = []
+
+    def write_completed(futures: List[Future]):
+        for future in futures:
+            line_numbers = in_flight.pop(future)
+            try:
+                results = future.result()
+            except Exception as e:
+                # e.g. a worker process that died, or records that could not be sent back from it
+                results = [{"status": 500, "error": "Internal Server Error", "details": repr(e)}] * len(line_numbers)
+            for line_number, result in zip(line_numbers, results):
+                record = {"line": line_number} | result
+                if "latency_ms" in record:
+                    histogram.record(record["latency_ms"])
+                counts[{200: "ok", 404: "not_found"}.get(record["status"], "failed")] += 1
+                output.write(json.dumps(record) + "\n")
+
+    def submit_chunk():
+        if len(in_flight) >= max_in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            write_completed(list(done))
+        in_flight[executor.submit(aggregate_cities, [city for _, city in chunk])] = \
+            [line_number for line_number, _ in chunk]
+        chunk.clear()
+
+    start = time.perf_counter()
+    with executor:
+        for line_number, city in requests:
+            counts["total"] += 1
+            if city is None:
+                counts["invalid"] += 1
+                output.write(json.dumps({"line": line_number, "status": 400, "error": "Invalid request"}) + "\n")
+                continue
+
+            chunk.append((line_number, city))
+            if len(chunk) >= chunk_size:
+                submit_chunk()
+
+        if chunk:
+            submit_chunk()
+        write_completed(list(wait(in_flight).done))
+    elapsed = time.perf_counter() - start
+
+    return counts | {
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round((counts["total"] - counts["invalid"]) / elapsed, 2) if elapsed else None,
+        "latency_ms": {f"p{percent}": round(histogram.percentile(percent), 3) if histogram.count else None
+                       for percent in (50, 95, 99)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of city lookups, '-' for stdin.")
+    parser.add_argument("--output", help="JSONL file the results are written to (default: stdout).")
+    parser.add_argument("--concurrency", type=int, default=16, help="Number of concurrent lookups.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Lookups handed to a worker at once, their Open-Meteo data in one batched request.")
+    parser.add_argument("--processes", action="store_true", help="Fan out over processes instead of threads.")
+    args = parser.parse_args()
+
+    results_stream = sys.stdout
+    with contextlib.ExitStack() as stack:
+        lines = sys.stdin if args.input == "-" else stack.enter_context(open(args.input, encoding="utf-8"))
+        output = stack.enter_context(open(args.output, "w", encoding="utf-8")) if args.output else results_stream
+        stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+
+        summary = run(read_city_requests(lines), output, args.concurrency, args.processes, args.chunk_size)
+
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
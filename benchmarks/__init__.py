@@ -0,0 +1,5 @@
+"""Benchmarks for the Weather Aggregator.
+
+Each benchmark is a standalone script run from the repository root, e.g.:
+    python -m benchmarks.bench_http_session
+"""
@@ -0,0 +1,80 @@
+"""Concurrency of a batch fetched through the sync path versus the async path.
+
+A batch of cities, all missing from the caches, is fetched from a local stub server with a
+configurable latency, through city_weather_data.fetch_city_weather_data_batch (threads) and
+fetch_city_weather_data_batch_async (event loop plus the async_workers pool), and then through
+the async path again with the pool cut down to the size of the event loop's default executor
+on a 2-vCPU Lambda, as when the async clients used asyncio.to_thread. Each run reports its
+wall time and the peak number of provider requests in flight at the stub server.
+
+Usage:
+    python -m benchmarks.bench_async_concurrency [--cities 64] [--latency-ms 100] [--default-workers 6]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import async_workers
+import city_weather_data
+import geocode_cache
+import open_meteo
+from benchmarks.stubs import StubProviderServer
+
+
+def run_batch(server: StubProviderServer, city_names: list, fetch_batch) -> dict:
+    """Fetches a cold batch, returning its wall time and the provider requests it made."""
+    city_weather_data.clear_city_weather_cache()
+    geocode_cache.get_geocode_cache().clear()
+    open_meteo.clear_open_meteo_cache()
+    server.peak_in_flight = 0
+    request_count = server.request_count
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = fetch_batch(city_names)
+        elapsed = time.perf_counter() - start
+
+    assert all(isinstance(result, city_weather_data.CityWeatherData) for result in results.values()), results
+    return {"wall_ms": round(elapsed * 1000, 1), "requests": server.request_count - request_count,
+            "peak_in_flight": server.peak_in_flight}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=64, help="Cities of the batch.")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Artificial stub server latency.")
+    parser.add_argument("--default-workers", type=int, default=6,
+                        help="Size of the event loop's default executor emulated (6 on a 2-vCPU Lambda).")
+    args = parser.parse_args()
+
+    city_names = [f"City{i}" for i in range(args.cities)]
+
+    def fetch_async(names):
+        return asyncio.run(city_weather_data.fetch_city_weather_data_batch_async(names))
+
+    with StubProviderServer(latency_seconds=args.latency_ms / 1000) as server:
+        os.environ["WEATHER_API_BASE_URL"] = server.base_url
+        os.environ["OPEN_METEO_BASE_URL"] = server.base_url
+
+        run_batch(server, city_names[:4], city_weather_data.fetch_city_weather_data_batch)  # warm-up
+        results = {
+            "sync": run_batch(server, city_names, city_weather_data.fetch_city_weather_data_batch),
+            "async": run_batch(server, city_names, fetch_async),
+        }
+        with patch.object(async_workers, "_executor", ThreadPoolExecutor(max_workers=args.default_workers)):
+            results[f"async ({args.default_workers} threads)"] = run_batch(server, city_names, fetch_async)
+
+    for label, result in results.items():
+        print(f"{label:>18}: wall={result['wall_ms']:.1f}ms requests={result['requests']} "
+              f"peak_in_flight={result['peak_in_flight']}")
+    print(f"async/sync peak concurrency: {results['async']['peak_in_flight'] / results['sync']['peak_in_flight']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
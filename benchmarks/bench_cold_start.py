@@ -0,0 +1,111 @@
+"""Cold start benchmark of the handler module.
+
+Each run starts a fresh interpreter, which measures:
+    - import_ms: the time to import lambda_function,
+    - dynamodb_init_ms: the time to build the (real, but unused) boto3 DynamoDB resource and
+      RequestIPLogs table, now deferred from import time to the first request,
+    - first_invocation_ms / second_invocation_ms: the latency of the first two handler invocations,
+      against stub providers and an in-memory RequestIPLogs table (so excluding dynamodb_init_ms).
+
+The report (JSON) gives the median and max of each measure over the runs, plus the slowest
+top-level imports of one run (from python -X importtime), to audit the import graph.
+
+Usage:
+    python -m benchmarks.bench_cold_start [--runs 10] [--output report.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.bench_lambda_handler import get_commit
+from benchmarks.stubs import StubProviderServer
+
+MEASURES = ("import_ms", "dynamodb_init_ms", "first_invocation_ms", "second_invocation_ms")
+
+
+def measure_in_this_process() -> dict:
+    """Measures the cold start of the handler module. Must run in a fresh interpreter."""
+    import contextlib
+    import io
+    import time
+    from unittest.mock import MagicMock, patch
+
+    start = time.perf_counter()
+    import lambda_function
+    import_ms = (time.perf_counter() - start) * 1000
+
+    import aws_clients
+    from benchmarks.stubs import InMemoryIpTable
+
+    start = time.perf_counter()
+    aws_clients.get_dynamodb_table(lambda_function.IP_TABLE_NAME)
+    dynamodb_init_ms = (time.perf_counter() - start) * 1000
+
+    invocation_ms = []
+    context = MagicMock(aws_request_id="bench", **{"get_remaining_time_in_millis.return_value": 30_000})
+    with patch.object(lambda_function, 'get_ip_table', return_value=InMemoryIpTable()), \
+            contextlib.redirect_stdout(io.StringIO()):
+        for city in ("London", "Paris"):
+            event = {'queryStringParameters': {'city': city}, 'requestContext': {'http': {'sourceIp': "10.0.0.1"}}}
+            start = time.perf_counter()
+            lambda_function.lambda_handler(event, context)
+            invocation_ms.append((time.perf_counter() - start) * 1000)
+
+    return dict(zip(MEASURES, (import_ms, dynamodb_init_ms, *invocation_ms)))
+
+
+def get_slowest_imports(env: dict, count: int = 10) -> list:
+    """Returns the slowest top-level imports of lambda_function, as (module, cumulative milliseconds)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import lambda_function"],
+                            capture_output=True, text=True, check=True, env=env)
+    imports = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nesting is shown by indentation
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            imports.append((name.strip(), round(int(cumulative) / 1000, 2)))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:count]
+
+
+def main():
+    if "--child" in sys.argv:
+        print(json.dumps(measure_in_this_process()))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Number of fresh interpreters measured.")
+    parser.add_argument("--output", help="File the JSON report is written to (default: stdout).")
+    args = parser.parse_args()
+
+    with StubProviderServer() as server:
+        env = os.environ | {"WEATHER_API_BASE_URL": server.base_url, "OPEN_METEO_BASE_URL": server.base_url}
+        runs = [json.loads(subprocess.run([sys.executable, "-m", "benchmarks.bench_cold_start", "--child"],
+                                          capture_output=True, text=True, check=True, env=env).stdout)
+                for _ in range(args.runs)]
+        slowest_imports = get_slowest_imports(env)
+
+    report = json.dumps({
+        "benchmark": "cold_start",
+        "commit": get_commit(),
+        "parameters": {"runs": args.runs, "python": sys.version.split()[0]},
+        "results": {measure: {"median": round(statistics.median(run[measure] for run in runs), 3),
+                              "max": round(max(run[measure] for run in runs), 3)} for measure in MEASURES},
+        "slowest_imports_ms": slowest_imports,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
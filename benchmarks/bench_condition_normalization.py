@@ -0,0 +1,110 @@
+"""Microbenchmark of condition-text normalization over a realistic corpus.
+
+Compares the previous implementation (seven str.replace passes followed by a cascade
+of substring checks, on every call) with the memoized keyword-scan engine, and checks
+that both agree on every text of the corpus.
+
+The corpus mimics production traffic: mostly common WeatherAPI texts, some rarer ones,
+a few casing/whitespace variants and the Open-Meteo code descriptions.
+
+Usage:
+    python -m benchmarks.bench_condition_normalization [--size 100000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import time
+
+import city_weather_data
+import weather_api
+from city_weather_data import WeatherCondition
+
+COMMON_TEXTS = ("Sunny", "Clear", "Partly cloudy", "Cloudy", "Overcast", "Light rain", "Patchy rain nearby",
+                "Mist", "Moderate rain", "Light drizzle")
+
+
+def legacy_convert_weather_condition_text_to_weather_condition(weather_condition_text: str) -> WeatherCondition:
+    """The normalization as it was implemented before the keyword-scan engine."""
+    text = (weather_condition_text.lower().replace("shower", "").replace("at times", "")
+            .replace("slight", "light").replace("fall", "").replace("partly", "partially")
+            .replace("patchy", "light").replace("violent", "heavy").strip())
+
+    if "clear" in text or "sunny" in text:
+        return WeatherCondition.CLEAR
+    elif "cloudy" in text:
+        return WeatherCondition.PARTIALLY_CLOUDY if "partially" in text else WeatherCondition.CLOUDY
+    elif "drizzle" in text:
+        return WeatherCondition.DRIZZLE
+    elif "rain" in text:
+        if "light" in text:
+            return WeatherCondition.LIGHT_RAIN
+        elif "moderate" in text:
+            return WeatherCondition.MODERATE_RAIN
+        elif "heavy" in text:
+            return WeatherCondition.HEAVY_RAIN
+        return WeatherCondition.MODERATE_RAIN
+    elif "snow" in text:
+        if "light" in text:
+            return WeatherCondition.LIGHT_SNOW
+        elif "moderate" in text:
+            return WeatherCondition.MODERATE_SNOW
+        elif "heavy" in text:
+            return WeatherCondition.HEAVY_SNOW
+        return WeatherCondition.MODERATE_SNOW
+    elif "mist" in text:
+        return WeatherCondition.MIST
+    elif "fog" in text:
+        return WeatherCondition.FOG
+    elif "overcast" in text:
+        return WeatherCondition.OVERCAST
+    return WeatherCondition.UNRECOGNIZED
+
+
+def build_corpus(size: int) -> list:
+    """Builds a list of size condition texts, weighted towards the most common ones."""
+    codes_path = os.path.join(os.path.dirname(os.path.abspath(city_weather_data.__file__)),
+                              city_weather_data.OPEN_METEO_WEATHER_CODES_FILENAME)
+    with open(codes_path, newline="") as f:
+        open_meteo_texts = [row["description"] for row in csv.DictReader(f)]
+
+    variants = [text.upper() for text in COMMON_TEXTS] + [f"{text} " for text in COMMON_TEXTS]
+    population = list(COMMON_TEXTS) + list(weather_api.WEATHER_API_CONDITION_TEXTS) + open_meteo_texts + variants
+    weights = [50] * len(COMMON_TEXTS) + [5] * len(weather_api.WEATHER_API_CONDITION_TEXTS) \
+        + [5] * len(open_meteo_texts) + [1] * len(variants)
+
+    rng = random.Random(42)
+    return rng.choices(population, weights=weights, k=size)
+
+
+def measure(convert, corpus: list) -> float:
+    """Returns the mean time per normalization, in nanoseconds."""
+    start = time.perf_counter()
+    for text in corpus:
+        convert(text)
+    return (time.perf_counter() - start) / len(corpus) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="Number of condition texts to normalize.")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size)
+    for text in set(corpus):
+        assert (city_weather_data.convert_weather_condition_text_to_weather_condition(text)
+                == legacy_convert_weather_condition_text_to_weather_condition(text)), text
+
+    legacy = measure(legacy_convert_weather_condition_text_to_weather_condition, corpus)
+    scan = measure(city_weather_data.scan_weather_condition_text, corpus)
+    memoized = measure(city_weather_data.convert_weather_condition_text_to_weather_condition, corpus)
+
+    print(f"corpus: {len(corpus)} texts, {len(set(corpus))} distinct")
+    print(f"  legacy replace chain: {legacy:8.1f} ns/text")
+    print(f"  keyword scan only:    {scan:8.1f} ns/text")
+    print(f"  memoized engine:      {memoized:8.1f} ns/text ({legacy / memoized:.1f}x faster than legacy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Per-request latency of bare requests.get calls versus the pooled provider sessions.
+
+Both provider fetch functions are pointed at a local stub server. The 'bare' run
+opens a new connection for every request (the previous behaviour), while the
+'pooled' run goes through http_session, as a warm Lambda invocation does.
+
+Usage:
+    python -m benchmarks.bench_http_session [--requests 200] [--latency-ms 0]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from unittest.mock import patch
+
+import requests
+
+import http_session
+import open_meteo
+import weather_api
+from benchmarks.stubs import StubProviderServer
+
+
+def run_provider_calls(num_requests: int) -> list:
+    """Calls both providers num_requests times each, returning per-call latencies in milliseconds."""
+    latencies = []
+    for i in range(num_requests):
+        start = time.perf_counter()
+        weather_api.fetch_data_weather_api(f"City{i % 10}")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        open_meteo.fetch_data_open_meteo(32.08, 34.78)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list):
+    """Prints a one-line latency summary."""
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:>7}: mean={statistics.mean(latencies):.3f}ms "
+          f"p50={statistics.median(latencies):.3f}ms p95={p95:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per provider and mode.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial stub server latency.")
+    args = parser.parse_args()
+
+    with StubProviderServer(latency_seconds=args.latency_ms / 1000) as server:
+        os.environ["WEATHER_API_BASE_URL"] = server.base_url
+        os.environ["OPEN_METEO_BASE_URL"] = server.base_url
+
+        # emulate the previous transport: a fresh connection for every request
+        bare_session = type("BareSession", (), {"get": staticmethod(requests.get)})()
+        with patch.object(http_session, "get_session", return_value=bare_session):
+            run_provider_calls(5)  # warm-up
+            bare = run_provider_calls(args.requests)
+
+        http_session.close_sessions()
+        run_provider_calls(5)  # warm-up, as on a warm Lambda container
+        pooled = run_provider_calls(args.requests)
+
+    report("bare", bare)
+    report("pooled", pooled)
+    print(f"saved per request (mean): {statistics.mean(bare) - statistics.mean(pooled):.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Handler latency with the synchronous audit trail write versus write-behind mode.
+
+The handler runs against an in-memory RequestIPLogs table with a configurable
+latency, emulating DynamoDB, while the weather data layer is stubbed out to
+isolate the cost of the audit trail. Requests come from a fixed pool of client IPs.
+
+Usage:
+    python -m benchmarks.bench_ip_audit_write_behind [--requests 500] [--db-latency-ms 8] [--ips 20]
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import time
+from unittest.mock import MagicMock, patch
+
+import lambda_function
+from benchmarks.stubs import InMemoryIpTable
+from city_weather_data import CityWeatherData, WeatherCondition
+from ip_audit_buffer import IpAuditWriteBuffer
+
+
+def run_requests(num_requests: int, num_ips: int) -> list:
+    """Invokes the handler num_requests times, returning per-request latencies in milliseconds."""
+    context = MagicMock(aws_request_id="bench", **{"get_remaining_time_in_millis.return_value": 30_000})
+    latencies = []
+    for i in range(num_requests):
+        event = {'queryStringParameters': {'city': f"City{i % 7}"},
+                 'requestContext': {'http': {'sourceIp': f"10.0.0.{i % num_ips}"}}}
+        with contextlib.redirect_stdout(io.StringIO()):  # silence the handler's request logs
+            start = time.perf_counter()
+            response = lambda_function.lambda_handler(event, context)
+            latencies.append((time.perf_counter() - start) * 1000)
+        assert response['statusCode'] == 200, response
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Handler invocations per mode.")
+    parser.add_argument("--db-latency-ms", type=float, default=8.0, help="Emulated DynamoDB call latency.")
+    parser.add_argument("--ips", type=int, default=20, help="Number of distinct client IPs.")
+    args = parser.parse_args()
+
+    weather_data = CityWeatherData(32.0, 34.0, int(time.time()), 20.0, WeatherCondition.CLEAR)
+    results = {}
+
+    with patch('city_weather_data.fetch_city_weather_data', return_value=weather_data):
+        table = InMemoryIpTable(args.db_latency_ms / 1000)
+        with patch.object(lambda_function, 'get_ip_table', return_value=table):
+            results['synchronous'] = (run_requests(args.requests, args.ips), dict(table.calls))
+
+        table = InMemoryIpTable(args.db_latency_ms / 1000)
+        buffer = IpAuditWriteBuffer(lambda_function.write_buffered_ip_fields_to_db)
+        with patch.object(lambda_function, 'get_ip_table', return_value=table), \
+                patch.object(lambda_function, 'ip_audit_write_buffer', buffer):
+            latencies = run_requests(args.requests, args.ips)
+            with contextlib.redirect_stdout(io.StringIO()):
+                buffer.flush()
+            results['write-behind'] = (latencies, dict(table.calls))
+
+    for mode, (latencies, calls) in results.items():
+        print(f"{mode:>12}: mean={statistics.mean(latencies):.3f}ms p50={statistics.median(latencies):.3f}ms "
+              f"max={max(latencies):.3f}ms DynamoDB calls={calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""End-to-end latency benchmark of lambda_handler against local stand-ins.
+
+The real handler runs against a stub WeatherAPI server, a stub Open-Meteo server and an
+in-memory RequestIPLogs table, each with a configurable latency, through these scenarios:
+    - cold-cache: every request asks for a city never seen before (no cached coordinates or results),
+    - warm-cache: every request asks for the same, already cached, city,
+    - error-city-not-found: every request asks for a city WeatherAPI does not know (404),
+    - error-provider-down: WeatherAPI answers 503 to everything (503, including the transport's retries).
+
+The report is a JSON document (commit, parameters and, per scenario, latency percentiles and
+throughput), so results can be stored and compared across commits.
+
+Usage:
+    python -m benchmarks.bench_lambda_handler [--requests 200] [--error-requests 20] [--concurrency 1]
+        [--weather-api-latency-ms 40] [--open-meteo-latency-ms 30] [--db-latency-ms 8] [--output report.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import statistics
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from unittest.mock import MagicMock, patch
+
+from benchmarks.stubs import NOT_FOUND_CITY, InMemoryIpTable, StubProviderServer
+
+
+def get_commit() -> Optional[str]:
+    """Returns the current git commit hash, or None outside of a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """Returns the nearest-rank percentile of a sorted, non-empty list."""
+    return sorted_values[max(1, math.ceil(len(sorted_values) * percent / 100)) - 1]
+
+
+def summarize(latencies_ms: list, elapsed_seconds: float, unexpected_statuses: int) -> dict:
+    """Summarizes a scenario's latencies (in milliseconds) and throughput."""
+    latencies_ms = sorted(latencies_ms)
+    return {
+        "requests": len(latencies_ms),
+        "unexpected_statuses": unexpected_statuses,
+        "mean_ms": round(statistics.mean(latencies_ms), 3),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "throughput_rps": round(len(latencies_ms) / elapsed_seconds, 2),
+    }
+
+
+def run_scenario(lambda_function, city_for_request: Callable[[int], str], expected_status: int,
+                 num_requests: int, concurrency: int) -> dict:
+    """Invokes the handler num_requests times with the given concurrency, returning the scenario summary."""
+    def invoke(i: int):
+        event = {'queryStringParameters': {'city': city_for_request(i)},
+                 'requestContext': {'http': {'sourceIp': f"10.0.{i % 256}.1"}}}
+        context = MagicMock(aws_request_id=str(uuid.uuid4()), **{"get_remaining_time_in_millis.return_value": 30_000})
+        start = time.perf_counter()
+        response = lambda_function.lambda_handler(event, context)
+        return (time.perf_counter() - start) * 1000, response['statusCode']
+
+    with contextlib.redirect_stdout(io.StringIO()):  # silence the handler's request logs
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(invoke, range(num_requests)))
+        elapsed = time.perf_counter() - start
+
+    return summarize([latency for latency, _ in results], elapsed,
+                     sum(1 for _, status in results if status != expected_status))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per cache scenario.")
+    parser.add_argument("--error-requests", type=int, default=20, help="Requests per error scenario.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent handler invocations.")
+    parser.add_argument("--weather-api-latency-ms", type=float, default=40.0)
+    parser.add_argument("--open-meteo-latency-ms", type=float, default=30.0)
+    parser.add_argument("--db-latency-ms", type=float, default=8.0)
+    parser.add_argument("--output", help="File the JSON report is written to (default: stdout).")
+    args = parser.parse_args()
+
+    weather_api_server = StubProviderServer(args.weather_api_latency_ms / 1000).start()
+    open_meteo_server = StubProviderServer(args.open_meteo_latency_ms / 1000).start()
+    os.environ["WEATHER_API_BASE_URL"] = weather_api_server.base_url
+    os.environ["OPEN_METEO_BASE_URL"] = open_meteo_server.base_url
+
+    import lambda_function
+    run_id = uuid.uuid4().hex[:8]
+    scenarios = {}
+
+    try:
+        with patch.object(lambda_function, 'get_ip_table', return_value=InMemoryIpTable(args.db_latency_ms / 1000)):
+            scenarios["cold-cache"] = run_scenario(lambda_function, lambda i: f"Cold {run_id} {i}", 200,
+                                                   args.requests, args.concurrency)
+
+            run_scenario(lambda_function, lambda i: "Warm City", 200, 1, 1)  # warm the caches up
+            scenarios["warm-cache"] = run_scenario(lambda_function, lambda i: "Warm City", 200,
+                                                   args.requests, args.concurrency)
+
+            scenarios["error-city-not-found"] = run_scenario(lambda_function, lambda i: NOT_FOUND_CITY, 404,
+                                                             args.error_requests, args.concurrency)
+
+            weather_api_server.fail_status = 503
+            scenarios["error-provider-down"] = run_scenario(lambda_function, lambda i: f"Down {run_id} {i}", 503,
+                                                            args.error_requests, args.concurrency)
+    finally:
+        weather_api_server.stop()
+        open_meteo_server.stop()
+
+    report = json.dumps({
+        "benchmark": "lambda_handler",
+        "commit": get_commit(),
+        "timestamp": int(time.time()),
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "scenarios": scenarios,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
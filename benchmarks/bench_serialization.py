@@ -0,0 +1,88 @@
+"""Microbenchmark of response body serialization.
+
+Compares, for a single-city body and a batch body, the previous double encoding (the weather
+data encoded by CityWeatherData.to_json(), the resulting string embedded and escaped in a
+second json.dumps) with the single-pass encoding of get_response, using the standard library
+json module and, when it is installed, orjson.
+
+Usage:
+    python -m benchmarks.bench_serialization [--iterations 20000] [--batch-size 200]
+"""
+
+import argparse
+import json
+import time
+from unittest.mock import patch
+
+import json_codec
+from city_weather_data import CityWeatherData, WeatherCondition
+
+RECENT_CITIES = [f"City {i}" for i in range(20)]
+
+
+def legacy_single_body(weather_data: CityWeatherData) -> str:
+    """A single-city body as built before: the weather encoded, then embedded as a string in json.dumps."""
+    return json.dumps({"requestId": "bench", "city": "London", "weather": json.dumps(weather_data.to_dict()),
+                       "last_access": "2023-11-14T22:13:20+00:00", "recent_cities": RECENT_CITIES})
+
+
+def single_pass_single_body(weather_data: CityWeatherData) -> str:
+    """A single-city body as built by get_response: the weather converted to a dict, then encoded once."""
+    return json_codec.dumps({"requestId": "bench", "city": "London", "weather": weather_data.to_dict(),
+                             "last_access": "2023-11-14T22:13:20+00:00", "recent_cities": RECENT_CITIES})
+
+
+def legacy_batch_body(results: dict) -> str:
+    """A batch body as built before."""
+    return json.dumps({"requestId": "bench", "results": {city: json.dumps(data.to_dict())
+                                                         for city, data in results.items()},
+                       "errors": {}, "recent_cities": RECENT_CITIES})
+
+
+def single_pass_batch_body(results: dict) -> str:
+    """A batch body as built by handle_batch_results."""
+    return json_codec.dumps({"requestId": "bench", "results": {city: data.to_dict() for city, data in results.items()},
+                             "errors": {}, "recent_cities": RECENT_CITIES})
+
+
+def measure(build_body, arg, iterations: int) -> float:
+    """Returns the mean time, in microseconds, to build a body."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build_body(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000, help="Single-city bodies built per measure.")
+    parser.add_argument("--batch-size", type=int, default=200, help="Cities of the batch body.")
+    args = parser.parse_args()
+
+    weather_data = CityWeatherData(51.52, -0.11, 1_700_000_000, 12.345,
+                                   [WeatherCondition.CLOUDY, WeatherCondition.LIGHT_RAIN])
+    batch_results = {f"City {i}": weather_data for i in range(args.batch_size)}
+
+    scenarios = (
+        ("single city", legacy_single_body, single_pass_single_body, weather_data, args.iterations),
+        (f"batch of {args.batch_size}", legacy_batch_body, single_pass_batch_body, batch_results,
+         max(1, args.iterations // args.batch_size)),
+    )
+
+    for name, legacy, single_pass, arg, iterations in scenarios:
+        legacy_us = measure(legacy, arg, iterations)
+        with patch('json_codec.orjson', None):
+            stdlib_us = measure(single_pass, arg, iterations)
+
+        print(f"{name} body:")
+        print(f"  double encoding (json): {legacy_us:9.2f} us")
+        print(f"  single pass (json):     {stdlib_us:9.2f} us ({legacy_us / stdlib_us:.2f}x faster)")
+        if json_codec.orjson is not None:
+            orjson_us = measure(single_pass, arg, iterations)
+            print(f"  single pass (orjson):   {orjson_us:9.2f} us ({legacy_us / orjson_us:.2f}x faster)")
+        else:
+            print("  single pass (orjson):   not installed")
+
+
+if __name__ == "__main__":
+    main()
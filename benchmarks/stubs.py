@@ -0,0 +1,202 @@
+"""Local stand-ins for the external services used by the Weather Aggregator.
+
+The stub server answers both the WeatherAPI ('/current.json') and the Open-Meteo
+('/forecast', including multi-location requests) endpoints with canned, always-fresh payloads, after an optional
+artificial latency. It speaks HTTP/1.1 so that keep-alive connections can be reused.
+
+The in-memory table emulates the RequestIPLogs DynamoDB table, for the calls the
+service makes, after an optional artificial latency.
+"""
+
+import copy
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+NOT_FOUND_CITY = "Atlantis"
+
+
+class StubProviderServer:
+    """A threaded local HTTP server emulating the WeatherAPI and Open-Meteo endpoints.
+
+        Attributes:
+            latency_seconds: Artificial delay applied before answering every request.
+            fail_status: When set, every request is answered with this HTTP status (e.g. 503).
+            request_count: Number of requests served so far.
+            peak_in_flight: Highest number of requests being served at the same time so far.
+    """
+    def __init__(self, latency_seconds: float = 0.0, port: int = 0):
+        """Binds the server to a local port (an ephemeral one by default) without starting it.
+
+            Args:
+                latency_seconds: Artificial delay applied before answering every request.
+                port: Port to bind to, 0 for an ephemeral port.
+        """
+        self.latency_seconds = latency_seconds
+        self.fail_status = None
+        self.request_count = 0
+        self.peak_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """The base URL the provider modules should be pointed at."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubProviderServer":
+        """Starts serving in a background daemon thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving and releases the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count_request(self):
+        with self._lock:
+            self.request_count += 1
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+
+    def _end_request(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub._count_request()
+                try:
+                    self.answer()
+                finally:
+                    stub._end_request()
+
+            def answer(self):
+                if stub.latency_seconds:
+                    time.sleep(stub.latency_seconds)
+
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if stub.fail_status:
+                    status, payload = stub.fail_status, {"error": {"code": 9999, "message": "stub failure"}}
+                elif url.path.endswith("/current.json"):
+                    status, payload = weather_api_payload(params.get("q", ""))
+                elif url.path.endswith("/forecast"):
+                    status, payload = open_meteo_payload(params.get("latitude", "0"), params.get("longitude", "0"))
+                else:
+                    status, payload = 404, {"error": "not found"}
+
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def weather_api_payload(city_name: str):
+    """Builds a (status, payload) pair shaped like a WeatherAPI '/current.json' answer."""
+    if city_name == NOT_FOUND_CITY:
+        return 400, {"error": {"code": 1006, "message": "No matching location found."}}
+
+    # derive stable, distinct coordinates from the city name
+    seed = sum(ord(c) for c in city_name)
+    return 200, {
+        "location": {"name": city_name, "country": "Stubland",
+                     "lat": round(-60 + seed % 120 + 0.25, 2), "lon": round(-170 + seed % 340 + 0.5, 2)},
+        "current": {"last_updated_epoch": int(time.time()) - 60, "temp_c": 20.0,
+                    "condition": {"text": "Partly cloudy", "code": 1003}}
+    }
+
+
+def open_meteo_payload(latitude: str, longitude: str):
+    """Builds a (status, payload) pair shaped like an Open-Meteo '/forecast' answer.
+
+        Comma-separated coordinates request several locations, answered with a list of one result per location.
+    """
+    current_weather = {"time": time.strftime("%Y-%m-%dT%H:%M", time.gmtime(time.time() - 60)),
+                       "temperature": 22.0, "weathercode": 2}
+    locations = [{"latitude": float(location_latitude), "longitude": float(location_longitude),
+                  "current_weather": current_weather}
+                 for location_latitude, location_longitude in zip(latitude.split(","), longitude.split(","))]
+    return 200, locations if "," in latitude else locations[0]
+
+
+class InMemoryIpTable:
+    """An in-memory stand-in of the RequestIPLogs DynamoDB table (boto3 Table API subset).
+
+        Attributes:
+            latency_seconds: Artificial delay applied to every call.
+            items: The stored items, keyed by IP.
+            calls: Number of calls per operation name.
+    """
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.items = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _call(self, operation: str):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+    def get_item(self, Key, ProjectionExpression=None, **kwargs):
+        self._call("get_item")
+        with self._lock:
+            item = self.items.get(Key['ip'])
+            return {'Item': copy.deepcopy(item)} if item is not None else {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues, ReturnValues="NONE",
+                    ConditionExpression=None, **kwargs):
+        self._call("update_item")
+        values = ExpressionAttributeValues
+
+        with self._lock:
+            item = self.items.setdefault(Key['ip'], {'ip': Key['ip']})
+            previous = copy.deepcopy(item)
+
+            if UpdateExpression.startswith("REMOVE"):
+                if len(item.get('recent_cities', [])) != values[':n']:
+                    from botocore.exceptions import ClientError
+                    raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+                removed = {int(index) for index in re.findall(r"recent_cities\[(\d+)]", UpdateExpression)}
+                item['recent_cities'] = [city for i, city in enumerate(item['recent_cities']) if i not in removed]
+                return {}
+
+            item['LastAccessTimestamp'] = values[':t']
+            item['recent_cities'] = list(values[':c']) + item.get('recent_cities', [])
+
+        if ReturnValues == "UPDATED_OLD":
+            attributes = {name: previous[name] for name in ('LastAccessTimestamp', 'recent_cities')
+                          if name in previous}
+            return {'Attributes': attributes} if attributes else {}
+        return {}
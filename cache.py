@@ -0,0 +1,111 @@
+"""In-Process Caching Utilities.
+
+This module provides a small, thread-safe, bounded LRU cache used by the various
+in-process cache tiers of the application. Entries live for the lifetime of the
+process, i.e. across warm Lambda invocations of the same container, unless they
+are given an expiry time.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_ABSENT = object()
+
+
+class LRUCache:
+    """A thread-safe, size-bounded mapping that evicts the least recently used entry when full.
+
+        Entries may carry an absolute expiry time (Unix epoch seconds), after which they are
+        treated as absent and dropped on access.
+
+        Attributes:
+            max_size: The maximum number of entries kept in the cache.
+            hits: Number of lookups that found a live entry.
+            misses: Number of lookups that found no entry, or an expired one.
+            evictions: Number of live entries dropped to make room for new ones.
+            expirations: Number of entries dropped because they expired.
+    """
+    def __init__(self, max_size: int):
+        """Initializes an empty cache.
+
+            Args:
+                max_size: The maximum number of entries kept in the cache (must be positive).
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        """Returns the live value cached under key (marking it as most recently used), or default if absent."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and time.time() >= entry[1]:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def peek(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        """Returns the live value cached under key, or default if absent, without marking it as used nor
+            counting the lookup.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and time.time() >= entry[1]):
+                return default
+            return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Returns whether a live entry is cached under key, without marking it as used nor counting the lookup."""
+        return self.peek(key, _ABSENT) is not _ABSENT
+
+    def put(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        """Caches value under key, evicting the least recently used entry if the cache is full.
+
+            Args:
+                key: The cache key.
+                value: The value to cache.
+                expires_at: Unix epoch time after which the entry expires, or None to never expire.
+        """
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes every entry from the cache. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns a snapshot of the cache size and counters, e.g. for logging."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
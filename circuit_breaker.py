@@ -0,0 +1,164 @@
+"""Per-Provider Circuit Breakers.
+
+A circuit breaker stops calling a provider that keeps failing, so that requests fail
+fast instead of each one waiting for connect/read timeouts (and retries) while the
+provider is down:
+    - CLOSED: calls go through. After PROVIDER_CIRCUIT_FAILURE_THRESHOLD consecutive
+      failures, the circuit opens.
+    - OPEN: calls are rejected immediately, for PROVIDER_CIRCUIT_RECOVERY_SECONDS.
+    - HALF_OPEN: a single probe call goes through; its success closes the circuit,
+      its failure opens it again.
+
+Only provider health counts as failure (timeouts, connection errors, 5xx responses):
+a 4xx answer, such as WeatherAPI's 'city not found', is a healthy provider.
+Breakers live at module level, i.e. per process (per Lambda container).
+"""
+
+import os
+import threading
+import time
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_SECONDS = 30.0
+
+
+class CircuitState(Enum):
+    """The states of a circuit breaker."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised in place of calling a provider whose circuit is open.
+
+        Attributes:
+            provider_name: The provider whose circuit is open.
+    """
+    def __init__(self, provider_name: str):
+        super().__init__(f"Circuit of provider '{provider_name}' is open")
+        self.provider_name = provider_name
+
+
+class CircuitBreaker:
+    """A thread-safe, consecutive-failures circuit breaker.
+
+        Attributes:
+            name: The name of the protected provider.
+            failure_threshold: Consecutive failures that open the circuit.
+            recovery_seconds: Time the circuit stays open before a probe call is let through.
+            rejected: Number of calls rejected while the circuit was open.
+    """
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 recovery_seconds: float = DEFAULT_RECOVERY_SECONDS, clock: Callable[[], float] = time.monotonic):
+        """Initializes a closed circuit.
+
+            Args:
+                name: The name of the protected provider.
+                failure_threshold: Consecutive failures that open the circuit.
+                recovery_seconds: Time the circuit stays open before a probe call is let through.
+                clock: Monotonic time source (replaceable in tests).
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.rejected = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state of the circuit."""
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Returns whether a call may go through now. Every allowed call must be followed by a record_* call."""
+        with self._lock:
+            if self._state is CircuitState.OPEN and self._clock() - self._opened_at >= self.recovery_seconds:
+                self._state = CircuitState.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state is CircuitState.CLOSED:
+                return True
+            if self._state is CircuitState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """Records a successful call, closing the circuit."""
+        with self._lock:
+            if self._state is not CircuitState.CLOSED:
+                print(f"Circuit of provider '{self.name}' closed")
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Records a failed call, opening the circuit on a failed probe or past the failure threshold."""
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state is CircuitState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state is not CircuitState.OPEN:
+                    print(f"Circuit of provider '{self.name}' opened after {self._consecutive_failures} "
+                          f"consecutive failure(s)")
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def record_cancelled(self):
+        """Records a call cut short by its caller (e.g. by the request deadline), releasing a probe in flight.
+
+            Such a call says nothing of the provider's health, so the failure counter is left as is.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        """Returns the state, consecutive failures and rejected calls of the circuit."""
+        with self._lock:
+            return {"state": self._state.value, "consecutive_failures": self._consecutive_failures,
+                    "rejected": self.rejected}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider_name: str) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker of a provider, creating it on first use.
+
+        The thresholds are read from PROVIDER_CIRCUIT_FAILURE_THRESHOLD and PROVIDER_CIRCUIT_RECOVERY_SECONDS.
+    """
+    breaker: Optional[CircuitBreaker] = _breakers.get(provider_name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(provider_name)
+            if breaker is None:
+                breaker = _breakers[provider_name] = CircuitBreaker(
+                    provider_name,
+                    int(os.getenv('PROVIDER_CIRCUIT_FAILURE_THRESHOLD', DEFAULT_FAILURE_THRESHOLD)),
+                    float(os.getenv('PROVIDER_CIRCUIT_RECOVERY_SECONDS', DEFAULT_RECOVERY_SECONDS)))
+    return breaker
+
+
+def get_circuit_breaker_stats() -> Dict[str, dict]:
+    """Returns the stats of every circuit breaker, by provider name."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def reset_circuit_breakers():
+    """Drops every circuit breaker (they are recreated, closed, on next use)."""
+    with _breakers_lock:
+        _breakers.clear()
@@ -8,21 +8,38 @@ object while filtering out stale or invalid information.
 Main components:
     - WeatherCondition: Unified enum for cross-provider weather states.
     - CityWeatherData: The primary data model for aggregated results.
+    - CacheStatus: How a result was served (fresh from the cache, stale while revalidating, or fetched).
     - Data Processing: Functions for text-to-enum mapping and multi-source averaging.
 """
 
+import asyncio
+import copy
 import csv
+import functools
 import json
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 import time
 from enum import Enum
-from typing import Any, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import async_workers
+import geocode_cache
+import json_codec
 import open_meteo
 import utils
+from cache import LRUCache
+from deadline import DEADLINE_OPTIONAL_STAGE_MIN_SECONDS, NO_DEADLINE, Deadline
 from open_meteo import OpenMeteoRequestError, OpenMeteoResponse
+from single_flight import SingleFlight
+from stage_timing import NULL_STAGE_TIMER, StageTimer
 import weather_api
 from weather_api import WeatherApiRequestError, WeatherApiCityNotFoundError, WeatherApiResponse
 from weather_service import WeatherServiceError
+import weather_cache
+from weather_cache import SharedWeatherEntry, WeatherCacheStore
 
 
 class WeatherCondition(Enum):
@@ -47,6 +64,14 @@ class WeatherCondition(Enum):
     UNRECOGNIZED = (13, "Unrecognized")
 
 
+class CacheStatus(Enum):
+    """How an aggregated result was served by fetch_city_weather_data, as reported in responses."""
+    HIT = "hit"  # cached in-process, within its soft TTL
+    SHARED = "shared"  # cached in the shared tier (by another container), within its soft TTL
+    STALE = "stale"  # cached, past its soft TTL: served while it is refreshed (in the background, or by another container)
+    MISS = "miss"  # fetched from the providers (no cached entry, or one past the stale cutoff)
+
+
 class CityWeatherData:
     """A unified data model representing aggregated weather data for a specific city.
 
@@ -56,6 +81,7 @@ class CityWeatherData:
             last_update_epoch: The most recent valid data point's Unix timestamp.
             temp_c: The calculated average temperature in Celsius.
             weather_condition: A list of unique weather conditions reported by the service providers.
+            cache_status: How the result was served (see CacheStatus), None if not served through the cache.
     """
     def __init__(self, latitude: float, longitude: float, last_update_epoch: int, temp_c: float,
                  weather_condition: WeatherCondition | List[WeatherCondition]):
@@ -74,6 +100,7 @@ class CityWeatherData:
         self.temp_c = temp_c
         self.weather_condition = weather_condition \
             if type(weather_condition) is list else [weather_condition]
+        self.cache_status: Optional[CacheStatus] = None
 
     def __repr__(self):
         """Returns a string representation of the CityWeatherData instance."""
@@ -86,17 +113,17 @@ class CityWeatherData:
             f"weather_condition={self.weather_condition!r})"
         )
 
-    def to_json(self):
-        """Serializes the object state into a JSON-formatted string.
+    def to_dict(self) -> dict:
+        """Converts the object state into a consumer-ready, JSON-serializable dictionary.
 
             Transforms internal attributes into a consumer-ready format, including
             ISO 8601 timestamps, rounded temperatures, and human-readable
             descriptions of weather conditions.
 
             Returns:
-                str: A JSON string containing the processed weather data.
+                dict: The processed weather data, to be embedded in a response body and encoded once.
         """
-        return json.dumps({
+        return {
             "latitude": self.latitude,
             "longitude": self.longitude,
             "last_update": utils.epoch_timestamp_to_iso_format(self.last_update_epoch),
@@ -104,7 +131,32 @@ class CityWeatherData:
             "weather_condition": " or ".join(wc.value[1] for wc in self.weather_condition)
             if len(self.weather_condition) > 0
             else "N / A"
-        })
+        }
+
+    def to_json(self) -> str:
+        """Serializes the object state (see to_dict) into a JSON-formatted string.
+
+            Returns:
+                str: A JSON string containing the processed weather data.
+        """
+        return json_codec.dumps(self.to_dict())
+
+    def to_record(self) -> dict:
+        """Converts the object state into a JSON-serializable dictionary of its raw values (see from_record)."""
+        return {"latitude": self.latitude, "longitude": self.longitude, "last_update_epoch": self.last_update_epoch,
+                "temp_c": self.temp_c, "weather_condition": [wc.name for wc in self.weather_condition]}
+
+    @classmethod
+    def from_record(cls, record: dict) -> "CityWeatherData":
+        """Rebuilds a CityWeatherData object from the dictionary returned by to_record."""
+        return cls(record["latitude"], record["longitude"], record["last_update_epoch"], record["temp_c"],
+                   [WeatherCondition[name] for name in record["weather_condition"]])
+
+    def with_cache_status(self, cache_status: CacheStatus) -> "CityWeatherData":
+        """Returns a copy of the object reporting the given cache status (cached objects are shared, never mutated)."""
+        served = copy.copy(self)
+        served.cache_status = cache_status
+        return served
 
 
 class CityWeatherDataFetchError(Exception):
@@ -135,13 +187,61 @@ class CityWeatherDataRequestError(CityWeatherDataFetchError):
 
 STALE_CUTOFF_NUM_SECONDS = 6 * 60 * 60
 
+# Worker threads used to query the backup provider while the primary provider is queried on the calling thread.
+# The pool lives at module level so its threads are reused across warm invocations.
+PROVIDER_FETCH_MAX_WORKERS = int(os.getenv('PROVIDER_FETCH_MAX_WORKERS', 8))
+_provider_executor = ThreadPoolExecutor(max_workers=PROVIDER_FETCH_MAX_WORKERS, thread_name_prefix="provider-fetch")
 
-def convert_weather_condition_text_to_weather_condition(weather_condition_text: str) -> WeatherCondition:
-    """Normalizes raw weather description strings into a standard WeatherCondition enum.
+# Aggregated results are cached per normalized city name, across warm invocations of the same container.
+# Providers refresh their data about every PROVIDER_UPDATE_INTERVAL_SECONDS, so an entry's soft TTL ends once
+# its providers are expected to have newer data, but lasts at least CITY_WEATHER_CACHE_MIN_TTL_SECONDS and
+# never past the stale cutoff. Stale-while-revalidate: past its soft TTL, and until the stale cutoff of its
+# data, an entry is still served, while a single background refresh per city replaces it.
+CITY_WEATHER_CACHE_MAX_SIZE = int(os.getenv('CITY_WEATHER_CACHE_MAX_SIZE', 1024))
+PROVIDER_UPDATE_INTERVAL_SECONDS = 15 * 60
+CITY_WEATHER_CACHE_MIN_TTL_SECONDS = 60
+CITY_WEATHER_STALE_WHILE_REVALIDATE = os.getenv('CITY_WEATHER_STALE_WHILE_REVALIDATE', 'true').lower() == 'true'
+_city_weather_cache = LRUCache(CITY_WEATHER_CACHE_MAX_SIZE)  # city key -> (CityWeatherData, soft expiry time)
 
-        This function performs 'fuzzy' text matching by stripping common API modifiers
-        (e.g., 'at times', 'slight', 'patchy') and mapping the core keywords to an
-        internal, provider-agnostic WeatherCondition representation.
+# Background refreshes of stale entries. On Lambda, a refresh still running when the response is returned
+# is frozen with the container, and completes when the next invocation thaws it.
+CITY_WEATHER_REFRESH_MAX_WORKERS = int(os.getenv('CITY_WEATHER_REFRESH_MAX_WORKERS', 4))
+_refresh_executor = ThreadPoolExecutor(max_workers=CITY_WEATHER_REFRESH_MAX_WORKERS,
+                                       thread_name_prefix="city-weather-refresh")
+_refreshing_city_keys = set()
+_refresh_lock = threading.Lock()
+_refresh_stats = {"stale_served": 0, "refreshes": 0, "refresh_failures": 0}
+
+# Interval at which the shared tier is polled while another container holds a city's refresh lease
+SHARED_CACHE_POLL_INTERVAL_SECONDS = 0.1
+
+# Concurrent cache misses of the same normalized city share a single provider fetch.
+_city_fetch_flight = SingleFlight()
+
+# Maximum number of cities of a batch fetched concurrently
+BATCH_FETCH_MAX_WORKERS = int(os.getenv('BATCH_FETCH_MAX_WORKERS', 16))
+
+
+# A single pass over the condition text collects every keyword the normalization depends on.
+# Provider modifiers are folded into the keyword they stand for (e.g. 'patchy' reads as 'light'), while
+# modifiers carrying no meaning for the normalization ('shower', 'at times', 'fall') are simply not matched.
+_WEATHER_CONDITION_KEYWORDS_PATTERN = re.compile("clear|sunny|cloudy|drizzle|rain|snow|mist|fog|overcast"
+                                                 "|partially|partly|light|slight|patchy|moderate|heavy|violent")
+_WEATHER_CONDITION_KEYWORD_ALIASES = {
+    "partly": "partially",
+    "slight": "light",
+    "patchy": "light",
+    "violent": "heavy",
+}
+
+# Memoized normalizations, keyed by the exact condition text. Providers use a few dozen distinct texts,
+# the bound only protects against an unexpected flood of unseen ones.
+WEATHER_CONDITION_TEXT_CACHE_MAX_SIZE = 1024
+_weather_condition_text_cache: Dict[str, WeatherCondition] = {}
+
+
+def scan_weather_condition_text(weather_condition_text: str) -> WeatherCondition:
+    """Normalizes a raw weather description string with a single keyword scan, without memoization.
 
         Args:
             weather_condition_text: The raw condition string from a weather service.
@@ -149,58 +249,123 @@ def convert_weather_condition_text_to_weather_condition(weather_condition_text:
         Returns:
             A WeatherCondition enum member. Defaults to UNRECOGNIZED if no match is found.
     """
-    clear_weather_condition_text = (weather_condition_text.lower().replace("shower", "")
-                              .replace("at times", "")
-                              .replace("slight", "light")
-                              .replace("fall", "")
-                              .replace("partly", "partially")
-                              .replace("patchy", "light")
-                              .replace("violent", "heavy")
-                              .strip())
-
-    if "clear" in clear_weather_condition_text or "sunny" in clear_weather_condition_text:
+    keywords = {_WEATHER_CONDITION_KEYWORD_ALIASES.get(keyword, keyword)
+                for keyword in _WEATHER_CONDITION_KEYWORDS_PATTERN.findall(weather_condition_text.lower())}
+
+    if "clear" in keywords or "sunny" in keywords:
         return WeatherCondition.CLEAR
-    elif "cloudy" in clear_weather_condition_text:
-        if "partially" in clear_weather_condition_text:
+    elif "cloudy" in keywords:
+        if "partially" in keywords:
             return WeatherCondition.PARTIALLY_CLOUDY
         else:
             return WeatherCondition.CLOUDY
-    elif "drizzle" in clear_weather_condition_text:
+    elif "drizzle" in keywords:
         return WeatherCondition.DRIZZLE
-    elif "rain" in clear_weather_condition_text:
-        if "light" in clear_weather_condition_text:
+    elif "rain" in keywords:
+        if "light" in keywords:
             return WeatherCondition.LIGHT_RAIN
-        elif "moderate" in clear_weather_condition_text:
+        elif "moderate" in keywords:
             return WeatherCondition.MODERATE_RAIN
-        elif "heavy" in clear_weather_condition_text:
+        elif "heavy" in keywords:
             return WeatherCondition.HEAVY_RAIN
         else:
             return WeatherCondition.MODERATE_RAIN
-    elif "snow" in clear_weather_condition_text:
-        if "light" in clear_weather_condition_text:
+    elif "snow" in keywords:
+        if "light" in keywords:
             return WeatherCondition.LIGHT_SNOW
-        elif "moderate" in clear_weather_condition_text:
+        elif "moderate" in keywords:
             return WeatherCondition.MODERATE_SNOW
-        elif "heavy" in clear_weather_condition_text:
+        elif "heavy" in keywords:
             return WeatherCondition.HEAVY_SNOW
         else:
             return WeatherCondition.MODERATE_SNOW
-    elif "mist" in clear_weather_condition_text:
+    elif "mist" in keywords:
         return WeatherCondition.MIST
-    elif "fog" in clear_weather_condition_text:
+    elif "fog" in keywords:
         return WeatherCondition.FOG
-    elif "overcast" in clear_weather_condition_text:
+    elif "overcast" in keywords:
         return WeatherCondition.OVERCAST
     else:
         return WeatherCondition.UNRECOGNIZED
 
 
+def convert_weather_condition_text_to_weather_condition(weather_condition_text: str) -> WeatherCondition:
+    """Normalizes raw weather description strings into a standard WeatherCondition enum.
+
+        This function performs 'fuzzy' text matching by ignoring common API modifiers
+        (e.g., 'at times', 'shower') and folding others into the keyword they stand for
+        (e.g., 'slight' and 'patchy' read as 'light'), mapping the core keywords to an
+        internal, provider-agnostic WeatherCondition representation.
+
+        Results are memoized by exact input string; the known provider condition texts
+        are precomputed at import time.
+
+        Args:
+            weather_condition_text: The raw condition string from a weather service.
+
+        Returns:
+            A WeatherCondition enum member. Defaults to UNRECOGNIZED if no match is found.
+    """
+    weather_condition = _weather_condition_text_cache.get(weather_condition_text)
+
+    if weather_condition is None:
+        weather_condition = scan_weather_condition_text(weather_condition_text)
+        if len(_weather_condition_text_cache) < WEATHER_CONDITION_TEXT_CACHE_MAX_SIZE:
+            _weather_condition_text_cache[weather_condition_text] = weather_condition
+
+    return weather_condition
+
+
+def precompute_weather_condition_texts(weather_condition_texts: Iterable[str]):
+    """Memoizes the normalization of known condition texts, so they never reach the keyword scan per request."""
+    for weather_condition_text in weather_condition_texts:
+        convert_weather_condition_text_to_weather_condition(weather_condition_text)
+
+
+precompute_weather_condition_texts(weather_api.WEATHER_API_CONDITION_TEXTS)
+
+
+OPEN_METEO_WEATHER_CODES_FILENAME = "open_meteo_weather_codes.csv"
+# WMO weather codes used by OpenMeteo are in the range 0-99
+OPEN_METEO_WEATHER_CODES_TABLE_SIZE = 100
+
+
+def load_open_meteo_weather_conditions(path: str) -> List[Optional[WeatherCondition]]:
+    """Loads the OpenMeteo weather codes table into a direct code-to-WeatherCondition lookup.
+
+        Each code's description is normalized once, so that mapping an OpenMeteo response
+        requires neither file I/O nor string processing.
+
+        Args:
+            path: Path of the CSV file, with 'code' and 'description' columns.
+
+        Returns:
+            A list indexed by weather code, holding the code's WeatherCondition,
+            or None for codes missing from the file. All codes are missing if the file cannot be read.
+    """
+    weather_conditions: List[Optional[WeatherCondition]] = [None] * OPEN_METEO_WEATHER_CODES_TABLE_SIZE
+
+    try:
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                weather_conditions[int(row["code"])] = \
+                    convert_weather_condition_text_to_weather_condition(row["description"])
+    except IOError as e:
+        print(f"Could not read open meteo weather codes file: {e}")
+
+    return weather_conditions
+
+
+_open_meteo_weather_conditions = load_open_meteo_weather_conditions(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), OPEN_METEO_WEATHER_CODES_FILENAME))
+
+
 def convert_weather_service_response_to_weather_data(weather_service_response: Any) -> CityWeatherData:
     """Transforms provider-specific response object into a unified CityWeatherData format.
 
         Supports WeatherApiResponse (WeatherAPI) and OpenMeteoResponse (OpenMeteo).
-        For OpenMeteo, it performs an additional lookup against a local CSV file
-        to map numeric WMO weather codes to human-readable text before normalization.
+        For OpenMeteo, numeric WMO weather codes are mapped through the weather codes table
+        loaded at import time (see load_open_meteo_weather_conditions).
 
         Args:
             weather_service_response: An instance of WeatherApiResponse or OpenMeteoResponse.
@@ -211,28 +376,25 @@ def convert_weather_service_response_to_weather_data(weather_service_response: A
         Raises:
             ValueError: If the response type is not recognized.
     """
-    OPEN_METEO_WEATHER_CODES_FILENAME = "open_meteo_weather_codes.csv"
-    weather_condition_text = None
-
     if isinstance(weather_service_response, WeatherApiResponse):
         last_update_epoch = weather_service_response.last_update_epoch
         weather_condition_text = weather_service_response.condition_text
+        weather_condition = convert_weather_condition_text_to_weather_condition(weather_condition_text) \
+            if weather_condition_text else WeatherCondition.UNRECOGNIZED
     elif isinstance(weather_service_response, OpenMeteoResponse):
         last_update_epoch = int(datetime.strptime(weather_service_response.time, "%Y-%m-%dT%H:%M")
                                 .replace(tzinfo=timezone.utc).timestamp()) \
                             if weather_service_response.time \
                             else None
 
-        try:
-            with open(OPEN_METEO_WEATHER_CODES_FILENAME, newline="") as f:
-                weather_dict = {int(row["code"]): row["description"] for row in csv.DictReader(f)}
-                if weather_service_response.weather_code in weather_dict:
-                    weather_condition_text = weather_dict[weather_service_response.weather_code]
-                else:
-                    print(f"Weather code received in OpenMeteo response not in {OPEN_METEO_WEATHER_CODES_FILENAME}")
+        weather_code = weather_service_response.weather_code
+        weather_condition = _open_meteo_weather_conditions[weather_code] \
+            if isinstance(weather_code, int) and 0 <= weather_code < OPEN_METEO_WEATHER_CODES_TABLE_SIZE \
+            else None
 
-        except IOError as e:
-            print(f"Could not read open meteo weather codes file: {e}")
+        if weather_condition is None:
+            print(f"Weather code received in OpenMeteo response not in {OPEN_METEO_WEATHER_CODES_FILENAME}")
+            weather_condition = WeatherCondition.UNRECOGNIZED
 
     else:
         raise ValueError(f"weather_service_response must be an instance of {WeatherApiResponse.__name__}"
@@ -241,8 +403,6 @@ def convert_weather_service_response_to_weather_data(weather_service_response: A
     latitude = weather_service_response.latitude
     longitude = weather_service_response.longitude
     temp_c = weather_service_response.temp_c
-    weather_condition = convert_weather_condition_text_to_weather_condition(weather_condition_text) \
-        if weather_condition_text else WeatherCondition.UNRECOGNIZED
 
     return CityWeatherData(latitude, longitude, last_update_epoch, temp_c, weather_condition)
 
@@ -285,45 +445,706 @@ def average_city_weather_data(weather_data_list: List[CityWeatherData]) -> Optio
                            avg_last_update_epoch, avg_temp_c, avg_weather_condition)
 
 
-def fetch_city_weather_data(city_name: str) -> CityWeatherData:
+def get_city_weather_data_expiry(city_weather_data: CityWeatherData, now: float) -> float:
+    """Computes the Unix epoch time at which a cached aggregated result expires.
+
+        Args:
+            city_weather_data: The aggregated result to cache.
+            now: The current Unix epoch time.
+
+        Returns:
+            The expiry time, derived from the result's last_update_epoch and STALE_CUTOFF_NUM_SECONDS.
+    """
+    last_update_epoch = city_weather_data.last_update_epoch
+    return min(max(last_update_epoch + PROVIDER_UPDATE_INTERVAL_SECONDS, now + CITY_WEATHER_CACHE_MIN_TTL_SECONDS),
+               last_update_epoch + STALE_CUTOFF_NUM_SECONDS)
+
+
+def get_city_weather_data_stale_expiry(city_weather_data: CityWeatherData, soft_expires_at: float) -> float:
+    """Computes the Unix epoch time until which a cached aggregated result may be served stale.
+
+        Args:
+            city_weather_data: The aggregated result to cache.
+            soft_expires_at: The end of its soft TTL (see get_city_weather_data_expiry).
+
+        Returns:
+            The stale cutoff of the result's data, or soft_expires_at when stale-while-revalidate is disabled.
+    """
+    if not CITY_WEATHER_STALE_WHILE_REVALIDATE:
+        return soft_expires_at
+    return max(soft_expires_at, city_weather_data.last_update_epoch + STALE_CUTOFF_NUM_SECONDS)
+
+
+def get_city_weather_cache_stats() -> dict:
+    """Returns the size and counters of the aggregated results cache, including the stale entries served
+        and the background refreshes run.
+    """
+    with _refresh_lock:
+        return _city_weather_cache.stats() | _refresh_stats
+
+
+def get_city_fetch_coalescing_stats() -> dict:
+    """Returns the number of provider fetches run, and saved by coalescing concurrent lookups of a city."""
+    return _city_fetch_flight.stats()
+
+
+def clear_city_weather_cache():
+    """Removes every aggregated result from the in-process cache."""
+    _city_weather_cache.clear()
+
+
+def cache_city_weather_data(city_key: str, weather_data: CityWeatherData,
+                            store: Optional[WeatherCacheStore] = None):
+    """Caches an aggregated result under a normalized city name, until the stale cutoff of its data.
+
+        Args:
+            city_key: The normalized city name.
+            weather_data: The aggregated result.
+            store: The shared tier the result is also written to (releasing the city's refresh lease), if any.
+    """
+    soft_expires_at = get_city_weather_data_expiry(weather_data, time.time())
+    expires_at = get_city_weather_data_stale_expiry(weather_data, soft_expires_at)
+    _city_weather_cache.put(city_key, (weather_data, soft_expires_at), expires_at)
+
+    if store is not None:
+        store.put(city_key, SharedWeatherEntry(json_codec.dumps(weather_data.to_record()),
+                                               weather_data.last_update_epoch, soft_expires_at, expires_at))
+
+
+def get_shared_city_weather_data(store: WeatherCacheStore, city_key: str, deadline: Deadline = NO_DEADLINE,
+                                 min_remaining_seconds: float = 0) -> Tuple[Optional[CityWeatherData], bool]:
+    """Looks a city up in the shared tier, taking its refresh lease when the providers must be called.
+
+        A fresh shared entry, with more than min_remaining_seconds of its soft TTL left, is served
+        (CacheStatus.SHARED). Otherwise, the caller must call the providers,
+        unless another container holds the city's lease: its stale entry is then served (CacheStatus.STALE)
+        or, when there is none, the lease holder's write is waited for, up to WEATHER_CACHE_LEASE_WAIT_SECONDS
+        (within the request's budget).
+
+        Returns:
+            A tuple containing (weather_data, holds_lease): weather_data is None when the providers must be
+            called, and holds_lease tells whether the caller took the lease (to be released if its fetch fails).
+    """
+    entry = store.get(city_key)
+    if entry is not None and time.time() + min_remaining_seconds < entry.soft_expires_at:
+        return cache_shared_entry(city_key, entry).with_cache_status(CacheStatus.SHARED), False
+
+    if store.try_acquire_lease(city_key):
+        return None, True
+
+    if entry is not None:
+        return cache_shared_entry(city_key, entry).with_cache_status(CacheStatus.STALE), False
+
+    wait_until = time.monotonic() + min(weather_cache.WEATHER_CACHE_LEASE_WAIT_SECONDS,
+                                        deadline.remaining_seconds() - DEADLINE_OPTIONAL_STAGE_MIN_SECONDS)
+    while time.monotonic() < wait_until:
+        time.sleep(SHARED_CACHE_POLL_INTERVAL_SECONDS)
+        entry = store.get(city_key)
+        if entry is not None:
+            return cache_shared_entry(city_key, entry).with_cache_status(CacheStatus.SHARED), False
+
+    return None, False
+
+
+def cache_shared_entry(city_key: str, entry: SharedWeatherEntry) -> CityWeatherData:
+    """Caches an entry of the shared tier in the in-process tier, with the same expiry times."""
+    weather_data = CityWeatherData.from_record(json.loads(entry.data))
+    _city_weather_cache.put(city_key, (weather_data, entry.soft_expires_at), entry.expires_at)
+    return weather_data
+
+
+def get_cached_city_weather_data(city_key: str, city_name: str) -> Optional[CityWeatherData]:
+    """Returns a city's cached aggregated result, reporting its cache status, or None if it must be fetched.
+
+        A result past its soft TTL is returned as STALE, and a background refresh of the city is scheduled.
+    """
+    entry = _city_weather_cache.get(city_key)
+    if entry is None:
+        return None
+
+    weather_data, soft_expires_at = entry
+    if time.time() < soft_expires_at:
+        return weather_data.with_cache_status(CacheStatus.HIT)
+
+    schedule_city_weather_data_refresh(city_key, city_name)
+    return weather_data.with_cache_status(CacheStatus.STALE)
+
+
+def schedule_city_weather_data_refresh(city_key: str, city_name: str):
+    """Refreshes a stale cached result in the background, unless a refresh of the city is already scheduled."""
+    with _refresh_lock:
+        _refresh_stats["stale_served"] += 1
+        if city_key in _refreshing_city_keys:
+            return
+        _refreshing_city_keys.add(city_key)
+
+    _refresh_executor.submit(refresh_city_weather_data, city_key, city_name)
+
+
+def refresh_city_weather_data(city_key: str, city_name: str):
+    """Fetches a city's data from the providers and replaces its cached result (a failure keeps the stale one)."""
+    try:
+        _city_fetch_flight.do(city_key, fetch_and_cache_city_weather_data, city_key, city_name, None,
+                              NULL_STAGE_TIMER)
+        outcome = "refreshes"
+    except Exception as e:
+        print(f"Background refresh of '{city_name}' failed: {e!r}")
+        outcome = "refresh_failures"
+
+    with _refresh_lock:
+        _refreshing_city_keys.discard(city_key)
+        _refresh_stats[outcome] += 1
+
+
+def has_open_meteo_budget(deadline: Deadline) -> bool:
+    """Returns whether enough of the request's budget is left for the (optional) OpenMeteo enrichment."""
+    if deadline.has_budget():
+        return True
+
+    print(f"Skipping OpenMeteo: {deadline.remaining_seconds() * 1000:.0f} ms left of the request's budget")
+    return False
+
+
+def timed_provider_call(stage_timer: StageTimer, provider_name: str, fetch_function: Callable, *args):
+    """Calls a provider fetch function, timing it as a stage even if it raises.
+
+        Args:
+            stage_timer: The invocation's stage timer, the duration is recorded under provider_name.
+            provider_name: Stage to record the duration under (e.g. 'weather_api').
+            fetch_function: The provider fetch function to call.
+            *args: Positional arguments passed to fetch_function.
+
+        Returns:
+            Whatever fetch_function returns.
+    """
+    with stage_timer.stage(provider_name):
+        return fetch_function(*args)
+
+
+def aggregate_provider_responses(city_name: str, weather_service_responses: List[Any],
+                                 stage_timer: StageTimer = NULL_STAGE_TIMER) -> CityWeatherData:
+    """Aggregates the provider responses of a city, the primary (WeatherAPI) response first.
+
+        Stores the coordinates of the primary response in the geocode cache, then normalizes the
+        responses into CityWeatherData objects (timed as the 'normalization' stage) and averages them.
+
+        Raises:
+            CityWeatherDataFetchError: If all retrieved data is considered stale.
+    """
+    if weather_service_responses[0].latitude is not None and weather_service_responses[0].longitude is not None:
+        geocode_cache.get_geocode_cache().put(city_name, weather_service_responses[0].latitude,
+                                              weather_service_responses[0].longitude)
+
+    with stage_timer.stage("normalization"):
+        weather_data_list = [convert_weather_service_response_to_weather_data(response)
+                             for response in weather_service_responses]
+        avg_weather_data = average_city_weather_data(weather_data_list)
+
+    if avg_weather_data is None:
+        raise CityWeatherDataFetchError("All city weather datas were filtered out")
+
+    return avg_weather_data
+
+
+def fetch_city_weather_data(city_name: str, coordinates: Optional[Tuple[float, float]] = None,
+                            stage_timer: StageTimer = NULL_STAGE_TIMER, deadline: Deadline = NO_DEADLINE,
+                            open_meteo_fetch: Optional[Callable[[], OpenMeteoResponse]] = None) -> CityWeatherData:
+    """Returns the aggregated weather data of a city, from the in-process cache when it holds a live entry.
+
+        Stale-while-revalidate: within its soft TTL (see get_city_weather_data_expiry), a cached result is
+        served as is (CacheStatus.HIT). Past it, and until its data's stale cutoff, it is served right away
+        while being refreshed in the background (CacheStatus.STALE). Otherwise, the data is fetched from the
+        providers (see fetch_city_weather_data_from_providers) and cached (CacheStatus.MISS). Failures are not
+        cached. Concurrent misses of the same city are coalesced: a single fetch runs, and its result or
+        exception is shared by every caller.
+
+        Args:
+            city_name: The name of the city to query.
+            coordinates: The city's (latitude, longitude), if already known.
+            stage_timer: The invocation's stage timer (see fetch_city_weather_data_from_providers for the
+                stages recorded on a cache miss).
+            deadline: The request's deadline (see fetch_city_weather_data_from_providers).
+            open_meteo_fetch: Returns the city's OpenMeteo response, in place of a request of its own
+                (see fetch_city_weather_data_from_providers).
+
+        Returns:
+            A final, aggregated CityWeatherData object, whose cache_status reports how it was served.
+
+        Raises:
+            CityWeatherDataCityNotFoundError: If the city cannot be found.
+            CityWeatherDataRequestError: If the primary service request fails.
+            CityWeatherDataFetchError: If all retrieved data is considered stale.
+    """
+    city_key = utils.normalize_city_name(city_name)
+    with stage_timer.stage("cache_lookup"):
+        weather_data = get_cached_city_weather_data(city_key, city_name)
+
+    if weather_data is None:
+        weather_data = _city_fetch_flight.do(city_key, fetch_and_cache_city_weather_data, city_key, city_name,
+                                             coordinates, stage_timer, deadline, open_meteo_fetch)
+
+    return weather_data
+
+
+def fetch_and_cache_city_weather_data(city_key: str, city_name: str, coordinates: Optional[Tuple[float, float]],
+                                      stage_timer: StageTimer, deadline: Deadline = NO_DEADLINE,
+                                      open_meteo_fetch: Optional[Callable[[], OpenMeteoResponse]] = None,
+                                      min_remaining_seconds: float = 0) -> CityWeatherData:
+    """Fetches a city's data, from the shared tier if it holds it, else from the providers, and caches it.
+
+        The shared tier lookup (see get_shared_city_weather_data) is timed as the 'shared_cache_lookup' stage.
+        A shared entry with no more than min_remaining_seconds of its soft TTL left is refreshed (e.g. by
+        the prewarming job, ahead of its next run).
+
+        Returns:
+            The result, whose cache_status is SHARED or STALE if served by the shared tier, MISS otherwise.
+    """
+    store = weather_cache.get_weather_cache_store()
+    holds_lease = False
+    if store is not None:
+        with stage_timer.stage("shared_cache_lookup"):
+            weather_data, holds_lease = get_shared_city_weather_data(store, city_key, deadline,
+                                                                     min_remaining_seconds)
+        if weather_data is not None:
+            return weather_data
+
+    try:
+        weather_data = fetch_city_weather_data_from_providers(city_name, coordinates, stage_timer, deadline,
+                                                              open_meteo_fetch)
+    except BaseException:
+        if holds_lease:
+            store.release_lease(city_key)
+        raise
+
+    cache_city_weather_data(city_key, weather_data, store)
+    return weather_data.with_cache_status(CacheStatus.MISS)
+
+
+def fetch_city_weather_data_from_providers(city_name: str, coordinates: Optional[Tuple[float, float]] = None,
+                                           stage_timer: StageTimer = NULL_STAGE_TIMER,
+                                           deadline: Deadline = NO_DEADLINE,
+                                           open_meteo_fetch: Optional[Callable[[], OpenMeteoResponse]] = None) \
+        -> CityWeatherData:
     """Orchestrates multi-source weather data retrieval and aggregation for a city.
 
         Flow:
             1. Query WeatherAPI by city name (Primary).
-            2. Use coordinates from the primary result to query OpenMeteo (Backup).
-            3. Normalize both responses into CityWeatherData objects.
-            4. Average the data and apply data integrity and stale-data filtering.
+            2. Query OpenMeteo (Backup) by coordinates. When the city's coordinates are already known
+               (given, or found in the geocode cache), OpenMeteo is queried concurrently with WeatherAPI;
+               otherwise (cold lookup) it is queried after WeatherAPI, using the coordinates from the
+               primary result. OpenMeteo is skipped when less than DEADLINE_OPTIONAL_STAGE_MIN_MS of the
+               request's budget is left. With known coordinates, open_meteo_fetch may supply the OpenMeteo
+               response instead (e.g. from a batched request covering many cities, see
+               fetch_city_weather_data_batch).
+            3. Aggregate the responses (see aggregate_provider_responses): store the coordinates returned
+               by WeatherAPI in the geocode cache, normalize both responses into CityWeatherData objects,
+               then average the data and apply data integrity and stale-data filtering.
 
         Args:
             city_name: The name of the city to query.
+            coordinates: The city's (latitude, longitude), if already known. Looked up in the
+                geocode cache when not given.
+            stage_timer: The invocation's stage timer, which records the 'geocode_lookup', 'weather_api',
+                'open_meteo' and 'normalization' (conversion and averaging) stages.
+            deadline: The request's deadline, to which the provider calls' timeouts are capped.
+            open_meteo_fetch: Returns the city's OpenMeteo response (or raises OpenMeteoRequestError), called
+                in place of requesting it when the coordinates are known.
 
         Returns:
             A final, aggregated CityWeatherData object.
 
         Raises:
             CityWeatherDataCityNotFoundError: If the city cannot be found.
-            CityWeatherDataRequestError: If the primary service request fails.
+            CityWeatherDataRequestError: If the primary service request fails (including when the deadline is reached).
             CityWeatherDataFetchError: If all retrieved data is considered stale.
     """
+    if coordinates is None:
+        with stage_timer.stage("geocode_lookup"):
+            coordinates = geocode_cache.get_geocode_cache().get(city_name)
+
     try:
-        weather_service_responses = [weather_api.fetch_data_weather_api(city_name)]
+        if coordinates is not None:
+            if open_meteo_fetch is None and has_open_meteo_budget(deadline):
+                open_meteo_fetch = _provider_executor.submit(timed_provider_call, stage_timer, "open_meteo",
+                                                             open_meteo.fetch_data_open_meteo, *coordinates,
+                                                             deadline).result
+            weather_service_responses = [timed_provider_call(stage_timer, "weather_api",
+                                                             weather_api.fetch_data_weather_api, city_name, deadline)]
+            try:
+                if open_meteo_fetch is not None:
+                    weather_service_responses.append(open_meteo_fetch())
+            except OpenMeteoRequestError as e:
+                print(f'Could not fetch weather data from OpenMeteo: {e}')
+        else:
+            weather_service_responses = [timed_provider_call(stage_timer, "weather_api",
+                                                             weather_api.fetch_data_weather_api, city_name, deadline)]
+
+            try:
+                if (weather_service_responses[0].latitude is not None and weather_service_responses[0].longitude is not None
+                        and has_open_meteo_budget(deadline)):
+                    weather_service_responses.append(timed_provider_call(stage_timer, "open_meteo",
+                                                                         open_meteo.fetch_data_open_meteo,
+                                                                         weather_service_responses[0].latitude,
+                                                                         weather_service_responses[0].longitude,
+                                                                         deadline))
+            except OpenMeteoRequestError as e:
+                print(f'Could not fetch weather data from OpenMeteo: {e}')
+
+        return aggregate_provider_responses(city_name, weather_service_responses, stage_timer)
+    except WeatherApiCityNotFoundError:
+        raise CityWeatherDataCityNotFoundError()
+    except WeatherApiRequestError as e:
+        raise CityWeatherDataRequestError(e)
+
+
+def fetch_city_weather_data_batch(city_names: List[str], max_workers: int = BATCH_FETCH_MAX_WORKERS,
+                                  stage_timer: StageTimer = NULL_STAGE_TIMER, deadline: Deadline = NO_DEADLINE) \
+        -> Dict[str, CityWeatherData | CityWeatherDataFetchError]:
+    """Fetches the aggregated weather data of many cities concurrently, with a bounded worker pool.
+
+        Cities are de-duplicated by normalized name, the first spelling of each city being kept.
+        A city failing does not affect the others: its exception is returned in place of its data.
+        The OpenMeteo data of the cities to fetch whose coordinates are known is requested in one batched
+        request (see submit_open_meteo_batch), concurrently with their WeatherAPI requests.
+
+        Args:
+            city_names: The names of the cities to query.
+            max_workers: Maximum number of cities fetched concurrently.
+            stage_timer: The invocation's stage timer, which accumulates the stages of every city.
+            deadline: The request's deadline: cities still queued when it is reached fail with a request error.
+
+        Returns:
+            A dictionary mapping each distinct city name (in the order of first appearance) to either its
+            aggregated CityWeatherData, or the CityWeatherDataFetchError raised while fetching it.
+    """
+    unique_city_names = utils.remove_city_name_dups(city_names)
+    if not unique_city_names:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_city_names)),
+                            thread_name_prefix="batch-fetch") as executor:
+        coordinates_by_city = dict(zip(unique_city_names, executor.map(get_uncached_city_coordinates,
+                                                                       unique_city_names,
+                                                                       [stage_timer] * len(unique_city_names))))
+        open_meteo_fetches = submit_open_meteo_batch(coordinates_by_city, stage_timer, deadline)
+        futures = {city_name: executor.submit(fetch_city_weather_data, city_name, coordinates_by_city[city_name],
+                                              stage_timer, deadline, open_meteo_fetches.get(city_name))
+                   for city_name in unique_city_names}
 
+    results = {}
+    for city_name, future in futures.items():
         try:
-            if weather_service_responses[0].latitude is not None and weather_service_responses[0].longitude is not None:
-                weather_service_responses.append(open_meteo.fetch_data_open_meteo(weather_service_responses[0].latitude,
-                                                                       weather_service_responses[0].longitude))
-        except OpenMeteoRequestError as e:
-            print(f'Could not fetch weather data from OpenMeteo: {e}')
+            results[city_name] = future.result()
+        except CityWeatherDataFetchError as e:
+            print(f"City Weather data fetching of '{city_name}' failed: {e!r}")
+            results[city_name] = e
 
-        weather_data_list = [convert_weather_service_response_to_weather_data(response)
-                                             for response in weather_service_responses]
-        avg_weather_data = average_city_weather_data(weather_data_list)
+    return results
+
+
+def get_uncached_city_coordinates(city_name: str, stage_timer: StageTimer = NULL_STAGE_TIMER) \
+        -> Optional[Tuple[float, float]]:
+    """Returns the coordinates of a city missing from the in-process cache, from the geocode cache.
+
+        Returns:
+            The city's (latitude, longitude), or None if it is cached (i.e. will not be fetched) or its
+            coordinates are unknown.
+    """
+    if utils.normalize_city_name(city_name) in _city_weather_cache:
+        return None
+
+    with stage_timer.stage("geocode_lookup"):
+        return geocode_cache.get_geocode_cache().get(city_name)
+
+
+def get_open_meteo_batch_city_names(coordinates_by_city: Dict[str, Optional[Tuple[float, float]]],
+                                    deadline: Deadline = NO_DEADLINE) -> List[str]:
+    """Returns the cities whose OpenMeteo data is worth one batched request: those with known coordinates,
+        when there are at least two of them and the request's budget allows the OpenMeteo enrichment.
+    """
+    city_names = [city_name for city_name, coordinates in coordinates_by_city.items() if coordinates is not None]
+    if len(city_names) < 2 or not has_open_meteo_budget(deadline):
+        return []
+    return city_names
+
+
+def submit_open_meteo_batch(coordinates_by_city: Dict[str, Optional[Tuple[float, float]]],
+                            stage_timer: StageTimer = NULL_STAGE_TIMER, deadline: Deadline = NO_DEADLINE) \
+        -> Dict[str, Callable[[], OpenMeteoResponse]]:
+    """Starts a batched OpenMeteo request (see open_meteo.fetch_data_open_meteo_batch) for the cities of a batch.
 
-        if avg_weather_data is None:
-            raise CityWeatherDataFetchError("All city weather datas were filtered out")
+        The request runs on the provider pool, timed as the 'open_meteo' stage.
 
-        return avg_weather_data
+        Args:
+            coordinates_by_city: The known coordinates of each city, None for the cities to leave out.
+            stage_timer: The invocation's stage timer.
+            deadline: The request's deadline.
+
+        Returns:
+            For each city of the request, a function waiting for its OpenMeteo response (see
+            get_open_meteo_batch_response), to be passed as the city's open_meteo_fetch.
+    """
+    city_names = get_open_meteo_batch_city_names(coordinates_by_city, deadline)
+    if not city_names:
+        return {}
+
+    batch_future = _provider_executor.submit(timed_provider_call, stage_timer, "open_meteo",
+                                             open_meteo.fetch_data_open_meteo_batch,
+                                             [coordinates_by_city[city_name] for city_name in city_names], deadline)
+    return {city_name: functools.partial(get_open_meteo_batch_response, batch_future, index)
+            for index, city_name in enumerate(city_names)}
+
+
+def select_open_meteo_batch_response(batch_responses: List[OpenMeteoResponse | OpenMeteoRequestError],
+                                     index: int) -> OpenMeteoResponse:
+    """Returns a location's response from the results of a batched OpenMeteo request, raising its error if any."""
+    response = batch_responses[index]
+    if isinstance(response, OpenMeteoRequestError):
+        raise response
+    return response
+
+
+def get_open_meteo_batch_response(batch_future: Future, index: int) -> OpenMeteoResponse:
+    """Waits for a batched OpenMeteo request shared by many cities, and returns the response of one of them."""
+    return select_open_meteo_batch_response(batch_future.result(), index)
+
+
+async def get_open_meteo_batch_response_async(batch_task: asyncio.Task, index: int) -> OpenMeteoResponse:
+    """Asynchronous variant of get_open_meteo_batch_response (one city being cancelled does not cancel the request)."""
+    return select_open_meteo_batch_response(await asyncio.shield(batch_task), index)
+
+
+def get_fresh_cache_status(city_key: str, store: Optional[WeatherCacheStore] = None,
+                           min_remaining_seconds: float = 0) -> Optional[CacheStatus]:
+    """Returns where a city's result is cached with more than min_remaining_seconds of its soft TTL left
+        (HIT: in-process, SHARED: shared tier), or None.
+    """
+    entry = _city_weather_cache.peek(city_key)
+    if entry is not None and time.time() + min_remaining_seconds < entry[1]:
+        return CacheStatus.HIT
+
+    if store is not None:
+        shared_entry = store.get(city_key)
+        if shared_entry is not None and time.time() + min_remaining_seconds < shared_entry.soft_expires_at:
+            return CacheStatus.SHARED
+
+    return None
+
+
+def prewarm_city_weather_data(city_names: List[str], max_workers: int = BATCH_FETCH_MAX_WORKERS,
+                              deadline: Deadline = NO_DEADLINE, min_remaining_seconds: float = 0) \
+        -> Dict[str, CacheStatus | Exception]:
+    """Refreshes the cached results of many cities ahead of demand, with a bounded worker pool.
+
+        Cities whose result has more than min_remaining_seconds of its soft TTL left are skipped (the
+        interval between two runs of a job, so that no result expires before the next run refreshes it).
+        The others are fetched like cache
+        misses (see fetch_and_cache_city_weather_data): through the shared tier's refresh lease, so a
+        city being refreshed by a serving container is not fetched twice, and with the OpenMeteo data
+        of the cities whose coordinates are known requested in one batched request.
+
+        Args:
+            city_names: The names of the cities to refresh.
+            max_workers: Maximum number of cities looked up and fetched concurrently.
+            deadline: The job's deadline: cities still queued when it is reached fail with a request error.
+            min_remaining_seconds: Soft TTL a cached result must have left to be skipped.
+
+        Returns:
+            A dictionary mapping each distinct city name to its outcome: HIT or SHARED if it was still fresh
+            in the in-process or shared tier, MISS if it was fetched from the providers, STALE if another
+            container holds its refresh lease, or the exception raised while fetching it (a
+            CityWeatherDataFetchError, or an unexpected one, which does not stop the other cities).
+    """
+    unique_city_names = utils.remove_city_name_dups(city_names)
+    if not unique_city_names:
+        return {}
+
+    store = weather_cache.get_weather_cache_store()
+    city_keys = {city_name: utils.normalize_city_name(city_name) for city_name in unique_city_names}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_city_names)),
+                            thread_name_prefix="prewarm") as executor:
+        fresh_statuses = dict(zip(unique_city_names, executor.map(get_fresh_cache_status, city_keys.values(),
+                                                                  [store] * len(unique_city_names),
+                                                                  [min_remaining_seconds] * len(unique_city_names))))
+        expired_city_names = [city_name for city_name in unique_city_names if fresh_statuses[city_name] is None]
+        coordinates_by_city = dict(zip(expired_city_names, executor.map(geocode_cache.get_geocode_cache().get,
+                                                                        expired_city_names)))
+        open_meteo_fetches = submit_open_meteo_batch(coordinates_by_city, deadline=deadline)
+        futures = {city_name: executor.submit(_city_fetch_flight.do, city_keys[city_name],
+                                              fetch_and_cache_city_weather_data, city_keys[city_name], city_name,
+                                              coordinates_by_city[city_name], NULL_STAGE_TIMER, deadline,
+                                              open_meteo_fetches.get(city_name), min_remaining_seconds)
+                   for city_name in expired_city_names}
+
+    results = {}
+    for city_name in unique_city_names:
+        if city_name not in futures:
+            results[city_name] = fresh_statuses[city_name]
+            continue
+        try:
+            results[city_name] = futures[city_name].result().cache_status
+        except Exception as e:
+            print(f"Prewarming of '{city_name}' failed: {e!r}")
+            results[city_name] = e
+
+    return results
+
+
+async def timed_provider_call_async(stage_timer: StageTimer, provider_name: str, fetch_function: Callable, *args):
+    """Asynchronous variant of timed_provider_call, awaiting an async provider fetch function."""
+    with stage_timer.stage(provider_name):
+        return await fetch_function(*args)
+
+
+async def fetch_city_weather_data_async(city_name: str, coordinates: Optional[Tuple[float, float]] = None,
+                                        stage_timer: StageTimer = NULL_STAGE_TIMER,
+                                        deadline: Deadline = NO_DEADLINE,
+                                        open_meteo_fetch: Optional[Callable[[], Awaitable[OpenMeteoResponse]]] = None) \
+        -> CityWeatherData:
+    """Asynchronous variant of fetch_city_weather_data, sharing its cache, results and exceptions.
+
+        Concurrent misses of the same city within the event loop are coalesced into a single fetch.
+        Stale entries are refreshed by the same background threads as the sync path. open_meteo_fetch, if
+        given, is a coroutine function.
+    """
+    city_key = utils.normalize_city_name(city_name)
+    with stage_timer.stage("cache_lookup"):
+        weather_data = get_cached_city_weather_data(city_key, city_name)
+
+    if weather_data is None:
+        weather_data = await _city_fetch_flight.do_async(city_key, fetch_and_cache_city_weather_data_async, city_key,
+                                                         city_name, coordinates, stage_timer, deadline,
+                                                         open_meteo_fetch)
+
+    return weather_data
+
+
+async def fetch_and_cache_city_weather_data_async(city_key: str, city_name: str,
+                                                  coordinates: Optional[Tuple[float, float]],
+                                                  stage_timer: StageTimer, deadline: Deadline = NO_DEADLINE,
+                                                  open_meteo_fetch: Optional[
+                                                      Callable[[], Awaitable[OpenMeteoResponse]]] = None) \
+        -> CityWeatherData:
+    """Asynchronous variant of fetch_and_cache_city_weather_data, accessing the shared tier from worker threads."""
+    store = weather_cache.get_weather_cache_store()
+    holds_lease = False
+    if store is not None:
+        with stage_timer.stage("shared_cache_lookup"):
+            weather_data, holds_lease = await async_workers.run_blocking(get_shared_city_weather_data, store, city_key, deadline)
+        if weather_data is not None:
+            return weather_data
+
+    try:
+        weather_data = await fetch_city_weather_data_from_providers_async(city_name, coordinates, stage_timer,
+                                                                          deadline, open_meteo_fetch)
+    except BaseException:
+        if holds_lease:
+            await async_workers.run_blocking(store.release_lease, city_key)
+        raise
+
+    if store is not None:
+        await async_workers.run_blocking(cache_city_weather_data, city_key, weather_data, store)
+    else:
+        cache_city_weather_data(city_key, weather_data)
+    return weather_data.with_cache_status(CacheStatus.MISS)
+
+
+async def fetch_city_weather_data_from_providers_async(city_name: str,
+                                                       coordinates: Optional[Tuple[float, float]] = None,
+                                                       stage_timer: StageTimer = NULL_STAGE_TIMER,
+                                                       deadline: Deadline = NO_DEADLINE,
+                                                       open_meteo_fetch: Optional[
+                                                           Callable[[], Awaitable[OpenMeteoResponse]]] = None) \
+        -> CityWeatherData:
+    """Asynchronous variant of fetch_city_weather_data_from_providers, with the same flow, results and exceptions.
+
+        The providers are queried through their async clients, concurrently when the city's coordinates
+        are known. The geocode cache, whose persistent tier may block, is accessed from worker threads.
+    """
+    if coordinates is None:
+        with stage_timer.stage("geocode_lookup"):
+            coordinates = await async_workers.run_blocking(geocode_cache.get_geocode_cache().get, city_name)
+
+    try:
+        if coordinates is not None and (open_meteo_fetch is not None or has_open_meteo_budget(deadline)):
+            weather_api_response, open_meteo_response = await asyncio.gather(
+                timed_provider_call_async(stage_timer, "weather_api", weather_api.fetch_data_weather_api_async,
+                                          city_name, deadline),
+                open_meteo_fetch() if open_meteo_fetch is not None else
+                timed_provider_call_async(stage_timer, "open_meteo", open_meteo.fetch_data_open_meteo_async,
+                                          *coordinates, deadline),
+                return_exceptions=True)
+
+            if isinstance(weather_api_response, BaseException):
+                raise weather_api_response
+            weather_service_responses = [weather_api_response]
+
+            if isinstance(open_meteo_response, OpenMeteoRequestError):
+                print(f'Could not fetch weather data from OpenMeteo: {open_meteo_response}')
+            elif isinstance(open_meteo_response, BaseException):
+                raise open_meteo_response
+            else:
+                weather_service_responses.append(open_meteo_response)
+        else:
+            weather_service_responses = [await timed_provider_call_async(stage_timer, "weather_api",
+                                                                         weather_api.fetch_data_weather_api_async,
+                                                                         city_name, deadline)]
+
+            try:
+                # (known coordinates land here only when OpenMeteo was already skipped for lack of budget)
+                if (coordinates is None and weather_service_responses[0].latitude is not None
+                        and weather_service_responses[0].longitude is not None and has_open_meteo_budget(deadline)):
+                    weather_service_responses.append(await timed_provider_call_async(
+                        stage_timer, "open_meteo", open_meteo.fetch_data_open_meteo_async,
+                        weather_service_responses[0].latitude, weather_service_responses[0].longitude, deadline))
+            except OpenMeteoRequestError as e:
+                print(f'Could not fetch weather data from OpenMeteo: {e}')
+
+        return await async_workers.run_blocking(aggregate_provider_responses, city_name, weather_service_responses,
+                                       stage_timer)
     except WeatherApiCityNotFoundError:
         raise CityWeatherDataCityNotFoundError()
     except WeatherApiRequestError as e:
         raise CityWeatherDataRequestError(e)
+
+
+async def fetch_city_weather_data_batch_async(city_names: List[str], max_concurrency: int = BATCH_FETCH_MAX_WORKERS,
+                                              stage_timer: StageTimer = NULL_STAGE_TIMER,
+                                              deadline: Deadline = NO_DEADLINE) \
+        -> Dict[str, CityWeatherData | CityWeatherDataFetchError]:
+    """Asynchronous variant of fetch_city_weather_data_batch, with the same results and batched OpenMeteo request.
+
+        Args:
+            city_names: The names of the cities to query.
+            max_concurrency: Maximum number of cities fetched concurrently.
+            stage_timer: The invocation's stage timer, which accumulates the stages of every city.
+            deadline: The request's deadline.
+    """
+    unique_city_names = utils.remove_city_name_dups(city_names)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get_coordinates(city_name: str) -> Optional[Tuple[float, float]]:
+        async with semaphore:
+            return await async_workers.run_blocking(get_uncached_city_coordinates, city_name, stage_timer)
+
+    coordinates_by_city = dict(zip(unique_city_names, await asyncio.gather(*map(get_coordinates, unique_city_names))))
+    open_meteo_fetches = {}
+    open_meteo_city_names = get_open_meteo_batch_city_names(coordinates_by_city, deadline)
+    if open_meteo_city_names:
+        batch_task = asyncio.ensure_future(timed_provider_call_async(
+            stage_timer, "open_meteo", open_meteo.fetch_data_open_meteo_batch_async,
+            [coordinates_by_city[city_name] for city_name in open_meteo_city_names], deadline))
+        open_meteo_fetches = {city_name: functools.partial(get_open_meteo_batch_response_async, batch_task, index)
+                              for index, city_name in enumerate(open_meteo_city_names)}
+
+    async def fetch(city_name: str) -> CityWeatherData | CityWeatherDataFetchError:
+        async with semaphore:
+            try:
+                return await fetch_city_weather_data_async(city_name, coordinates_by_city[city_name], stage_timer,
+                                                           deadline, open_meteo_fetches.get(city_name))
+            except CityWeatherDataFetchError as e:
+                print(f"City Weather data fetching of '{city_name}' failed: {e!r}")
+                return e
+
+    return dict(zip(unique_city_names, await asyncio.gather(*map(fetch, unique_city_names))))
@@ -0,0 +1,72 @@
+"""RequestIPLogs History Compaction Tool.
+
+Trims the 'recent_cities' history of every RequestIPLogs item holding more than
+a given number of entries, keeping the most recent ones. This migrates items
+written before the history was capped, which may have grown towards DynamoDB's
+400 KB item size limit.
+
+The table is scanned with a filter on the list size, and each oversized item is
+trimmed through conditional updates (see lambda_function.trim_recent_cities_in_db),
+so the tool is safe to run while the service is live, and may be re-run.
+
+Usage:
+    python compact_recent_cities.py [--max-length 20] [--dry-run]
+"""
+
+import argparse
+from typing import Iterator, Tuple
+
+import lambda_function
+
+
+def scan_oversized_items(max_length: int) -> Iterator[Tuple[str, int]]:
+    """Yields (ip, history_length) for every item whose 'recent_cities' list exceeds max_length entries."""
+    scan_kwargs = {
+        'ProjectionExpression': 'ip, recent_cities',
+        'FilterExpression': 'size(recent_cities) > :n',
+        'ExpressionAttributeValues': {':n': max_length},
+    }
+
+    ip_table = lambda_function.get_ip_table()
+    while True:
+        response = ip_table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            yield item['ip'], len(item['recent_cities'])
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def compact_item(ip: str, stored_length: int, max_length: int) -> bool:
+    """Trims an item's history down to max_length entries, returning whether it fully succeeded."""
+    while stored_length is not None and stored_length > max_length:
+        stored_length = lambda_function.trim_recent_cities_in_db(ip, stored_length, max_length)
+    return stored_length is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-length", type=int, default=lambda_function.RECENT_CITIES_MAX_LENGTH,
+                        help="Number of most recent cities to keep per IP.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the oversized items.")
+    args = parser.parse_args()
+
+    found = compacted = failed = 0
+    for ip, stored_length in scan_oversized_items(args.max_length):
+        found += 1
+        print(f"{ip}: {stored_length} entries")
+        if args.dry_run:
+            continue
+
+        if compact_item(ip, stored_length, args.max_length):
+            compacted += 1
+        else:
+            # typically a concurrent request changed the list; re-run the tool to retry
+            failed += 1
+
+    print(f"Oversized items: {found}, compacted: {compacted}, failed: {failed}")
+
+
+if __name__ == "__main__":
+    main()
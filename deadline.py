@@ -0,0 +1,81 @@
+"""Request Deadlines Derived From the Lambda Context.
+
+A Lambda invocation is killed once its timeout is reached, and the client then gets no
+response at all. The handler therefore derives a deadline from the context's remaining
+time, minus a safety margin kept to build and return the response, and passes it down
+to the DynamoDB calls and the provider fetches, which:
+    - cap their timeouts to the remaining budget (and give up when almost nothing is left),
+    - skip optional stages (the Open-Meteo enrichment, the trim of an IP's city history)
+      when less than DEADLINE_OPTIONAL_STAGE_MIN_MS is left.
+
+Configuration (environment variables):
+    DEADLINE_SAFETY_MARGIN_MS: Time kept to build and return the response (default 300).
+    DEADLINE_MIN_CALL_BUDGET_MS: Budget under which a call is not even started (default 100).
+    DEADLINE_OPTIONAL_STAGE_MIN_MS: Budget under which optional stages are skipped (default 1000).
+"""
+
+import math
+import os
+import time
+from typing import Callable, Tuple
+
+DEADLINE_SAFETY_MARGIN_SECONDS = float(os.getenv('DEADLINE_SAFETY_MARGIN_MS', 300)) / 1000
+DEADLINE_MIN_CALL_BUDGET_SECONDS = float(os.getenv('DEADLINE_MIN_CALL_BUDGET_MS', 100)) / 1000
+DEADLINE_OPTIONAL_STAGE_MIN_SECONDS = float(os.getenv('DEADLINE_OPTIONAL_STAGE_MIN_MS', 1000)) / 1000
+
+
+class DeadlineExceededError(Exception):
+    """Raised in place of starting a call when too little of the request's budget is left."""
+    def __init__(self, remaining_seconds: float):
+        super().__init__(f"Request deadline exceeded ({remaining_seconds * 1000:.0f} ms left)")
+        self.remaining_seconds = remaining_seconds
+
+
+class Deadline:
+    """The point in time by which a request must have been answered."""
+    def __init__(self, budget_seconds: float, clock: Callable[[], float] = time.monotonic):
+        """Starts a deadline.
+
+            Args:
+                budget_seconds: Time from now to the deadline (math.inf for none).
+                clock: Monotonic time source (replaceable in tests).
+        """
+        self._clock = clock
+        self._expires_at = clock() + budget_seconds
+
+    def remaining_seconds(self) -> float:
+        """Returns the time left before the deadline, in seconds (0 once it has passed)."""
+        return max(0.0, self._expires_at - self._clock())
+
+    def has_budget(self, seconds: float = DEADLINE_OPTIONAL_STAGE_MIN_SECONDS) -> bool:
+        """Returns whether at least the given time is left, by default the budget of an optional stage."""
+        return self.remaining_seconds() >= seconds
+
+    def cap_timeout(self, timeout: Tuple[float, float]) -> Tuple[float, float]:
+        """Caps a (connect, read) timeout tuple to the remaining budget.
+
+            Raises:
+                DeadlineExceededError: If less than DEADLINE_MIN_CALL_BUDGET_MS is left.
+        """
+        remaining_seconds = self.remaining_seconds()
+        if remaining_seconds < DEADLINE_MIN_CALL_BUDGET_SECONDS:
+            raise DeadlineExceededError(remaining_seconds)
+        return min(timeout[0], remaining_seconds), min(timeout[1], remaining_seconds)
+
+
+# The deadline of calls made outside of a request (tools, jobs), which never expires
+NO_DEADLINE = Deadline(math.inf)
+
+
+def create_deadline(context) -> Deadline:
+    """Returns the deadline of an invocation: its remaining time, minus DEADLINE_SAFETY_MARGIN_MS.
+
+        Args:
+            context: The Lambda context object (or the server's stand-in). NO_DEADLINE is returned when
+                it does not report its remaining time.
+    """
+    get_remaining_time_in_millis = getattr(context, 'get_remaining_time_in_millis', None)
+    if get_remaining_time_in_millis is None:
+        return NO_DEADLINE
+
+    return Deadline(get_remaining_time_in_millis() / 1000 - DEADLINE_SAFETY_MARGIN_SECONDS)
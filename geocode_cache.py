@@ -0,0 +1,186 @@
+"""City Geocoding Cache Module.
+
+This module maps normalized city names to their (latitude, longitude) coordinates,
+so that a city's location is known without a round trip to the primary provider
+and the coordinate-based providers (OpenMeteo) can be queried immediately.
+
+The cache has two tiers:
+    1. An in-process LRU tier, living across warm invocations of the same container.
+    2. An optional persistent tier, shared by every container using the same store:
+       a DynamoDB table, or a local SQLite file stand-in (e.g. for local runs and tests).
+
+Configuration (environment variables):
+    GEOCODE_CACHE_BACKEND: 'memory' (in-process tier only, default), 'sqlite' or 'dynamodb'.
+    GEOCODE_CACHE_MAX_SIZE: Maximum number of entries of the in-process tier (default 4096).
+    GEOCODE_CACHE_SQLITE_PATH: SQLite file of the 'sqlite' backend (default '<tmp>/geocode_cache.sqlite3').
+    GEOCODE_CACHE_TABLE: DynamoDB table of the 'dynamodb' backend, with 'city' as the
+        Partition Key (default 'CityGeocodes').
+"""
+
+import abc
+import os
+import sqlite3
+import tempfile
+import threading
+from decimal import Decimal
+from typing import Optional, Tuple
+
+import aws_clients
+import utils
+from cache import LRUCache
+
+Coordinates = Tuple[float, float]
+
+DEFAULT_MAX_SIZE = 4096
+DEFAULT_TABLE_NAME = "CityGeocodes"
+
+
+class GeocodeStore(abc.ABC):
+    """Interface of a persistent geocode store, keyed by normalized city name.
+
+        Implementations must never raise on storage failures: a failed lookup is
+        reported as a miss and a failed write is dropped, as the cache is only an optimization.
+    """
+    @abc.abstractmethod
+    def get(self, city_key: str) -> Optional[Coordinates]:
+        """Returns the stored coordinates of a normalized city name, or None if absent."""
+
+    @abc.abstractmethod
+    def put(self, city_key: str, coordinates: Coordinates):
+        """Stores the coordinates of a normalized city name."""
+
+
+class SqliteGeocodeStore(GeocodeStore):
+    """A GeocodeStore backed by a local SQLite file."""
+    def __init__(self, path: str):
+        """Opens (and creates if needed) the SQLite database at path."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS geocodes "
+                                     "(city TEXT PRIMARY KEY, latitude REAL NOT NULL, longitude REAL NOT NULL)")
+
+    def get(self, city_key: str) -> Optional[Coordinates]:
+        try:
+            with self._lock:
+                row = self._connection.execute("SELECT latitude, longitude FROM geocodes WHERE city = ?",
+                                               (city_key,)).fetchone()
+            return (row[0], row[1]) if row else None
+        except sqlite3.Error as e:
+            print(f"Error reading geocode of '{city_key}' from SQLite: {e}")
+            return None
+
+    def put(self, city_key: str, coordinates: Coordinates):
+        try:
+            with self._lock, self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO geocodes (city, latitude, longitude) "
+                                         "VALUES (?, ?, ?)", (city_key, *coordinates))
+        except sqlite3.Error as e:
+            print(f"Error writing geocode of '{city_key}' to SQLite: {e}")
+
+
+class DynamoDbGeocodeStore(GeocodeStore):
+    """A GeocodeStore backed by a DynamoDB table with 'city' as the Partition Key."""
+    def __init__(self, table_name: str):
+        """Binds the store to a DynamoDB table. boto3 is imported here, only when this backend is used."""
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        # Client errors are the service's answers, BotoCore errors the SDK's own (e.g. a connection failure)
+        self._errors = (ClientError, BotoCoreError)
+        self.table = aws_clients.get_dynamodb_table(table_name)
+
+    def get(self, city_key: str) -> Optional[Coordinates]:
+        try:
+            item = self.table.get_item(Key={'city': city_key}).get('Item')
+            return (float(item['latitude']), float(item['longitude'])) if item else None
+        except self._errors as e:
+            print(f"Error reading geocode of '{city_key}' from DynamoDB: {e}")
+            return None
+
+    def put(self, city_key: str, coordinates: Coordinates):
+        try:
+            # DynamoDB numbers must be passed as Decimals
+            self.table.put_item(Item={'city': city_key,
+                                      'latitude': Decimal(str(coordinates[0])),
+                                      'longitude': Decimal(str(coordinates[1]))})
+        except self._errors as e:
+            print(f"Error writing geocode of '{city_key}' to DynamoDB: {e}")
+
+
+class GeocodeCache:
+    """A two-tier (in-process LRU, then optional persistent store) cache of city coordinates."""
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, store: Optional[GeocodeStore] = None):
+        """Initializes the cache.
+
+            Args:
+                max_size: Maximum number of entries of the in-process tier.
+                store: The persistent tier, or None for an in-process only cache.
+        """
+        self.store = store
+        self._memory = LRUCache(max_size)
+
+    def get(self, city_name: str) -> Optional[Coordinates]:
+        """Returns the cached coordinates of a city, or None if they are unknown.
+
+            The in-process tier is consulted first; a persistent tier hit is promoted into it.
+        """
+        city_key = utils.normalize_city_name(city_name)
+        coordinates = self._memory.get(city_key)
+
+        if coordinates is None and self.store is not None:
+            coordinates = self.store.get(city_key)
+            if coordinates is not None:
+                self._memory.put(city_key, coordinates)
+
+        return coordinates
+
+    def put(self, city_name: str, latitude: float, longitude: float):
+        """Caches the coordinates of a city in both tiers. Unchanged coordinates are not rewritten."""
+        city_key = utils.normalize_city_name(city_name)
+        coordinates = (latitude, longitude)
+
+        if self._memory.get(city_key) == coordinates:
+            return
+
+        self._memory.put(city_key, coordinates)
+        if self.store is not None:
+            self.store.put(city_key, coordinates)
+
+    def clear(self):
+        """Clears the in-process tier. The persistent tier is left untouched."""
+        self._memory.clear()
+
+
+def create_store_from_env() -> Optional[GeocodeStore]:
+    """Creates the persistent geocode store selected by the GEOCODE_CACHE_BACKEND environment variable.
+
+        Raises:
+            ValueError: If GEOCODE_CACHE_BACKEND holds an unknown backend name.
+    """
+    backend = os.getenv('GEOCODE_CACHE_BACKEND', 'memory').lower()
+
+    if backend == 'memory':
+        return None
+    elif backend == 'sqlite':
+        return SqliteGeocodeStore(os.getenv('GEOCODE_CACHE_SQLITE_PATH',
+                                            os.path.join(tempfile.gettempdir(), "geocode_cache.sqlite3")))
+    elif backend == 'dynamodb':
+        return DynamoDbGeocodeStore(os.getenv('GEOCODE_CACHE_TABLE', DEFAULT_TABLE_NAME))
+    else:
+        raise ValueError(f"Unknown GEOCODE_CACHE_BACKEND: {backend!r}")
+
+
+_geocode_cache: Optional[GeocodeCache] = None
+_geocode_cache_lock = threading.Lock()
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """Returns the process-wide GeocodeCache, creating it from the environment on first use."""
+    global _geocode_cache
+    if _geocode_cache is None:
+        with _geocode_cache_lock:
+            if _geocode_cache is None:
+                _geocode_cache = GeocodeCache(int(os.getenv('GEOCODE_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE)),
+                                              create_store_from_env())
+    return _geocode_cache
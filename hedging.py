@@ -0,0 +1,131 @@
+"""Hedged Requests.
+
+A hedged call starts a request and, if it has not completed after a delay, starts a
+duplicate one; the first to succeed wins. Setting the delay to a high percentile of the
+observed latencies (e.g. p95) means only the slowest few percent of calls are duplicated,
+while their latency drops to roughly that of the faster of two requests.
+
+The losing request cannot be cancelled: it completes in the background, and its
+connection returns to the pool.
+"""
+
+import math
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+
+class LatencyTracker:
+    """Keeps the most recent latencies of a call, to derive its percentiles.
+
+        Attributes:
+            window_size: Number of most recent latencies kept.
+    """
+    def __init__(self, window_size: int = 200):
+        self.window_size = window_size
+        self._latencies = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """Records a latency, in seconds."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._latencies)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Returns the nearest-rank percentile of the recorded latencies, or None if nothing was recorded."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[max(1, math.ceil(len(latencies) * percent / 100)) - 1]
+
+
+class HedgingPolicy:
+    """Decides when to start the duplicate of a call, and counts the hedges.
+
+        Until min_samples latencies were recorded, the hedge delay is initial_delay_seconds;
+        it is then the given percentile of the recent latencies, but at least min_delay_seconds.
+
+        Attributes:
+            hedged: Number of calls for which a duplicate was started.
+            hedge_wins: Number of calls won by the duplicate.
+    """
+    def __init__(self, percentile: float = 95.0, initial_delay_seconds: float = 0.3,
+                 min_delay_seconds: float = 0.05, min_samples: int = 20, window_size: int = 200):
+        self.percentile = percentile
+        self.initial_delay_seconds = initial_delay_seconds
+        self.min_delay_seconds = min_delay_seconds
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window_size)
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def record_hedge(self, won: bool):
+        """Counts a call for which a duplicate was started, and whether the duplicate won."""
+        with self._lock:
+            self.hedged += 1
+            self.hedge_wins += won
+
+    def get_delay_seconds(self) -> float:
+        """Returns the time to wait for a call before starting its duplicate."""
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay_seconds
+        return max(self.min_delay_seconds, self.latencies.percentile(self.percentile))
+
+    def stats(self) -> dict:
+        """Returns the current hedge delay and the hedge counters."""
+        return {"delay_ms": round(self.get_delay_seconds() * 1000, 1), "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins}
+
+
+def hedged_call(executor: ThreadPoolExecutor, policy: HedgingPolicy, function: Callable[[], Any],
+                is_success: Callable[[Any], bool] = lambda result: True) -> Any:
+    """Calls function, starting a duplicate call if the first is still running after the policy's delay.
+
+        Args:
+            executor: Pool the calls run on (the caller waits for them).
+            policy: The hedging policy, whose counters are updated.
+            function: The call to make; it must be safe to run twice (e.g. an idempotent GET).
+            is_success: Tells whether a result is a success (e.g. not a 5xx response). A result that is not
+                counts as a failure, so that the other call is waited for.
+
+        Returns:
+            The result of the first call to succeed or, if every call failed and one of them returned, the
+            first result returned.
+
+        Raises:
+            The exception of the last call to fail, if every call raised. A call failing before the
+            hedge delay is returned (raised) right away, without starting a duplicate.
+    """
+    primary = executor.submit(function)
+    done, _ = wait([primary], timeout=policy.get_delay_seconds())
+    if done:
+        return primary.result()
+
+    hedge = executor.submit(function)
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    failed_result: Optional[Future] = None
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            future_error = future.exception()
+            if future_error is not None:
+                error = future_error
+            elif is_success(future.result()):
+                policy.record_hedge(won=future is hedge)
+                return future.result()
+            elif failed_result is None:
+                failed_result = future
+
+    policy.record_hedge(won=False)
+    if failed_result is not None:
+        return failed_result.result()
+    raise error
@@ -0,0 +1,160 @@
+"""Shared HTTP Transport Module for the weather service providers.
+
+This module owns the pooled, keep-alive HTTP sessions used by the provider
+modules (weather_api, open_meteo). Sessions are created once per provider at
+module level, so on a warm Lambda container the DNS lookup, TCP connect and
+TLS handshake of a previous invocation are reused instead of being paid on
+every request.
+
+Configuration (environment variables, read once at first use):
+    PROVIDER_HTTP_POOL_SIZE: Maximum number of pooled connections per host (default 10).
+    PROVIDER_HTTP_CONNECT_TIMEOUT: Connect timeout in seconds (default 3.05).
+    PROVIDER_HTTP_READ_TIMEOUT: Read timeout in seconds (default 10).
+    <PROVIDER>_CONNECT_TIMEOUT, <PROVIDER>_READ_TIMEOUT: Per-provider overrides of the timeouts
+        (e.g. WEATHER_API_READ_TIMEOUT, OPEN_METEO_CONNECT_TIMEOUT).
+    PROVIDER_HTTP_MAX_RETRIES: Retries on connection errors and 502/503/504 responses (default 2).
+"""
+
+import math
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from deadline import Deadline
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 3.05
+DEFAULT_READ_TIMEOUT_SECONDS = 10.0
+DEFAULT_MAX_RETRIES = 2
+
+RETRY_STATUS_CODES = (502, 503, 504)
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_pool_size() -> int:
+    """Returns the configured maximum number of pooled connections per provider host."""
+    return int(os.getenv('PROVIDER_HTTP_POOL_SIZE', DEFAULT_POOL_SIZE))
+
+
+def get_timeout(provider_name: Optional[str] = None) -> Tuple[float, float]:
+    """Returns the configured (connect, read) timeout tuple, as accepted by requests.
+
+        Args:
+            provider_name: The provider (e.g. 'weather_api') whose <PROVIDER>_CONNECT_TIMEOUT and
+                <PROVIDER>_READ_TIMEOUT overrides apply, if any.
+    """
+    connect_timeout = os.getenv('PROVIDER_HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT_SECONDS)
+    read_timeout = os.getenv('PROVIDER_HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT_SECONDS)
+
+    if provider_name is not None:
+        connect_timeout = os.getenv(f'{provider_name.upper()}_CONNECT_TIMEOUT', connect_timeout)
+        read_timeout = os.getenv(f'{provider_name.upper()}_READ_TIMEOUT', read_timeout)
+
+    return float(connect_timeout), float(read_timeout)
+
+
+def get_max_retries() -> int:
+    """Returns the configured number of retries of a failed provider request."""
+    return int(os.getenv('PROVIDER_HTTP_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+
+
+def get_deadline_bound_request(provider_name: str, deadline: Deadline) \
+        -> Tuple[requests.Session, Tuple[float, float], bool]:
+    """Returns the session and (connect, read) timeout of a provider call, fitted to the request deadline.
+
+        A call whose every attempt (PROVIDER_HTTP_MAX_RETRIES + 1 of them, each taking up to its connect
+        plus read timeout) fits in the remaining budget is made with the configured timeouts, on the
+        retrying session. Otherwise it is made once, on the provider's single-attempt session, its
+        connect plus read timeout scaled down to fit in the remaining budget if needed.
+
+        Returns:
+            A tuple containing (session, timeout, capped), capped telling whether the timeout was cut short.
+
+        Raises:
+            DeadlineExceededError: If too little of the budget is left to start the call.
+    """
+    timeout = get_timeout(provider_name)
+    remaining_seconds = deadline.remaining_seconds()
+    attempt_seconds = timeout[0] + timeout[1]
+    if math.isinf(remaining_seconds) or (get_max_retries() + 1) * attempt_seconds <= remaining_seconds:
+        return get_session(provider_name), timeout, False
+
+    deadline.cap_timeout(timeout)  # raises when too little is left to start the call
+    if attempt_seconds <= remaining_seconds:
+        return get_session(provider_name, retries=False), timeout, False
+
+    scale = remaining_seconds / attempt_seconds
+    return get_session(provider_name, retries=False), (timeout[0] * scale, timeout[1] * scale), True
+
+
+def is_provider_failure(error: requests.exceptions.RequestException) -> bool:
+    """Returns whether a request error reflects an unhealthy provider (no response, or a 5xx one).
+
+        Client errors (4xx), such as an unknown city, are answers of a healthy provider.
+    """
+    return error.response is None or error.response.status_code >= 500
+
+
+def create_session(retries: bool = True) -> requests.Session:
+    """Creates a new keep-alive session with a bounded connection pool and a retry adapter.
+
+        Retries only cover idempotent GET requests that failed to connect or returned a
+        gateway-level 5xx status. Client errors (4xx) are never retried, so provider-specific
+        error payloads (e.g. WeatherAPI's 'city not found') reach the caller untouched.
+
+        Args:
+            retries: Whether failed requests are retried (PROVIDER_HTTP_MAX_RETRIES times) or not at all.
+
+        Returns:
+            A configured requests.Session instance.
+    """
+    pool_size = get_pool_size()
+    retry = Retry(total=get_max_retries() if retries else 0,
+                  backoff_factor=0.1,
+                  status_forcelist=RETRY_STATUS_CODES,
+                  allowed_methods=frozenset(["GET"]),
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(provider_name: str, retries: bool = True) -> requests.Session:
+    """Returns the pooled session of a provider, creating it on first use.
+
+        The session lives for the lifetime of the process (i.e. across warm Lambda invocations).
+
+        Args:
+            provider_name: A stable identifier of the provider (e.g. 'weather_api').
+            retries: Whether to return the provider's retrying session, or its single-attempt one
+                (used for calls whose timeout was cut short by the request deadline).
+
+        Returns:
+            The provider's shared requests.Session instance.
+    """
+    session_key = provider_name if retries else f"{provider_name}:no_retries"
+    session = _sessions.get(session_key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(session_key)
+            if session is None:
+                session = create_session(retries)
+                _sessions[session_key] = session
+    return session
+
+
+def close_sessions():
+    """Closes every pooled session, releasing their connections. Sessions are recreated on next use."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
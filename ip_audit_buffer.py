@@ -0,0 +1,190 @@
+"""Write-Behind Buffering of the IP Audit Trail.
+
+By default, the audit trail update (last access time and city history) is written
+synchronously to DynamoDB before the response is returned. In write-behind mode,
+the handler instead records the update in this per-container buffer and returns
+immediately; a background thread writes the buffered updates to DynamoDB in batches:
+    - on size: as soon as IP_AUDIT_FLUSH_MAX_BATCH distinct IPs are pending,
+    - on age: at most IP_AUDIT_FLUSH_MAX_AGE_SECONDS after an update was buffered,
+    - at the end of an invocation, once the oldest update is due (see flush_if_due),
+    - on shutdown: at interpreter exit and on SIGTERM.
+Updates of the same IP buffered between two flushes are coalesced into a single write.
+
+The previous access time and history returned to clients come from the container's
+local view of each IP, which is loaded from DynamoDB the first time the container
+sees the IP (and again once the view is older than IP_AUDIT_VIEW_TTL_SECONDS).
+
+Durability trade-off, compared with the synchronous write:
+    - Buffered updates are lost if the container dies without a clean shutdown
+      (crash, out-of-memory, function timeout), i.e. up to IP_AUDIT_FLUSH_MAX_BATCH
+      IPs worth of history.
+    - Lambda freezes the process as soon as the handler returns, background thread
+      included. The handler therefore flushes the due updates before returning, but
+      updates younger than IP_AUDIT_FLUSH_MAX_AGE_SECONDS when the last invocation
+      before a freeze returns are written when the container is thawed by its next
+      invocation, or at shutdown (Lambda only delivers SIGTERM to functions with a
+      registered extension), so they can reach DynamoDB late, or never if the
+      container is reclaimed without SIGTERM.
+    - A write that fails (or raises) is logged and dropped, not retried.
+    - The local view ignores requests served by other containers since it was loaded,
+      so the reported previous access time and history can lag behind for IPs spread
+      over several containers.
+The synchronous mode has none of these issues and remains the default.
+"""
+
+import atexit
+import signal
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cache import LRUCache
+
+# (last_access_timestamp, recent_cities) of an IP, as known by this container
+IpFields = Tuple[Optional[int], List[str]]
+
+
+class PendingIpUpdate:
+    """The coalesced, not yet written audit trail updates of a single IP.
+
+        Attributes:
+            last_access_timestamp: The most recent access time recorded.
+            new_cities: The cities recorded since the last flush, most recent first.
+            buffered_at: Monotonic time at which the first of these updates was buffered.
+    """
+    def __init__(self, last_access_timestamp: int, buffered_at: float):
+        self.last_access_timestamp = last_access_timestamp
+        self.new_cities: List[str] = []
+        self.buffered_at = buffered_at
+
+
+class IpAuditWriteBuffer:
+    """A per-container buffer of audit trail updates, written to the database behind the responses."""
+    def __init__(self, write_function: Callable[[str, int, List[str]], bool], max_batch_size: int = 25,
+                 max_age_seconds: float = 5.0, view_max_size: int = 4096, view_ttl_seconds: float = 300.0):
+        """Initializes the buffer. The background flusher thread is started on the first recorded update.
+
+            Args:
+                write_function: Writes the coalesced updates of one IP, given (ip, last_access_timestamp,
+                    new_cities most recent first), and returns whether the write succeeded.
+                max_batch_size: Number of pending IPs that triggers a flush.
+                max_age_seconds: Maximum time an update stays buffered while the process is running.
+                view_max_size: Maximum number of IPs kept in the local view.
+                view_ttl_seconds: Time after which an IP's local view is reloaded from the database.
+        """
+        self.write_function = write_function
+        self.max_batch_size = max_batch_size
+        self.max_age_seconds = max_age_seconds
+        self.view_ttl_seconds = view_ttl_seconds
+        self._view = LRUCache(view_max_size)
+        self._pending: Dict[str, PendingIpUpdate] = {}
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def get_known_fields(self, ip: str) -> Optional[IpFields]:
+        """Returns this container's view of an IP's audit trail, or None if it must be loaded from the database."""
+        return self._view.get(ip)
+
+    def record(self, ip: str, last_access_timestamp: int, new_cities: List[str], recent_cities: List[str]):
+        """Buffers an access of an IP and updates the local view of its audit trail.
+
+            Args:
+                ip: The client's IP address.
+                last_access_timestamp: The access time (Unix epoch seconds).
+                new_cities: The requested cities (a single one, unless the request was a batch).
+                recent_cities: The IP's history including new_cities, to serve as the local view.
+        """
+        self._view.put(ip, (last_access_timestamp, recent_cities), time.time() + self.view_ttl_seconds)
+
+        with self._condition:
+            pending = self._pending.get(ip)
+            if pending is None:
+                pending = self._pending[ip] = PendingIpUpdate(last_access_timestamp, time.monotonic())
+            pending.last_access_timestamp = max(pending.last_access_timestamp, last_access_timestamp)
+            pending.new_cities[:0] = new_cities
+
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name="ip-audit-flusher", daemon=True)
+                self._flusher.start()
+            # wake the flusher up when it must flush now, or start timing the age of a new batch
+            if len(self._pending) >= self.max_batch_size or len(self._pending) == 1:
+                self._condition.notify()
+
+    def pending_count(self) -> int:
+        """Returns the number of IPs with buffered, not yet written updates."""
+        with self._condition:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Synchronously writes every buffered update, returning the number of failed writes."""
+        with self._flush_lock:
+            with self._condition:
+                batch, self._pending = self._pending, {}
+
+            failures = 0
+            for ip, pending in batch.items():
+                try:
+                    success = self.write_function(ip, pending.last_access_timestamp, pending.new_cities)
+                except Exception as e:
+                    # the flusher thread must survive, or the buffer would grow without bound
+                    print(f"Error writing buffered audit trail updates of IP {ip}: {e!r}")
+                    success = False
+                if not success:
+                    print(f"Dropping {len(pending.new_cities)} buffered audit trail update(s) of IP {ip}")
+                    failures += 1
+
+            if batch:
+                print(f"Flushed audit trail updates of {len(batch)} IP(s), {failures} failure(s)")
+            return failures
+
+    def flush_if_due(self) -> int:
+        """Synchronously writes every buffered update if a flush is due, returning the number of failed writes.
+
+            Meant to be called at the end of an invocation, since the flusher thread is frozen with the process.
+        """
+        with self._condition:
+            if not self._should_flush():
+                return 0
+        return self.flush()
+
+    def _run_flusher(self):
+        while True:
+            with self._condition:
+                while not self._should_flush():
+                    self._condition.wait(timeout=self._seconds_until_oldest_is_due())
+            self.flush()
+
+    def _should_flush(self) -> bool:
+        # called with self._condition held
+        return len(self._pending) >= self.max_batch_size or \
+            (len(self._pending) > 0 and self._seconds_until_oldest_is_due() <= 0)
+
+    def _seconds_until_oldest_is_due(self) -> Optional[float]:
+        # called with self._condition held; None (wait until notified) when nothing is pending
+        if not self._pending:
+            return None
+        oldest = min(pending.buffered_at for pending in self._pending.values())
+        return oldest + self.max_age_seconds - time.monotonic()
+
+    def install_shutdown_hooks(self):
+        """Flushes the buffer at interpreter exit and on SIGTERM (chaining any previous SIGTERM handler).
+
+            On SIGTERM, the process then exits, unless the signal was previously ignored (SIG_IGN).
+            The SIGTERM handler is only installed when called from the main thread, as required by signal.
+        """
+        atexit.register(self.flush)
+
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        def handle_sigterm(signum, frame):
+            self.flush()
+            if callable(previous_handler):
+                previous_handler(signum, frame)
+            elif previous_handler != signal.SIG_IGN:
+                raise SystemExit(0)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
@@ -0,0 +1,42 @@
+"""JSON Encoding of Response Bodies.
+
+Response bodies are encoded in a single pass through this module, which uses orjson
+when it is installed (it is not a required dependency) and the standard library json
+module otherwise. JSON_BACKEND=json forces the standard library.
+
+Both backends produce the same compact output (no whitespace after separators,
+non-ASCII characters emitted as UTF-8), so switching backends does not change the
+bytes clients receive.
+"""
+
+import json
+import os
+
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto').lower()
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if JSON_BACKEND == 'json':
+    orjson = None
+
+
+def get_backend_name() -> str:
+    """Returns the name of the JSON backend in use ('orjson' or 'json')."""
+    return 'orjson' if orjson is not None else 'json'
+
+
+def dumps_bytes(obj) -> bytes:
+    """Encodes a JSON-serializable object as UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dumps(obj) -> str:
+    """Encodes a JSON-serializable object as a JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
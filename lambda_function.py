@@ -10,12 +10,14 @@ manages the end-to-end lifecycle of an HTTP request, including:
 Environment Requirements:
     - DynamoDB Table: 'RequestIPLogs' must exist with 'ip' as the Partition Key.
 """
+import asyncio
+import base64
 import json
 import os
 
-import boto3
 import time
-from typing import Optional, List, Tuple, TYPE_CHECKING
+from typing import Optional, List, Tuple, Dict, TYPE_CHECKING
+from urllib.parse import parse_qs
 
 # makes AWS specific type hinting available in IDE, without bundling the library when deploying to the cloud
 if TYPE_CHECKING:
@@ -23,14 +25,40 @@ if TYPE_CHECKING:
 
 from botocore.exceptions import ClientError
 
+import async_workers
+import aws_clients
+import circuit_breaker
 import city_weather_data
+import deadline as request_deadline
+import json_codec
+import open_meteo
+import stage_timing
 import utils
+from ip_audit_buffer import IpAuditWriteBuffer
+from city_weather_data import CityWeatherData, CityWeatherDataFetchError
 from city_weather_data import CityWeatherDataCityNotFoundError
 from city_weather_data import CityWeatherDataRequestError
+from deadline import NO_DEADLINE, Deadline
+from stage_timing import NULL_STAGE_TIMER, StageTimer
 
-aws_region = os.environ.get('AWS_REGION', 'eu-north-1')
-dynamodb = boto3.resource('dynamodb', region_name=aws_region)
-ip_table = dynamodb.Table("RequestIPLogs")
+IP_TABLE_NAME = aws_clients.IP_TABLE_NAME
+
+# Number of most recent cities kept in an IP's history. DynamoDB cannot append to and truncate the same
+# list in one update expression, so the stored list is allowed to grow up to RECENT_CITIES_TRIM_THRESHOLD
+# entries before a second, conditional update trims it back to RECENT_CITIES_MAX_LENGTH. This costs one
+# extra write every RECENT_CITIES_MAX_LENGTH requests, while keeping the item size bounded.
+RECENT_CITIES_MAX_LENGTH = int(os.environ.get('RECENT_CITIES_MAX_LENGTH', 20))
+RECENT_CITIES_TRIM_THRESHOLD = 2 * RECENT_CITIES_MAX_LENGTH
+# Keeps REMOVE update expressions well below DynamoDB's 4 KB expression size limit
+TRIM_MAX_ENTRIES_PER_UPDATE = 100
+
+# Maximum number of distinct cities of a batch request
+BATCH_MAX_CITIES = int(os.environ.get('BATCH_MAX_CITIES', 200))
+
+
+def get_ip_table():
+    """Returns the RequestIPLogs table, whose client is built on first use (see aws_clients)."""
+    return aws_clients.get_dynamodb_table(IP_TABLE_NAME)
 
 
 def get_request_ip(event: dict) -> Optional[str]:
@@ -38,28 +66,66 @@ def get_request_ip(event: dict) -> Optional[str]:
     return event.get('requestContext', {}).get('http', {}).get('sourceIp', None)
 
 
+def get_request_method(event: dict) -> str:
+    """Extracts the HTTP method from the Lambda Proxy integration event."""
+    return event.get('requestContext', {}).get('http', {}).get('method', 'GET')
+
+
 def get_request_city_param(event: dict) -> Optional[str]:
     """Retrieves the 'city' query string parameter from the incoming request."""
-    return event.get('queryStringParameters', {}).get('city', None)
+    return (event.get('queryStringParameters') or {}).get('city', None)
+
+
+def get_request_cities(event: dict) -> List[str]:
+    """Retrieves every requested city, in request order.
+
+        Cities are read from the 'cities' list of a JSON POST body ({"cities": ["London", "Paris"]}),
+        or from the (possibly repeated) 'city' query string parameter (?city=London&city=Paris).
+        The raw query string is preferred, as Lambda joins repeated parameters with commas in
+        'queryStringParameters', which would be ambiguous with city names such as 'London,UK'.
+
+        Raises:
+            ValueError: If a POST body is not a JSON object holding a list of city name strings.
+    """
+    if get_request_method(event) == "POST":
+        body = event.get('body') or ""
+        if event.get('isBase64Encoded', False):
+            body = base64.b64decode(body).decode('utf-8')
+
+        try:
+            cities = json.loads(body).get('cities', None)
+        except (json.JSONDecodeError, AttributeError):
+            raise ValueError("The request body must be a JSON object.")
+        if type(cities) is not list or not all(type(city) is str for city in cities):
+            raise ValueError("The request body must hold a 'cities' list of city names.")
+
+        return [city for city in cities if city.strip()]
+
+    if event.get('rawQueryString'):
+        return [city for city in parse_qs(event['rawQueryString']).get('city', []) if city.strip()]
+
+    city = get_request_city_param(event)
+    return [city] if city else []
 
 
-def get_unique_recent_cities_list(recent_cities: List[str]) -> List[str]:
+def get_unique_recent_cities_list(recent_cities: List[str], num_current_cities: int = 1) -> List[str]:
     """
         Processes the raw city history to return a list of past searches with no identical adjacent entries.
 
-        This function takes a list of city names, excludes the first element
+        This function takes a list of city names, excludes the first elements
         (the current search), and removes any consecutive duplicate entries
         while maintaining the order of search history.
 
         Args:
             recent_cities (List[str]): A list of city name strings retrieved
                 from the database or session history.
+            num_current_cities (int): The number of cities of the current search (more than one for a batch).
 
         Returns:
             List[str]: A list of past searches with no identical adjacent entries, excluding the most
-                recent entry.
+                recent entries.
     """
-    return utils.remove_adjacent_dups(recent_cities[1:])
+    return utils.remove_adjacent_dups(recent_cities[num_current_cities:])
 
 
 def get_response(status_code: int, context: "Context", content_type: str = "application/json", **kwargs) -> dict:
@@ -69,7 +135,8 @@ def get_response(status_code: int, context: "Context", content_type: str = "appl
             status_code: HTTP status code to return.
             context: AWS Lambda context object (used for Request ID).
             content_type: MIME type for the response header.
-            **kwargs: Arbitrary key-value pairs to include in the JSON body.
+            **kwargs: Arbitrary key-value pairs to include in the JSON body. Values must be
+                JSON-serializable objects (e.g. CityWeatherData.to_dict()), the body being encoded once.
 
         Returns:
             A dictionary formatted as an AWS Lambda HTTP response.
@@ -80,46 +147,90 @@ def get_response(status_code: int, context: "Context", content_type: str = "appl
             'Content-Type': content_type,
             "X-Request-ID": context.aws_request_id
         },
-        'body': json.dumps({
+        'body': json_codec.dumps({
             "requestId": context.aws_request_id,
         } | kwargs)  # add kwargs to body dict
     }
 
 
-def get_ip_last_accessed_timestamp_from_db(ip) -> Tuple[Optional[int], bool]:
-    """Retrieves the most recent access timestamp for a specific IP from DynamoDB.
+def trim_recent_cities_in_db(ip, stored_length: int, max_length: int = RECENT_CITIES_MAX_LENGTH) -> Optional[int]:
+    """Removes the oldest entries of an IP's 'recent_cities' list beyond max_length.
+
+        At most TRIM_MAX_ENTRIES_PER_UPDATE entries are removed per call, starting from the
+        end of the list. The update is conditioned on the list still holding stored_length
+        entries, so a concurrent prepend makes it fail harmlessly instead of removing the
+        wrong entries; the list is then trimmed by a later call.
 
         Args:
             ip: The client's IP address.
+            stored_length: The number of entries the stored list currently holds.
+            max_length: The number of entries to keep.
 
         Returns:
-            A tuple containing (timestamp_epoch, success_flag).
+            The number of entries left in the stored list, or None if the update failed.
     """
+    new_length = max(max_length, stored_length - TRIM_MAX_ENTRIES_PER_UPDATE)
+    if new_length >= stored_length:
+        return stored_length
+
     try:
-        # Only retrieve the 'LastAccessTimestamp' attribute
-        response = ip_table.get_item(Key={'ip': ip},
-                                     ProjectionExpression='LastAccessTimestamp')
-        last_access_timestamp = response.get('Item', {}).get('LastAccessTimestamp', None)
+        get_ip_table().update_item(
+            Key={
+                'ip': ip
+            },
+            UpdateExpression="REMOVE " + ", ".join(f"recent_cities[{i}]" for i in range(new_length, stored_length)),
+            ConditionExpression="size(recent_cities) = :n",
+            ExpressionAttributeValues={
+                ':n': stored_length
+            }
+        )
+        return new_length
 
-        return (int(last_access_timestamp) if last_access_timestamp else None), True
     except ClientError as e:
-        print(f"Error retrieving LastAccessTimestamp: {e}")
-        return None, False
+        print(f"recent_cities trim failed: {str(e)}")
+        return None
 
 
-def update_ip_fields_in_db(ip, last_access_timestamp: int, new_city: str) \
-        -> Tuple[Optional[int], Optional[List[str]], bool]:
+def get_ip_fields_from_db(ip) -> Tuple[Optional[int], Optional[List[str]], bool]:
+    """Retrieves the user's audit trail (last_access_timestamp and recent_cities) from DynamoDB.
+
+        Returns:
+            A tuple containing (timestamp_epoch, recent_city_list, success_flag).
+    """
+    try:
+        response = get_ip_table().get_item(Key={'ip': ip},
+                                           ProjectionExpression='LastAccessTimestamp, recent_cities')
+        item = response.get('Item', {})
+        last_access_timestamp = item.get('LastAccessTimestamp', None)
+
+        return (int(last_access_timestamp) if last_access_timestamp else None), \
+            item.get('recent_cities', [])[:RECENT_CITIES_MAX_LENGTH], True
+    except ClientError as e:
+        print(f"Error retrieving IP fields: {e}")
+        return None, None, False
+
+
+def update_ip_fields_in_db(ip, last_access_timestamp: int, new_city: str | List[str],
+                           deadline: Deadline = NO_DEADLINE) -> Tuple[Optional[int], Optional[List[str]], bool]:
     """Updates the user's audit trail (last_access_timestamp and recent_cities) in DynamoDB.
 
-        Atomically updates the 'LastAccessTimestamp' and appends the requested
-        city to the IP's aggregated 'recent_cities' list.
+        Atomically updates the 'LastAccessTimestamp' and prepends the requested
+        city (or cities, most recent first) to the IP's aggregated 'recent_cities' list, in a single round trip:
+        the update returns the attributes' previous values, from which the new
+        city history is rebuilt locally. At most RECENT_CITIES_MAX_LENGTH cities are prepended, so a
+        large batch cannot outgrow the trim. Once the stored history exceeds
+        RECENT_CITIES_TRIM_THRESHOLD entries, it is trimmed back to RECENT_CITIES_MAX_LENGTH, unless too
+        little of the request's budget is left (a later request then trims it).
 
         Returns:
-            A tuple containing (updated_timestamp, recent_city_list, success_flag).
+            A tuple containing (previous_timestamp, recent_city_list, success_flag).
+            previous_timestamp is None on the IP's first access, and recent_city_list holds at most
+            RECENT_CITIES_MAX_LENGTH entries, the requested city first.
     """
+    new_cities = (new_city if type(new_city) is list else [new_city])[:RECENT_CITIES_MAX_LENGTH]
+
     try:
-        # 4. Perform the Update
-        response = ip_table.update_item(
+        response = get_ip_table().update_item(
             Key={
                 'ip': ip
             },
@@ -127,20 +238,85 @@ def update_ip_fields_in_db(ip, last_access_timestamp: int, new_city: str) \
                              " recent_cities = list_append(:c, if_not_exists(recent_cities, :empty))",
             ExpressionAttributeValues={
                 ':t': last_access_timestamp,
-                ':c': [new_city],
+                ':c': new_cities,
                 ':empty': []
             },
-            ReturnValues="UPDATED_NEW"
+            ReturnValues="UPDATED_OLD"
         )
-        response_attributes = response['Attributes']
-        print(f"IP fields Update successful: {response_attributes}")
-        return int(response_attributes['LastAccessTimestamp']), response_attributes['recent_cities'], True
+        # 'Attributes' is absent when the IP had no item yet
+        previous_attributes = response.get('Attributes', {})
+        print(f"IP fields Update successful, previous values: {previous_attributes}")
+
+        previous_timestamp = previous_attributes.get('LastAccessTimestamp', None)
+        recent_cities = new_cities + previous_attributes.get('recent_cities', [])
+
+        # a list grown oversized before the cap (see compact_recent_cities.py) takes several trims
+        stored_length = len(recent_cities)
+        while stored_length is not None and stored_length > RECENT_CITIES_TRIM_THRESHOLD and deadline.has_budget():
+            stored_length = trim_recent_cities_in_db(ip, stored_length)
+
+        return (int(previous_timestamp) if previous_timestamp else None), \
+            recent_cities[:RECENT_CITIES_MAX_LENGTH], True
 
     except ClientError as e:
         print(f"LastAccessTimestamp Update failed: {str(e)}")
         return None, None, False
 
 
+def write_buffered_ip_fields_to_db(ip, last_access_timestamp: int, new_cities: List[str]) -> bool:
+    """Writes the coalesced audit trail updates of an IP buffered in write-behind mode."""
+    return update_ip_fields_in_db(ip, last_access_timestamp, new_cities)[2]
+
+
+# Write-behind mode of the audit trail (see ip_audit_buffer for the durability trade-off)
+IP_AUDIT_WRITE_BEHIND = os.environ.get('IP_AUDIT_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+ip_audit_write_buffer: Optional[IpAuditWriteBuffer] = None
+
+if IP_AUDIT_WRITE_BEHIND:
+    ip_audit_write_buffer = IpAuditWriteBuffer(
+        write_buffered_ip_fields_to_db,
+        max_batch_size=int(os.environ.get('IP_AUDIT_FLUSH_MAX_BATCH', 25)),
+        max_age_seconds=float(os.environ.get('IP_AUDIT_FLUSH_MAX_AGE_SECONDS', 5)),
+        view_ttl_seconds=float(os.environ.get('IP_AUDIT_VIEW_TTL_SECONDS', 300)))
+    ip_audit_write_buffer.install_shutdown_hooks()
+
+
+def flush_due_ip_fields_before_freeze():
+    """Writes the buffered audit trail updates that are due, as Lambda freezes the flusher thread once the
+        handler returns. Does nothing in synchronous mode.
+    """
+    if ip_audit_write_buffer is not None:
+        ip_audit_write_buffer.flush_if_due()
+
+
+def record_ip_fields_write_behind(ip, last_access_timestamp: int, new_city: str | List[str],
+                                  stage_timer: StageTimer = NULL_STAGE_TIMER) \
+        -> Tuple[Optional[int], Optional[List[str]], bool]:
+    """Records the user's access in the audit trail write-behind buffer, instead of writing it synchronously.
+
+        The previous access time and history come from the container's local view of the IP,
+        loaded from DynamoDB (one read, timed as the 'dynamodb_read' stage) only the first time
+        the container sees the IP.
+
+        Returns:
+            A tuple containing (previous_timestamp, recent_city_list, success_flag), as update_ip_fields_in_db.
+    """
+    new_cities = new_city if type(new_city) is list else [new_city]
+    known_fields = ip_audit_write_buffer.get_known_fields(ip)
+
+    if known_fields is None:
+        with stage_timer.stage("dynamodb_read"):
+            previous_timestamp, previous_cities, success = get_ip_fields_from_db(ip)
+        if not success:
+            return None, None, False
+    else:
+        previous_timestamp, previous_cities = known_fields
+
+    recent_cities = (new_cities + previous_cities)[:RECENT_CITIES_MAX_LENGTH]
+    ip_audit_write_buffer.record(ip, last_access_timestamp, new_cities, recent_cities)
+    return previous_timestamp, recent_cities, True
+
+
 def handle_missing_parameter_city(context: "Context") -> dict:
     """Returns a formatted HTTP 400 Bad Request response for missing query parameters."""
     return get_response(400, context, error="Bad Request",
@@ -148,6 +324,49 @@ def handle_missing_parameter_city(context: "Context") -> dict:
                         details="Please include ?city=CityName in the request URL.")
 
 
+def handle_invalid_request_body(context: "Context", details: str) -> dict:
+    """Returns a formatted HTTP 400 Bad Request response for malformed batch request bodies."""
+    return get_response(400, context, error="Bad Request",
+                        message="The request body is invalid.",
+                        details=details)
+
+
+def handle_too_many_cities(context: "Context", num_cities: int) -> dict:
+    """Returns a formatted HTTP 400 Bad Request response for batches exceeding BATCH_MAX_CITIES cities."""
+    return get_response(400, context, error="Bad Request",
+                        message="Too many cities were requested.",
+                        details=f"{num_cities} distinct cities were requested, at most {BATCH_MAX_CITIES} are allowed.")
+
+
+def handle_batch_results(context: "Context", results: Dict[str, CityWeatherData | CityWeatherDataFetchError],
+                         last_access_timestamp_message: str, recent_cities: List[str]) -> dict:
+    """Returns a formatted HTTP 200 OK response holding the per-city results and errors of a batch request.
+
+        Every city appears either under 'results' with its weather data (and under 'cache_status' with
+        how it was served), or under 'errors' with the status and error it would have been answered with
+        as a single-city request.
+    """
+    weather_results = {}
+    cache_statuses = {}
+    errors = {}
+
+    for city, result in results.items():
+        if isinstance(result, CityWeatherData):
+            weather_results[city] = result.to_dict()
+            if result.cache_status is not None:
+                cache_statuses[city] = result.cache_status.value
+        elif isinstance(result, CityWeatherDataCityNotFoundError):
+            errors[city] = {"status": 404, "error": "Not found",
+                            "details": f"No matching city was found with the name '{city}'."}
+        else:
+            errors[city] = {"status": 503, "error": "Service Unavailable",
+                            "details": "Please try again later."}
+
+    return get_response(200, context, results=weather_results, cache_status=cache_statuses, errors=errors,
+                        last_access=last_access_timestamp_message,
+                        recent_cities=get_unique_recent_cities_list(recent_cities, len(results)))
+
+
 def handle_city_not_found(context: "Context", city: str, last_access_timestamp_message: str, recent_cities: List[str]) \
         -> dict:
     """Returns a formatted HTTP 404 Not Found response when a city name cannot be resolved
@@ -174,43 +393,135 @@ def handle_service_unavailable_error(context: "Context", last_access_timestamp_m
                         last_access=last_access_timestamp_message)
 
 
+class AuditedRequest:
+    """A validated request, whose access was recorded in the IP audit trail.
+
+        Attributes:
+            cities: The distinct requested cities, in request order.
+            is_batch: Whether the request is answered with per-city results (POST body or several cities).
+            last_access_message: The IP's previous access time (ISO 8601), or "N / A".
+            recent_cities: The IP's city history, including the requested cities.
+    """
+    def __init__(self, cities: List[str], is_batch: bool, last_access_message: str, recent_cities: List[str]):
+        self.cities = cities
+        self.is_batch = is_batch
+        self.last_access_message = last_access_message
+        self.recent_cities = recent_cities
+
+
 def lambda_handler(event, context: "Context") -> dict:
     """The primary execution entry point for the AWS Lambda function.
 
+        Handles the request (see handle_request) within a deadline derived from the invocation's remaining
+        time and, when stage timing is enabled, emits the durations of its stages as a single CloudWatch
+        Embedded Metric Format log record.
+    """
+    stage_timer = stage_timing.create_stage_timer()
+    deadline = request_deadline.create_deadline(context)
+
+    with stage_timer.stage("total"):
+        response = handle_request(event, context, stage_timer, deadline)
+
+    stage_timer.emit({"RequestId": context.aws_request_id, "StatusCode": response['statusCode']})
+    flush_due_ip_fields_before_freeze()
+    return response
+
+
+def handle_request(event, context: "Context", stage_timer: StageTimer = NULL_STAGE_TIMER,
+                   deadline: Deadline = NO_DEADLINE) -> dict:
+    """Handles an HTTP request, recording the duration of its stages.
+
         Execution Flow:
-            1. Parse and validate query parameters.
-            2. Identify client IP and retrieve/update audit trail in DynamoDB.
+            1. Parse and validate query parameters (or the JSON body of a batch request).
+            2. Identify client IP and update its audit trail in DynamoDB, retrieving the previous access in the same call.
             3. Invoke business logic to fetch and aggregate city weather data.
             4. Return a JSON structured HTTP response with city weather results and user history,
-            or an appropriate error status.
+            or an appropriate error status. Batch requests (several cities) are answered with per-city
+            results and errors.
+
+        Args:
+            event: The Lambda Function URL event.
+            context: AWS Lambda context object.
+            stage_timer: The invocation's stage timer. Records the 'parse_request', 'dynamodb_update'
+                (or 'ip_audit_buffer' and 'dynamodb_read' in write-behind mode), 'fetch' and 'serialization'
+                stages, plus the stages of city_weather_data.fetch_city_weather_data.
+            deadline: The request's deadline, passed to the DynamoDB update and the provider fetches. Once it
+                is reached, the weather data fetches fail fast and the request is answered with a 503
+                (per-city errors in a batch).
+
+        Returns:
+            The HTTP response.
+    """
+    error_response, request = prepare_request(event, context, stage_timer, deadline)
+    if error_response is not None:
+        return error_response
+
+    if request.is_batch:
+        with stage_timer.stage("fetch"):
+            results = city_weather_data.fetch_city_weather_data_batch(request.cities, stage_timer=stage_timer,
+                                                                      deadline=deadline)
+        return respond_to_batch(context, request, results, stage_timer)
+
+    try:
+        with stage_timer.stage("fetch"):
+            result = city_weather_data.fetch_city_weather_data(request.cities[0], stage_timer=stage_timer,
+                                                               deadline=deadline)
+    except (CityWeatherDataCityNotFoundError, CityWeatherDataRequestError) as e:
+        result = e
+    return respond_to_single_city(context, request, result, stage_timer)
+
+
+def prepare_request(event, context: "Context", stage_timer: StageTimer = NULL_STAGE_TIMER,
+                    deadline: Deadline = NO_DEADLINE) -> Tuple[Optional[dict], Optional[AuditedRequest]]:
+    """Validates a request and records the access in its IP's audit trail (steps 1 and 2 of handle_request).
+
+        Returns:
+            A tuple containing either (error_response, None) if the request cannot be served,
+            or (None, audited_request).
     """
 
     # update for yml deploy test
-    city = get_request_city_param(event)
+    try:
+        with stage_timer.stage("parse_request"):
+            cities = get_request_cities(event)
+    except ValueError as e:
+        print(f"Request has an invalid body: {e}")
+        return handle_invalid_request_body(context, str(e)), None
 
-    if not city:
+    if not cities:
         print("Request missing 'city' parameter")
-        return handle_missing_parameter_city(context)
+        return handle_missing_parameter_city(context), None
+
+    # a POST body or repeated 'city' parameters make a batch request, answered with per-city results
+    is_batch = get_request_method(event) == "POST" or len(cities) > 1
+    cities = utils.remove_city_name_dups(cities)
+
+    if len(cities) > BATCH_MAX_CITIES:
+        print(f"Request has too many cities: {len(cities)}")
+        return handle_too_many_cities(context, len(cities)), None
 
     request_ip = get_request_ip(event)
 
     if not request_ip:
         print("Request missing ip")
-        return handle_internal_server_error(context)
+        return handle_internal_server_error(context), None
 
     print(f"Received request from IP: {request_ip}")
 
-    prev_last_access_timestamp, success = get_ip_last_accessed_timestamp_from_db(request_ip)
-
-    if not success:
-        return handle_internal_server_error(context)
-
     timestamp_seconds = int(time.time())
 
-    cur_last_access_timestamp, recent_cities, success = update_ip_fields_in_db(request_ip, timestamp_seconds, city)
+    # the audit trail is updated once per request, batches included
+    if ip_audit_write_buffer is not None:
+        with stage_timer.stage("ip_audit_buffer"):
+            prev_last_access_timestamp, recent_cities, success = \
+                record_ip_fields_write_behind(request_ip, timestamp_seconds, cities, stage_timer)
+    else:
+        with stage_timer.stage("dynamodb_update"):
+            prev_last_access_timestamp, recent_cities, success = \
+                update_ip_fields_in_db(request_ip, timestamp_seconds, cities, deadline)
 
     if not success:
-        return handle_internal_server_error(context)
+        return handle_internal_server_error(context), None
 
     prev_last_access_timestamp_message = utils.epoch_timestamp_to_iso_format(prev_last_access_timestamp) \
         if prev_last_access_timestamp else "N / A"
@@ -218,15 +529,99 @@ def lambda_handler(event, context: "Context") -> dict:
     print(f"Previous last access: {prev_last_access_timestamp_message}")
     print(f"Recent cities: {recent_cities}")
 
+    return None, AuditedRequest(cities, is_batch, prev_last_access_timestamp_message, recent_cities)
+
+
+def respond_to_batch(context: "Context", request: AuditedRequest,
+                     results: Dict[str, CityWeatherData | CityWeatherDataFetchError],
+                     stage_timer: StageTimer = NULL_STAGE_TIMER) -> dict:
+    """Builds the response of a batch request from its per-city results (step 4 of handle_request)."""
+    print(f"City weather cache stats: {city_weather_data.get_city_weather_cache_stats()}, "
+          f"fetch coalescing stats: {city_weather_data.get_city_fetch_coalescing_stats()}, "
+          f"OpenMeteo cache stats: {open_meteo.get_open_meteo_cache_stats()}")
+
+    with stage_timer.stage("serialization"):
+        return handle_batch_results(context, results, request.last_access_message, request.recent_cities)
+
+
+def respond_to_single_city(context: "Context", request: AuditedRequest,
+                           result: CityWeatherData | CityWeatherDataCityNotFoundError | CityWeatherDataRequestError,
+                           stage_timer: StageTimer = NULL_STAGE_TIMER) -> dict:
+    """Builds the response of a single-city request from its result or error (step 4 of handle_request)."""
+    city = request.cities[0]
+
+    if isinstance(result, CityWeatherDataCityNotFoundError):
+        print(f'City Weather data fetching failed as city was not found: {result}')
+        return handle_city_not_found(context, city, request.last_access_message, request.recent_cities)
+    if isinstance(result, CityWeatherDataRequestError):
+        print(f'City Weather data fetching failed due to a request error: {result}, '
+              f'provider circuits: {circuit_breaker.get_circuit_breaker_stats()}')
+        return handle_service_unavailable_error(context, request.last_access_message)
+
+    print(f"City weather cache stats: {city_weather_data.get_city_weather_cache_stats()}, "
+          f"fetch coalescing stats: {city_weather_data.get_city_fetch_coalescing_stats()}, "
+          f"OpenMeteo cache stats: {open_meteo.get_open_meteo_cache_stats()}")
+
+    with stage_timer.stage("serialization"):
+        cache_status = {"cache_status": result.cache_status.value} if result.cache_status is not None else {}
+        return get_response(200, context, city=city, weather=result.to_dict(), **cache_status,
+                            last_access=request.last_access_message,
+                            recent_cities=get_unique_recent_cities_list(request.recent_cities))
+
+
+async def lambda_handler_async(event, context: "Context") -> dict:
+    """Asynchronous variant of lambda_handler, to be awaited from a running event loop (e.g. a server)."""
+    stage_timer = stage_timing.create_stage_timer()
+    deadline = request_deadline.create_deadline(context)
+
+    with stage_timer.stage("total"):
+        response = await handle_request_async(event, context, stage_timer, deadline)
+
+    stage_timer.emit({"RequestId": context.aws_request_id, "StatusCode": response['statusCode']})
+    return response
+
+
+async def handle_request_async(event, context: "Context", stage_timer: StageTimer = NULL_STAGE_TIMER,
+                               deadline: Deadline = NO_DEADLINE) -> dict:
+    """Asynchronous variant of handle_request, with the same flow and responses.
+
+        The request validation and audit trail update (blocking DynamoDB calls) run in a worker thread,
+        while the weather data is fetched through the async provider clients.
+    """
+    error_response, request = await async_workers.run_blocking(prepare_request, event, context, stage_timer, deadline)
+    if error_response is not None:
+        return error_response
+
+    if request.is_batch:
+        with stage_timer.stage("fetch"):
+            results = await city_weather_data.fetch_city_weather_data_batch_async(request.cities,
+                                                                                  stage_timer=stage_timer,
+                                                                                  deadline=deadline)
+        return respond_to_batch(context, request, results, stage_timer)
+
     try:
-        weather_data = city_weather_data.fetch_city_weather_data(city)
-
-        return get_response(200, context, city=city, weather=weather_data.to_json(),
-                            last_access=prev_last_access_timestamp_message,
-                            recent_cities=get_unique_recent_cities_list(recent_cities))
-    except CityWeatherDataCityNotFoundError as e:
-        print(f'City Weather data fetching failed as city was not found: {e}')
-        return handle_city_not_found(context, city, prev_last_access_timestamp_message, recent_cities)
-    except CityWeatherDataRequestError as e:
-        print(f'City Weather data fetching failed due to a request error: {e}')
-        return handle_service_unavailable_error(context, prev_last_access_timestamp_message, recent_cities)
+        with stage_timer.stage("fetch"):
+            result = await city_weather_data.fetch_city_weather_data_async(request.cities[0], stage_timer=stage_timer,
+                                                                           deadline=deadline)
+    except (CityWeatherDataCityNotFoundError, CityWeatherDataRequestError) as e:
+        result = e
+    return respond_to_single_city(context, request, result, stage_timer)
+
+
+# Event loop of asyncio_lambda_handler, kept across warm invocations (with its worker threads)
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def asyncio_lambda_handler(event, context: "Context") -> dict:
+    """AWS Lambda entry point serving requests through the async path (lambda_function.asyncio_lambda_handler).
+
+        The Lambda runtime calls handlers synchronously, so the request is run to completion on an
+        event loop owned by the container and reused across invocations.
+    """
+    global _event_loop
+
+    if _event_loop is None:
+        _event_loop = asyncio.new_event_loop()
+    response = _event_loop.run_until_complete(lambda_handler_async(event, context))
+    flush_due_ip_fields_before_freeze()
+    return response
@@ -8,24 +8,61 @@ exception hierarchy to handle API-specific failure modes.
 The module follows a clean separation of concerns:
     1. Exception handling for network and logic errors.
     2. Data modeling via the OpenMeteoResponse class.
-    3. API interaction through the fetch_data_open_meteo function.
+    3. API interaction through the fetch_data_open_meteo function, and its
+       fetch_data_open_meteo_batch variant querying many locations per request.
+
+Open-Meteo data is gridded, so nearby cities (and alternate spellings geocoded to almost the
+same place) get the same data. Coordinates are therefore snapped to a grid of
+OPEN_METEO_GRID_RESOLUTION_DEGREES (by default 0.05°, about 5 km, close to the resolution of
+the finest forecast models), and responses are cached per grid point for
+OPEN_METEO_CACHE_TTL_SECONDS: neighbouring lookups share one upstream call, concurrent ones included.
 """
 
+import os
+import time
+from typing import Dict, List, Tuple
+
 import requests
+
+import async_workers
+import circuit_breaker
+import http_session
+from cache import LRUCache
+from deadline import NO_DEADLINE, Deadline, DeadlineExceededError
+from single_flight import SingleFlight
 from weather_service import WeatherServiceError
 
+PROVIDER_NAME = "open_meteo"
+DEFAULT_OPEN_METEO_BASE_URL = "https://api.open-meteo.com/v1"
+# Locations per batched request: 100 coordinate pairs keep the request URL around 2 KB
+OPEN_METEO_BATCH_MAX_LOCATIONS = int(os.getenv('OPEN_METEO_BATCH_MAX_LOCATIONS', 100))
+
+# Responses are cached per point of a grid of OPEN_METEO_GRID_RESOLUTION_DEGREES (0 disables the cache),
+# for OPEN_METEO_CACHE_TTL_SECONDS, across warm invocations of the same container.
+OPEN_METEO_GRID_RESOLUTION_DEGREES = float(os.getenv('OPEN_METEO_GRID_RESOLUTION_DEGREES', 0.05))
+OPEN_METEO_CACHE_MAX_SIZE = int(os.getenv('OPEN_METEO_CACHE_MAX_SIZE', 4096))
+OPEN_METEO_CACHE_TTL_SECONDS = float(os.getenv('OPEN_METEO_CACHE_TTL_SECONDS', 300))
+_open_meteo_cache = LRUCache(OPEN_METEO_CACHE_MAX_SIZE)  # grid point -> OpenMeteoResponse
+# Concurrent misses of the same grid point share a single request.
+_open_meteo_flight = SingleFlight()
+
 
 class OpenMeteoRequestError(WeatherServiceError):
     """Raised when a network or protocol-level error occurs during an API request.
 
         Attributes:
-            error: The underlying requests exception that triggered this error.
+            error: The underlying requests exception that triggered this error, a ValueError if the API
+                answered with a malformed body, or a CircuitOpenError (DeadlineExceededError) if the request
+                was not sent because the provider's circuit is open (because too little of the request's
+                budget was left).
     """
-    def __init__(self, error: requests.exceptions.HTTPError | requests.exceptions.RequestException):
+    def __init__(self, error: requests.exceptions.RequestException | ValueError | circuit_breaker.CircuitOpenError
+                 | DeadlineExceededError):
         """Initializes the error with the original requests exception.
 
                 Args:
-                    error: The source HTTPError or RequestException.
+                    error: The source HTTPError or RequestException, ValueError, CircuitOpenError or
+                        DeadlineExceededError.
         """
         self.error = error
 
@@ -74,44 +111,205 @@ class OpenMeteoResponse:
         )
 
 
-def fetch_data_open_meteo(latitude: float, longitude: float):
+def fetch_data_open_meteo(latitude: float, longitude: float, deadline: Deadline = NO_DEADLINE):
     """Fetches real-time weather data from the OpenMeteo service.
 
         Connects to the OpenMeteo external endpoint using the specified location
         metadata (latitude, longitude) to retrieve current weather conditions
         (such as temperature in Celsius and a weather code) for that location.
+        The coordinates are snapped to the cache's grid (see quantize_coordinates), and the
+        response of their grid point is served from the cache while it lives.
 
         Args:
 l           latitude: The North-South geographic coordinate.
             longitude: The East-West geographic coordinate.
+            deadline: The request's deadline, to which the call's timeouts are capped.
 
         Returns:
             An OpenMeteoResponse object populated with location metadata and current weather conditions.
 
         Raises:
-            OpenMeteoRequestError: If a network error occurs or the API
-                returns a non-success status code.
+            OpenMeteoRequestError: If a network error occurs, the API
+                returns a non-success status code, the provider's circuit is open,
+                or the deadline is (almost) reached.
+    """
+    grid_point = quantize_coordinates(latitude, longitude)
+    if OPEN_METEO_GRID_RESOLUTION_DEGREES <= 0:
+        return request_open_meteo_grid_points([grid_point], deadline)[0]
+
+    response = _open_meteo_cache.get(grid_point)
+    if response is None:
+        response = _open_meteo_flight.do(grid_point, request_open_meteo_grid_points, [grid_point], deadline)[0]
+    return response
+
+
+def fetch_data_open_meteo_batch(coordinates: List[Tuple[float, float]], deadline: Deadline = NO_DEADLINE) \
+        -> List[OpenMeteoResponse | OpenMeteoRequestError]:
+    """Fetches real-time weather data of many locations from the OpenMeteo service, in as few requests as possible.
+
+        The forecast endpoint accepts comma-separated latitude and longitude lists, and answers with one
+        result per location, in the same order. Only the grid points missing from the cache are requested,
+        once each, in chunks of at most OPEN_METEO_BATCH_MAX_LOCATIONS, to keep the request URLs well within
+        server limits.
+
+        Args:
+            coordinates: The (latitude, longitude) of each location.
+            deadline: The request's deadline, to which the calls' timeouts are capped.
+
+        Returns:
+            One entry per location, in order: its OpenMeteoResponse or, if the request of its chunk failed,
+            the OpenMeteoRequestError raised by that request. A failed chunk does not affect the others.
+    """
+    grid_points = [quantize_coordinates(latitude, longitude) for latitude, longitude in coordinates]
+    results: Dict[Tuple[float, float], OpenMeteoResponse | OpenMeteoRequestError] = {}
+    if OPEN_METEO_GRID_RESOLUTION_DEGREES > 0:
+        for grid_point in dict.fromkeys(grid_points):
+            response = _open_meteo_cache.get(grid_point)
+            if response is not None:
+                results[grid_point] = response
+
+    missing_grid_points = [grid_point for grid_point in dict.fromkeys(grid_points) if grid_point not in results]
+    for chunk_start in range(0, len(missing_grid_points), OPEN_METEO_BATCH_MAX_LOCATIONS):
+        chunk = missing_grid_points[chunk_start:chunk_start + OPEN_METEO_BATCH_MAX_LOCATIONS]
+        try:
+            results.update(zip(chunk, request_open_meteo_grid_points(chunk, deadline)))
+        except OpenMeteoRequestError as e:
+            results.update(dict.fromkeys(chunk, e))
+
+    return [results[grid_point] for grid_point in grid_points]
+
+
+def quantize_coordinates(latitude: float, longitude: float,
+                         resolution_degrees: float = OPEN_METEO_GRID_RESOLUTION_DEGREES) -> Tuple[float, float]:
+    """Snaps coordinates to the nearest point of a grid of the given resolution (left as is for a resolution of 0)."""
+    if resolution_degrees <= 0:
+        return latitude, longitude
+    return (round(round(latitude / resolution_degrees) * resolution_degrees, 6),
+            round(round(longitude / resolution_degrees) * resolution_degrees, 6))
+
+
+def request_open_meteo_grid_points(grid_points: List[Tuple[float, float]], deadline: Deadline = NO_DEADLINE) \
+        -> List[OpenMeteoResponse]:
+    """Requests the current weather of grid points in a single request, caching the responses.
+
+        Raises:
+            OpenMeteoRequestError: See request_open_meteo_forecast.
+    """
+    responses = request_open_meteo_forecast(",".join(str(latitude) for latitude, _ in grid_points),
+                                            ",".join(str(longitude) for _, longitude in grid_points),
+                                            deadline, len(grid_points))
+    if OPEN_METEO_GRID_RESOLUTION_DEGREES > 0:
+        expires_at = time.time() + OPEN_METEO_CACHE_TTL_SECONDS
+        for grid_point, response in zip(grid_points, responses):
+            _open_meteo_cache.put(grid_point, response, expires_at)
+    return responses
+
+
+def get_open_meteo_cache_stats() -> dict:
+    """Returns the size, counters and hit rate of the grid point cache, and the requests saved by coalescing."""
+    stats = _open_meteo_cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    return stats | {"hit_rate": round(stats["hits"] / lookups, 3) if lookups else None,
+                    "coalesced": _open_meteo_flight.coalesced}
+
+
+def clear_open_meteo_cache():
+    """Removes every response from the grid point cache."""
+    _open_meteo_cache.clear()
+
+
+def request_open_meteo_forecast(latitudes: str, longitudes: str, deadline: Deadline = NO_DEADLINE,
+                                location_count: int = 1) -> List[OpenMeteoResponse]:
+    """Requests the current weather of one or more locations from the OpenMeteo forecast endpoint.
+
+        Args:
+            latitudes: The latitude of each location, comma-separated.
+            longitudes: The longitude of each location, comma-separated.
+            deadline: The request's deadline, to which the call's timeouts are capped.
+            location_count: The number of locations requested.
+
+        Returns:
+            The OpenMeteoResponse of each location, in the order requested.
+
+        Raises:
+            OpenMeteoRequestError: If a network error occurs, the API returns a non-success status code
+                or a malformed body (e.g. not one result per location), the provider's circuit is open,
+                or the deadline is (almost) reached.
     """
-    OPEAN_METEO_ENDPOINT = (f"https://api.open-meteo.com/v1/forecast?latitude={latitude}&longitude={longitude}"
+    OPEN_METEO_BASE_URL = os.getenv('OPEN_METEO_BASE_URL', DEFAULT_OPEN_METEO_BASE_URL)
+    OPEAN_METEO_ENDPOINT = (f"{OPEN_METEO_BASE_URL}/forecast?latitude={latitudes}&longitude={longitudes}"
                             f"&current_weather=true")
+
     try:
-        response = requests.get(OPEAN_METEO_ENDPOINT)
+        session, timeout, timeout_capped = http_session.get_deadline_bound_request(PROVIDER_NAME, deadline)
+    except DeadlineExceededError as e:
+        raise OpenMeteoRequestError(e)
+
+    breaker = circuit_breaker.get_circuit_breaker(PROVIDER_NAME)
+    if not breaker.allow_request():
+        raise OpenMeteoRequestError(circuit_breaker.CircuitOpenError(PROVIDER_NAME))
+
+    try:
+        response = session.get(OPEAN_METEO_ENDPOINT, timeout=timeout)
 
         # Raise an exception for bad status codes (4xx or 5xx)
         response.raise_for_status()
 
         # The response body from Lambda is a JSON string, which we load into a Python dict
+        # (a list of them, one per location, when several locations were requested)
         data = response.json()
+        location_datas = data if isinstance(data, list) else [data]
+        if len(location_datas) != location_count:
+            raise ValueError(f"OpenMeteo answered {len(location_datas)} result(s) for {location_count} location(s)")
+        if not all(isinstance(location_data, dict) for location_data in location_datas):
+            raise ValueError("OpenMeteo answered a result that is not an object")
 
-        latitude = data.get("latitude", None)
-        longitude = data.get("longitude", None)
-
-        current_weather_dict = data.get("current_weather", {})
-        time = current_weather_dict.get("time", None)
-        temperature_c = current_weather_dict.get("temperature", None)
-        weather_code = current_weather_dict.get("weathercode", None)
-
-        return OpenMeteoResponse(latitude, longitude, time, temperature_c, weather_code)
+        responses = [parse_open_meteo_location_data(location_data) for location_data in location_datas]
+        breaker.record_success()
+        return responses
 
     except (requests.exceptions.HTTPError, requests.exceptions.RequestException) as err:
+        if timeout_capped and isinstance(err, requests.exceptions.Timeout):
+            breaker.record_cancelled()
+        elif http_session.is_provider_failure(err):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
         raise OpenMeteoRequestError(err)
+    except (ValueError, TypeError, AttributeError) as err:
+        # A malformed body: the outcome must still be recorded, or a probe would stay in flight
+        breaker.record_failure()
+        raise OpenMeteoRequestError(err if isinstance(err, ValueError) else ValueError(err))
+
+
+def parse_open_meteo_location_data(data: dict) -> OpenMeteoResponse:
+    """Builds the OpenMeteoResponse of a location from its result in a forecast answer."""
+    latitude = data.get("latitude", None)
+    longitude = data.get("longitude", None)
+
+    current_weather_dict = data.get("current_weather", {})
+    time = current_weather_dict.get("time", None)
+    temperature_c = current_weather_dict.get("temperature", None)
+    weather_code = current_weather_dict.get("weathercode", None)
+
+    return OpenMeteoResponse(latitude, longitude, time, temperature_c, weather_code)
+
+
+async def fetch_data_open_meteo_async(latitude: float, longitude: float,
+                                      deadline: Deadline = NO_DEADLINE) -> OpenMeteoResponse:
+    """Asynchronous variant of fetch_data_open_meteo, with the same results and exceptions.
+
+        The request is made on the provider's pooled session from a worker thread (see async_workers),
+        so the event loop is free to serve other requests while waiting for the provider.
+
+        Raises:
+            OpenMeteoRequestError: If a network error occurs or the API returns a non-success status code.
+    """
+    return await async_workers.run_blocking(fetch_data_open_meteo, latitude, longitude, deadline)
+
+
+async def fetch_data_open_meteo_batch_async(coordinates: List[Tuple[float, float]],
+                                            deadline: Deadline = NO_DEADLINE) \
+        -> List[OpenMeteoResponse | OpenMeteoRequestError]:
+    """Asynchronous variant of fetch_data_open_meteo_batch, run from a worker thread, with the same results."""
+    return await async_workers.run_blocking(fetch_data_open_meteo_batch, coordinates, deadline)
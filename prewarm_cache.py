@@ -0,0 +1,138 @@
+"""Popularity-Driven Cache Prewarming Job.
+
+Derives the most requested cities from the 'recent_cities' histories of the RequestIPLogs
+items accessed within a lookback window, and refreshes their aggregated weather into the
+cache tiers ahead of demand (see city_weather_data.prewarm_city_weather_data): cities whose
+cached result outlives the next run are skipped, and the others are fetched with bounded
+concurrency, their OpenMeteo data in batched requests.
+
+The job is meant to be scheduled (e.g. an EventBridge rule invoking lambda_handler every
+PREWARM_INTERVAL_SECONDS), with the shared weather cache tier enabled (WEATHER_CACHE_BACKEND):
+without it, only the job's own process is warmed. Each run scans the whole RequestIPLogs table.
+
+Configuration (environment variables):
+    PREWARM_TOP_CITIES: Number of most requested cities refreshed (default 100).
+    PREWARM_LOOKBACK_HOURS: Only the histories of IPs seen within this window are counted (default 24).
+    PREWARM_MAX_WORKERS: Cities fetched concurrently (default 8).
+    PREWARM_INTERVAL_SECONDS: Time between two runs of the job (default 600). Cities whose cached result
+        outlives the next run are skipped, the others refreshed.
+
+Usage:
+    python prewarm_cache.py [--top 100] [--lookback-hours 24] [--max-workers 8] [--interval-seconds 600]
+                            [--dry-run]
+"""
+
+import argparse
+import os
+import time
+from collections import Counter
+from typing import Dict, List
+
+import aws_clients
+import city_weather_data
+import deadline as request_deadline
+import utils
+import weather_cache
+from city_weather_data import CacheStatus
+from deadline import NO_DEADLINE, Deadline
+
+PREWARM_TOP_CITIES = int(os.getenv('PREWARM_TOP_CITIES', 100))
+PREWARM_LOOKBACK_HOURS = float(os.getenv('PREWARM_LOOKBACK_HOURS', 24))
+PREWARM_MAX_WORKERS = int(os.getenv('PREWARM_MAX_WORKERS', 8))
+PREWARM_INTERVAL_SECONDS = float(os.getenv('PREWARM_INTERVAL_SECONDS', 600))
+
+
+def get_top_cities(top_n: int, since_timestamp: int) -> List[str]:
+    """Returns the most requested cities in the histories of the IPs seen since a given time, most requested first.
+
+        Cities are counted by normalized name, under the first spelling seen.
+
+        Args:
+            top_n: Number of cities returned.
+            since_timestamp: Unix epoch time from which an IP's last access makes its history count.
+    """
+    scan_kwargs = {
+        'ProjectionExpression': 'recent_cities',
+        'FilterExpression': 'LastAccessTimestamp >= :since',
+        'ExpressionAttributeValues': {':since': since_timestamp},
+    }
+
+    city_counts = Counter()
+    city_names: Dict[str, str] = {}
+    ip_table = aws_clients.get_dynamodb_table(aws_clients.IP_TABLE_NAME)
+    while True:
+        response = ip_table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            for city_name in item.get('recent_cities', []):
+                city_key = utils.normalize_city_name(city_name)
+                city_counts[city_key] += 1
+                city_names.setdefault(city_key, city_name)
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return [city_names[city_key] for city_key, _ in city_counts.most_common(top_n)]
+
+
+def prewarm(top_n: int = PREWARM_TOP_CITIES, lookback_hours: float = PREWARM_LOOKBACK_HOURS,
+            max_workers: int = PREWARM_MAX_WORKERS, interval_seconds: float = PREWARM_INTERVAL_SECONDS,
+            deadline: Deadline = NO_DEADLINE) -> dict:
+    """Refreshes the cached weather of the most requested cities.
+
+        Args:
+            top_n: Number of most requested cities refreshed.
+            lookback_hours: Only the histories of IPs seen within this window are counted.
+            max_workers: Cities fetched concurrently.
+            interval_seconds: Time until the next run: only the cached results expiring before it are refreshed.
+            deadline: The job's deadline, after which the remaining cities fail fast.
+
+        Returns:
+            The run's report: the number of cities considered, refreshed from the providers, skipped as
+            still fresh, left to another container refreshing them, and failed, plus the run's duration.
+    """
+    start = time.perf_counter()
+    if weather_cache.get_weather_cache_store() is None:
+        print("No shared weather cache tier configured (WEATHER_CACHE_BACKEND): only this process is warmed")
+
+    city_names = get_top_cities(top_n, int(time.time() - lookback_hours * 60 * 60))
+    outcomes = city_weather_data.prewarm_city_weather_data(city_names, max_workers, deadline, interval_seconds)
+
+    report = {
+        "cities": len(outcomes),
+        "refreshed": sum(outcome is CacheStatus.MISS for outcome in outcomes.values()),
+        "fresh": sum(outcome in (CacheStatus.HIT, CacheStatus.SHARED) for outcome in outcomes.values()),
+        "refreshing_elsewhere": sum(outcome is CacheStatus.STALE for outcome in outcomes.values()),
+        "failed": sum(not isinstance(outcome, CacheStatus) for outcome in outcomes.values()),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    print(f"Prewarm report: {report}")
+    return report
+
+
+def lambda_handler(event, context) -> dict:
+    """The entry point of the scheduled job, run within a deadline derived from the invocation's remaining time."""
+    return prewarm(deadline=request_deadline.create_deadline(context))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=PREWARM_TOP_CITIES, help="Number of most requested cities.")
+    parser.add_argument("--lookback-hours", type=float, default=PREWARM_LOOKBACK_HOURS,
+                        help="Only the histories of IPs seen within this window are counted.")
+    parser.add_argument("--max-workers", type=int, default=PREWARM_MAX_WORKERS, help="Cities fetched concurrently.")
+    parser.add_argument("--interval-seconds", type=float, default=PREWARM_INTERVAL_SECONDS,
+                        help="Time until the next run: only the results expiring before it are refreshed.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the most requested cities.")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        for city_name in get_top_cities(args.top, int(time.time() - args.lookback_hours * 60 * 60)):
+            print(city_name)
+        return
+
+    prewarm(args.top, args.lookback_hours, args.max_workers, args.interval_seconds)
+
+
+if __name__ == "__main__":
+    main()
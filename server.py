@@ -0,0 +1,127 @@
+"""Long-Running HTTP Server Mode.
+
+Serves the same query API as the Lambda Function URL from a persistent process, so
+that the in-process caches, pooled provider connections, DynamoDB clients and the
+write-behind audit buffer stay warm across requests, without Lambda's per-invocation
+overhead and cold starts.
+
+Each HTTP request is translated into a Function URL event and passed to
+lambda_function.lambda_handler, whose response is translated back, so both modes
+share every behavior (validation, batches, audit trail, status codes).
+
+Usage:
+    gunicorn --bind 0.0.0.0:8080 --workers 4 --threads 8 server:app    # production (see the Dockerfile)
+    python server.py [--host 127.0.0.1] [--port 8080]                   # local, single-process threaded server
+
+GET /health answers 200 without touching DynamoDB or the providers, for load balancer
+and container health checks.
+"""
+
+import argparse
+import base64
+import os
+import socketserver
+import time
+import uuid
+from http import HTTPStatus
+from typing import Callable, Iterable, List, Tuple
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIServer, make_server
+
+import lambda_function
+
+HEALTH_CHECK_PATH = "/health"
+# Time budget of a request, reported to the handler as the context's remaining time
+SERVER_REQUEST_TIMEOUT_SECONDS = float(os.getenv('SERVER_REQUEST_TIMEOUT_SECONDS', 30))
+# Whether the client IP is taken from the X-Forwarded-For header set by a trusted load balancer
+SERVER_TRUST_FORWARDED_FOR = os.getenv('SERVER_TRUST_FORWARDED_FOR', 'false').lower() == 'true'
+
+
+class ServerRequestContext:
+    """A stand-in of the AWS Lambda context object, for requests served by the server.
+
+        Attributes:
+            aws_request_id: A unique id of the request.
+            function_name: Name reported in logs and metrics.
+    """
+    def __init__(self, timeout_seconds: float = SERVER_REQUEST_TIMEOUT_SECONDS):
+        self.aws_request_id = str(uuid.uuid4())
+        self.function_name = os.getenv('AWS_LAMBDA_FUNCTION_NAME', 'weather-aggregator-server')
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        """Returns the time left before the request's time budget runs out, in milliseconds."""
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def get_client_ip(environ: dict) -> str:
+    """Returns the client IP of a WSGI request, from X-Forwarded-For when SERVER_TRUST_FORWARDED_FOR is set."""
+    forwarded_for = environ.get('HTTP_X_FORWARDED_FOR')
+    if SERVER_TRUST_FORWARDED_FOR and forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    return environ.get('REMOTE_ADDR', '')
+
+
+def build_event(environ: dict) -> dict:
+    """Translates a WSGI request into a Lambda Function URL event (the fields lambda_handler reads)."""
+    raw_query_string = environ.get('QUERY_STRING', '')
+    query_parameters = parse_qs(raw_query_string)
+
+    try:
+        content_length = int(environ.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    raw_body = environ['wsgi.input'].read(content_length) if content_length > 0 else b""
+
+    try:
+        body, is_base64_encoded = raw_body.decode('utf-8'), False
+    except UnicodeDecodeError:
+        body, is_base64_encoded = base64.b64encode(raw_body).decode('ascii'), True
+
+    return {
+        'rawPath': environ.get('PATH_INFO', '/'),
+        'rawQueryString': raw_query_string,
+        # as Lambda does, repeated parameters are joined with commas
+        'queryStringParameters': {name: ",".join(values) for name, values in query_parameters.items()} or None,
+        'body': body or None,
+        'isBase64Encoded': is_base64_encoded,
+        'requestContext': {'http': {'method': environ.get('REQUEST_METHOD', 'GET'),
+                                    'sourceIp': get_client_ip(environ)}},
+    }
+
+
+def app(environ: dict, start_response: Callable) -> Iterable[bytes]:
+    """The WSGI application serving the query API through lambda_function.lambda_handler."""
+    if environ.get('PATH_INFO') == HEALTH_CHECK_PATH:
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"ok"]
+
+    response = lambda_function.lambda_handler(build_event(environ), ServerRequestContext())
+
+    status_code = response['statusCode']
+    body = response.get('body', "").encode('utf-8')
+    headers: List[Tuple[str, str]] = [(name, str(value)) for name, value in response.get('headers', {}).items()]
+    headers.append(("Content-Length", str(len(body))))
+
+    start_response(f"{status_code} {HTTPStatus(status_code).phrase}", headers)
+    return [body]
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    """The standard library WSGI server, serving each request in its own thread."""
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on.")
+    args = parser.parse_args()
+
+    with make_server(args.host, args.port, app, server_class=ThreadingWSGIServer) as server:
+        print(f"Serving on http://{args.host}:{args.port}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Request Coalescing (Single-Flight) of Concurrent Identical Calls.
+
+When several callers of the same process ask for the same key at the same time, only
+the first one (the leader) runs the call; the others wait for it and share its result,
+or its exception. Once the call completes, the key is released, so later callers start
+a new call (callers are expected to consult a cache first).
+
+Sync callers (threads) and async callers (coroutines of the same event loop) are
+coalesced separately, with do() and do_async() respectively.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _InFlightCall:
+    """A call run by a leader thread, waited for by the followers."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing the same key into a single call.
+
+        Attributes:
+            calls: Number of calls actually run (one per group of concurrent callers).
+            coalesced: Number of callers that shared an in-flight call instead of running their own,
+                i.e. the number of calls saved.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, _InFlightCall] = {}
+        self._in_flight_tasks: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+
+    def do(self, key: Hashable, function: Callable, *args) -> Any:
+        """Runs function(*args), unless a call of the same key is in flight, in which case its outcome is shared.
+
+            Returns:
+                The result of the call.
+
+            Raises:
+                Whatever exception the call raised, to the leader and every follower.
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._in_flight[key] = _InFlightCall()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, function: Callable[..., Awaitable], *args) -> Any:
+        """Asynchronous variant of do(), coalescing the coroutines of the running event loop.
+
+            The call runs as a task shielded from the cancellation of any single caller.
+        """
+        task_key = (id(asyncio.get_running_loop()), key)
+
+        with self._lock:
+            task = self._in_flight_tasks.get(task_key)
+            if task is None:
+                task = self._in_flight_tasks[task_key] = asyncio.ensure_future(function(*args))
+                task.add_done_callback(lambda _: self._release_task(task_key))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _release_task(self, task_key: Tuple[int, Hashable]):
+        with self._lock:
+            self._in_flight_tasks.pop(task_key, None)
+
+    def in_flight_count(self) -> int:
+        """Returns the number of calls currently in flight."""
+        with self._lock:
+            return len(self._in_flight) + len(self._in_flight_tasks)
+
+    def stats(self) -> dict:
+        """Returns the call counters and the number of calls in flight."""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced,
+                    "in_flight": len(self._in_flight) + len(self._in_flight_tasks)}
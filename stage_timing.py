@@ -0,0 +1,104 @@
+"""Per-Invocation Stage Timing Instrumentation.
+
+Records the monotonic duration of each stage of a request (DynamoDB calls, provider
+calls, normalization, serialization...) and emits them as a single structured log
+record per invocation, in CloudWatch Embedded Metric Format (EMF): CloudWatch Logs
+extracts each stage duration as a metric, while the record stays a searchable log line.
+
+Stage timing is disabled by default (STAGE_TIMINGS_ENABLED). When disabled, callers get
+the shared NULL_STAGE_TIMER, whose stages are a pre-built no-op context manager, so the
+instrumented code paths pay a method call per stage and nothing else.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+STAGE_TIMINGS_ENABLED = os.getenv('STAGE_TIMINGS_ENABLED', 'false').lower() == 'true'
+STAGE_TIMINGS_NAMESPACE = os.getenv('STAGE_TIMINGS_NAMESPACE', 'WeatherAggregator')
+
+
+class StageTimer:
+    """Accumulates the durations of the named stages of one invocation.
+
+        A stage timed several times (e.g. a provider called for each city of a batch, possibly from
+        several threads) accumulates its durations.
+
+        Attributes:
+            durations: Stage name to total duration, in seconds, in order of first recording.
+    """
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage_name: str, seconds: float):
+        """Adds a duration, in seconds, to a stage."""
+        with self._lock:
+            self.durations[stage_name] = self.durations.get(stage_name, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def stage(self, stage_name: str):
+        """Context manager timing its body as the given stage, even if the body raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage_name, time.perf_counter() - start)
+
+    def to_emf(self, properties: Optional[dict] = None, namespace: str = STAGE_TIMINGS_NAMESPACE) -> dict:
+        """Builds the CloudWatch Embedded Metric Format record of the recorded stages.
+
+            Each stage becomes a '<stage>_ms' metric, dimensioned by the function name.
+
+            Args:
+                properties: Additional, non-metric fields of the record (e.g. the request id).
+                namespace: CloudWatch metrics namespace.
+
+            Returns:
+                The EMF record, as a JSON-serializable dictionary.
+        """
+        with self._lock:
+            durations = dict(self.durations)
+
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": namespace,
+                    "Dimensions": [["FunctionName"]],
+                    "Metrics": [{"Name": f"{name}_ms", "Unit": "Milliseconds"} for name in durations],
+                }],
+            },
+            "FunctionName": os.getenv('AWS_LAMBDA_FUNCTION_NAME', 'local'),
+            **(properties or {}),
+            **{f"{name}_ms": round(seconds * 1000, 3) for name, seconds in durations.items()},
+        }
+
+    def emit(self, properties: Optional[dict] = None):
+        """Prints the EMF record of the recorded stages as a single log line."""
+        print(json.dumps(self.to_emf(properties)))
+
+
+class NullStageTimer(StageTimer):
+    """A StageTimer recording nothing, used when stage timing is disabled."""
+    _NULL_CONTEXT = contextlib.nullcontext()
+
+    def add(self, stage_name: str, seconds: float):
+        pass
+
+    def stage(self, stage_name: str):
+        return self._NULL_CONTEXT
+
+    def emit(self, properties: Optional[dict] = None):
+        pass
+
+
+NULL_STAGE_TIMER = NullStageTimer()
+
+
+def create_stage_timer() -> StageTimer:
+    """Returns a new StageTimer for an invocation, or NULL_STAGE_TIMER when stage timing is disabled."""
+    return StageTimer() if STAGE_TIMINGS_ENABLED else NULL_STAGE_TIMER
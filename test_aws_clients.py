@@ -0,0 +1,41 @@
+"""Unit tests for the lazily constructed AWS clients."""
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import aws_clients
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    """Drops the clients built by a test."""
+    aws_clients.reset_clients()
+    yield
+    aws_clients.reset_clients()
+
+
+def test_importing_handler_does_not_import_boto3():
+    """Ensures importing the handler module (in a fresh interpreter) neither imports boto3 nor builds clients."""
+    result = subprocess.run([sys.executable, "-c", "import sys, lambda_function; print('boto3' in sys.modules)"],
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
+
+
+@patch('boto3.resource')
+def test_dynamodb_table_is_built_once_and_shared(mock_resource):
+    """Verifies that the DynamoDB resource and each table are built on first use only, then reused."""
+    mock_resource.return_value.Table.side_effect = lambda name: MagicMock(name=name)
+
+    first = aws_clients.get_dynamodb_table("RequestIPLogs")
+    second = aws_clients.get_dynamodb_table("RequestIPLogs")
+    other = aws_clients.get_dynamodb_table("CityGeocodes")
+
+    assert first is second
+    assert other is not first
+    mock_resource.assert_called_once()
+    assert mock_resource.call_args.kwargs['region_name'] == aws_clients.get_aws_region()
+    assert mock_resource.call_args.kwargs['config'].read_timeout == aws_clients.DEFAULT_DYNAMODB_READ_TIMEOUT_SECONDS
+    assert mock_resource.return_value.Table.call_count == 2
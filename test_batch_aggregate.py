@@ -0,0 +1,90 @@
+"""Unit tests for the offline bulk aggregation tool.
+
+These tests validate the parsing of JSONL lookups and the streaming of one
+result record per input line, with the weather data layer mocked out.
+"""
+import io
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import geocode_cache
+from batch_aggregate import LatencyHistogram, read_city_requests, run
+from city_weather_data import (CityWeatherData, WeatherCondition, CityWeatherDataCityNotFoundError,
+                               clear_city_weather_cache)
+from open_meteo import OpenMeteoResponse
+from weather_api import WeatherApiResponse
+
+
+def test_read_city_requests_accepts_objects_and_strings():
+    """Ensures both input line formats are accepted, invalid lines are flagged and blank lines skipped."""
+    lines = io.StringIO('{"city": "London"}\n"Paris"\n\nnot json\n{"town": "Rome"}\n')
+
+    assert list(read_city_requests(lines)) == [(1, "London"), (2, "Paris"), (4, None), (5, None)]
+
+
+@patch('city_weather_data.fetch_city_weather_data')
+def test_run_streams_one_record_per_line(mock_fetch):
+    """
+    Verifies that every lookup yields a result record, an unexpected error included, and that the summary
+    counts each outcome.
+    """
+    def fetch_side_effect(city, coordinates=None, open_meteo_fetch=None):
+        if city == "Atlantis":
+            raise CityWeatherDataCityNotFoundError()
+        if city == "Lemuria":
+            raise KeyError("current")
+        return CityWeatherData(32.0, 34.0, 1_700_000_000, 20.0, WeatherCondition.CLEAR)
+
+    mock_fetch.side_effect = fetch_side_effect
+    output = io.StringIO()
+    requests = iter([(1, "London"), (2, None), (3, "Atlantis"), (4, "Lemuria")]
+                    + [(i, f"City{i}") for i in range(5, 20)])
+
+    summary = run(requests, output, concurrency=2)
+
+    records = {record["line"]: record for record in map(json.loads, output.getvalue().splitlines())}
+    assert len(records) == 19
+    assert records[1]["weather"]["weather_condition"] == "Clear"
+    assert records[2]["status"] == 400
+    assert records[3]["status"] == 404
+    assert records[4]["status"] == 500
+    assert (summary["ok"], summary["not_found"], summary["failed"], summary["invalid"]) == (16, 1, 1, 1)
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo_batch')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_run_batches_open_meteo_requests_of_known_coordinates(mock_open_meteo, mock_open_meteo_batch,
+                                                              mock_weather_api):
+    """
+    Verifies that the OpenMeteo data of each chunk's cities with known coordinates is fetched in one
+    batched request, instead of one request per city.
+    """
+    now = int(time.time())
+    clear_city_weather_cache()
+    for i in range(6):
+        geocode_cache.get_geocode_cache().put(f"Known{i}", float(i), float(i))
+    mock_weather_api.return_value = MagicMock(spec=WeatherApiResponse, latitude=1.0, longitude=2.0, temp_c=30.0,
+                                              last_update_epoch=now, condition_text="Clear")
+    open_meteo_response = MagicMock(spec=OpenMeteoResponse, latitude=1.0, longitude=2.0, temp_c=32.0,
+                                    time=time.strftime('%Y-%m-%dT%H:%M', time.gmtime(now)), weather_code=0)
+    mock_open_meteo_batch.side_effect = lambda coordinates, deadline: [open_meteo_response] * len(coordinates)
+    output = io.StringIO()
+
+    summary = run(iter([(i, f"Known{i}") for i in range(6)]), output, concurrency=2, chunk_size=3)
+
+    assert summary["ok"] == 6
+    assert mock_open_meteo_batch.call_count == 2
+    assert sorted(len(call.args[0]) for call in mock_open_meteo_batch.call_args_list) == [3, 3]
+    mock_open_meteo.assert_not_called()
+
+
+def test_latency_histogram_percentiles():
+    """Validates that histogram percentiles are within the bucket precision of the exact values."""
+    histogram = LatencyHistogram()
+    for latency_ms in range(1, 101):
+        histogram.record(latency_ms)
+
+    assert abs(histogram.percentile(50) - 50) / 50 < 0.05
+    assert abs(histogram.percentile(99) - 99) / 99 < 0.05
@@ -0,0 +1,90 @@
+"""Unit tests for the per-provider circuit breakers."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+import circuit_breaker
+import weather_api
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def reset_breakers():
+    circuit_breaker.reset_circuit_breakers()
+    yield
+    circuit_breaker.reset_circuit_breakers()
+
+
+def test_circuit_opens_after_threshold_and_recovers_through_a_single_probe():
+    """
+    Verifies that consecutive failures open the circuit, that calls are then rejected until the
+    recovery time passed, that a single probe is let through, and that its outcome closes or reopens the circuit.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker("provider", failure_threshold=3, recovery_seconds=10, clock=clock)
+
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    breaker.record_success()  # a success resets the consecutive failures
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert not breaker.allow_request()  # only one probe at a time
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.stats() == {"state": "closed", "consecutive_failures": 0, "rejected": 3}
+
+
+def test_weather_api_fails_fast_while_circuit_is_open():
+    """
+    Verifies that provider failures (5xx, timeouts) open the WeatherAPI circuit, after which requests
+    fail with a CircuitOpenError without being sent, and that 'city not found' answers do not count as failures.
+    """
+    session = MagicMock()
+    not_found = requests.Response()
+    not_found.status_code = 400
+    not_found._content = b'{"error": {"code": 1006, "message": "No matching location found."}}'
+    session.get.return_value = not_found
+
+    with patch.dict('os.environ', {'PROVIDER_CIRCUIT_FAILURE_THRESHOLD': '2'}), \
+            patch('http_session.get_session', return_value=session):
+        for _ in range(3):
+            with pytest.raises(weather_api.WeatherApiCityNotFoundError):
+                weather_api.fetch_data_weather_api("Atlantis")
+        assert circuit_breaker.get_circuit_breaker(weather_api.PROVIDER_NAME).state is CircuitState.CLOSED
+
+        session.get.side_effect = requests.exceptions.ReadTimeout()
+        for _ in range(2):
+            with pytest.raises(weather_api.WeatherApiRequestError):
+                weather_api.fetch_data_weather_api("London")
+
+        with pytest.raises(weather_api.WeatherApiRequestError) as e:
+            weather_api.fetch_data_weather_api("London")
+
+    assert isinstance(e.value.error, CircuitOpenError)
+    assert session.get.call_count == 5
+    assert circuit_breaker.get_circuit_breaker_stats()[weather_api.PROVIDER_NAME]["rejected"] == 1
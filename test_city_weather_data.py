@@ -7,19 +7,36 @@ enumerations and the time-based filtering of stale weather reports.
 The tests ensure that data aggregation remains accurate by discarding
 outdated information and handling unrecognized weather strings gracefully.
 """
+import asyncio
 import time
 from unittest.mock import MagicMock, patch
 
 import pytest
+
+import geocode_cache
 from city_weather_data import (
     convert_weather_condition_text_to_weather_condition,
     average_city_weather_data,
     WeatherCondition,
     CityWeatherData,
-    STALE_CUTOFF_NUM_SECONDS, fetch_city_weather_data, CityWeatherDataCityNotFoundError
+    STALE_CUTOFF_NUM_SECONDS, fetch_city_weather_data, CityWeatherDataCityNotFoundError,
+    clear_city_weather_cache, get_city_weather_cache_stats, get_city_weather_data_expiry,
+    convert_weather_service_response_to_weather_data, fetch_city_weather_data_async,
+    fetch_city_weather_data_batch, fetch_city_weather_data_batch_async, CityWeatherDataRequestError,
+    get_city_fetch_coalescing_stats, CacheStatus
 )
-from open_meteo import OpenMeteoResponse
-from weather_api import WeatherApiResponse, WeatherApiCityNotFoundError
+from deadline import NO_DEADLINE, Deadline
+from open_meteo import OpenMeteoResponse, OpenMeteoRequestError
+from stage_timing import StageTimer
+from weather_cache import MemoryWeatherCacheStore
+from weather_api import WeatherApiResponse, WeatherApiCityNotFoundError, WeatherApiRequestError
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Isolates tests from the coordinates and results cached by previous tests."""
+    geocode_cache.get_geocode_cache().clear()
+    clear_city_weather_cache()
 
 
 @pytest.mark.parametrize("weather_condition_text, expected_output", [
@@ -29,6 +46,12 @@ from weather_api import WeatherApiResponse, WeatherApiCityNotFoundError
     ("Partly shower cloudy", WeatherCondition.PARTIALLY_CLOUDY),
     ("sunny", WeatherCondition.CLEAR),
     ("mist", WeatherCondition.MIST),
+    ("Moderate or heavy rain with thunder", WeatherCondition.MODERATE_RAIN),
+    ("Patchy light snow", WeatherCondition.LIGHT_SNOW),
+    ("Slight snowfall", WeatherCondition.LIGHT_SNOW),
+    ("Violent rain showers", WeatherCondition.HEAVY_RAIN),
+    ("Freezing fog", WeatherCondition.FOG),
+    ("Partly Cloudy ", WeatherCondition.PARTIALLY_CLOUDY),
 ])
 def test_weather_mappings(weather_condition_text, expected_output):
     """Verifies that various API weather condition text strings map correctly to WeatherCondition enums.
@@ -132,3 +155,307 @@ def test_city_not_found_raises_error(mock_weather_api):
 
     with pytest.raises(CityWeatherDataCityNotFoundError):
         fetch_city_weather_data("InvalidCity")
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_fetch_with_known_coordinates_queries_providers_concurrently(mock_open_meteo, mock_weather_api):
+    """
+    Verifies that when the city's coordinates are already known, OpenMeteo is queried
+    with them without waiting for WeatherAPI, and that per-provider timings are reported.
+
+    WeatherAPI blocks until OpenMeteo has been called, which can only happen
+    if both providers are queried concurrently.
+    """
+    import threading
+    open_meteo_called = threading.Event()
+    fresh_timestamp = int(time.time()) - 1000
+
+    def weather_api_side_effect(city_name, deadline=NO_DEADLINE):
+        assert open_meteo_called.wait(timeout=5)
+        return MagicMock(spec=WeatherApiResponse, latitude=10.0, longitude=20.0, temp_c=30.0,
+                         last_update_epoch=fresh_timestamp, condition_text="Clear")
+
+    def open_meteo_side_effect(latitude, longitude, deadline=NO_DEADLINE):
+        open_meteo_called.set()
+        return MagicMock(spec=OpenMeteoResponse, latitude=latitude, longitude=longitude, temp_c=32.0,
+                         time=time.strftime('%Y-%m-%dT%H:%M', time.gmtime(fresh_timestamp)), weather_code=0)
+
+    mock_weather_api.side_effect = weather_api_side_effect
+    mock_open_meteo.side_effect = open_meteo_side_effect
+    stage_timer = StageTimer()
+
+    result = fetch_city_weather_data("TestCity", coordinates=(10.0, 20.0), stage_timer=stage_timer)
+
+    assert result.temp_c == 31.0
+    mock_open_meteo.assert_called_once_with(10.0, 20.0, NO_DEADLINE)
+    assert set(stage_timer.durations) == {"cache_lookup", "weather_api", "open_meteo", "normalization"}
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_fetch_skips_open_meteo_when_deadline_is_near(mock_open_meteo, mock_weather_api):
+    """
+    Verifies that the deadline is passed to WeatherAPI, and that the optional OpenMeteo enrichment
+    is skipped when less than the optional stage budget is left.
+    """
+    fresh_timestamp = int(time.time()) - 1000
+    mock_weather_api.return_value = MagicMock(spec=WeatherApiResponse, latitude=10.0, longitude=20.0, temp_c=30.0,
+                                              last_update_epoch=fresh_timestamp, condition_text="Clear")
+    deadline = Deadline(0.5)
+
+    result = fetch_city_weather_data("TestCity", coordinates=(10.0, 20.0), deadline=deadline)
+
+    assert result.temp_c == 30.0
+    mock_weather_api.assert_called_once_with("TestCity", deadline)
+    mock_open_meteo.assert_not_called()
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_fetch_uses_geocode_cache_on_warm_lookup(mock_open_meteo, mock_weather_api):
+    """
+    Verifies that the coordinates learned on a cold lookup are cached under the normalized
+    city name, and reused to query OpenMeteo on the next lookup of the same city, instead
+    of the coordinates WeatherAPI returns on that second lookup.
+    """
+    fresh_timestamp = int(time.time()) - 1000
+    mock_weather_api.side_effect = [
+        MagicMock(spec=WeatherApiResponse, latitude=10.0, longitude=20.0, temp_c=30.0,
+                  last_update_epoch=fresh_timestamp, condition_text="Clear"),
+        MagicMock(spec=WeatherApiResponse, latitude=10.5, longitude=20.5, temp_c=30.0,
+                  last_update_epoch=fresh_timestamp, condition_text="Clear")
+    ]
+    mock_open_meteo.return_value = MagicMock(spec=OpenMeteoResponse, latitude=10.0, longitude=20.0, temp_c=32.0,
+                                             time=time.strftime('%Y-%m-%dT%H:%M', time.gmtime(fresh_timestamp)),
+                                             weather_code=0)
+
+    fetch_city_weather_data("Test City")
+    assert geocode_cache.get_geocode_cache().get("  test   CITY") == (10.0, 20.0)
+
+    clear_city_weather_cache()
+    fetch_city_weather_data("test city")
+    assert mock_open_meteo.call_count == 2
+    mock_open_meteo.assert_called_with(10.0, 20.0, NO_DEADLINE)
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_fetch_serves_repeated_lookups_from_cache(mock_open_meteo, mock_weather_api):
+    """
+    Verifies that a repeated lookup of the same (normalized) city is served from the
+    aggregated results cache without querying the providers again, and is counted as a hit.
+    """
+    fresh_timestamp = int(time.time()) - 60
+    mock_weather_api.return_value = MagicMock(spec=WeatherApiResponse, latitude=10.0, longitude=20.0, temp_c=30.0,
+                                              last_update_epoch=fresh_timestamp, condition_text="Clear")
+    mock_open_meteo.side_effect = OpenMeteoRequestError(None)
+    hits_before = get_city_weather_cache_stats()["hits"]
+
+    first = fetch_city_weather_data("Test City")
+    second = fetch_city_weather_data("TEST  city")
+
+    assert (first.cache_status, second.cache_status) == (CacheStatus.MISS, CacheStatus.HIT)
+    assert second.to_dict() == first.to_dict()
+    assert mock_weather_api.call_count == 1
+    assert get_city_weather_cache_stats()["hits"] == hits_before + 1
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_fetch_serves_stale_entry_while_refreshing_it(mock_open_meteo, mock_weather_api):
+    """
+    Verifies that an entry past its soft TTL is served right away while a background refresh replaces it,
+    and that an entry past its data's stale cutoff is not served: the lookup blocks on a fresh fetch.
+    """
+    now = time.time()
+
+    def weather_api_response(temp_c, last_update_epoch):
+        return MagicMock(spec=WeatherApiResponse, latitude=10.0, longitude=20.0, temp_c=temp_c,
+                         last_update_epoch=int(last_update_epoch), condition_text="Clear")
+
+    mock_open_meteo.side_effect = OpenMeteoRequestError(None)
+    mock_weather_api.return_value = weather_api_response(30.0, now - 60)
+    assert fetch_city_weather_data("Stale City").cache_status is CacheStatus.MISS
+
+    later = now + 20 * 60
+    mock_weather_api.return_value = weather_api_response(25.0, later - 60)
+    refreshes_before = get_city_weather_cache_stats()["refreshes"]
+    with patch('time.time', return_value=later):
+        stale = fetch_city_weather_data("Stale City")
+        deadline = time.monotonic() + 5
+        while get_city_weather_cache_stats()["refreshes"] == refreshes_before and time.monotonic() < deadline:
+            time.sleep(0.01)
+        refreshed = fetch_city_weather_data("Stale City")
+
+    assert (stale.cache_status, stale.temp_c) == (CacheStatus.STALE, 30.0)
+    assert (refreshed.cache_status, refreshed.temp_c) == (CacheStatus.HIT, 25.0)
+
+    much_later = later + STALE_CUTOFF_NUM_SECONDS
+    mock_weather_api.return_value = weather_api_response(20.0, much_later - 60)
+    with patch('time.time', return_value=much_later):
+        expired = fetch_city_weather_data("Stale City")
+
+    assert (expired.cache_status, expired.temp_c) == (CacheStatus.MISS, 20.0)
+    assert mock_weather_api.call_count == 3
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_fetch_shares_results_across_containers_through_shared_tier(mock_open_meteo, mock_weather_api):
+    """
+    Verifies that a result fetched by one container is served from the shared tier to another one (whose
+    in-process cache is empty), and that a container finding a stale shared entry whose refresh lease is
+    held elsewhere serves it instead of calling the providers.
+    """
+    store = MemoryWeatherCacheStore()
+    mock_open_meteo.side_effect = OpenMeteoRequestError(None)
+    mock_weather_api.return_value = MagicMock(spec=WeatherApiResponse, latitude=10.0, longitude=20.0, temp_c=30.0,
+                                              last_update_epoch=int(time.time()) - 60, condition_text="Clear")
+
+    with patch('weather_cache.get_weather_cache_store', return_value=store):
+        fetched = fetch_city_weather_data("Shared City")
+        clear_city_weather_cache()  # a new container
+        shared = fetch_city_weather_data("shared city")
+
+        entry = store.get("shared city")
+        entry.soft_expires_at = time.time() - 1
+        assert store.try_acquire_lease("shared city")  # another container refreshing the city
+        clear_city_weather_cache()
+        stale = fetch_city_weather_data("Shared City")
+
+    assert (fetched.cache_status, shared.cache_status, stale.cache_status) == \
+        (CacheStatus.MISS, CacheStatus.SHARED, CacheStatus.STALE)
+    assert shared.to_dict() == fetched.to_dict() == stale.to_dict()
+    assert mock_weather_api.call_count == 1
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_async_fetch_matches_sync_results_and_exceptions(mock_open_meteo, mock_weather_api):
+    """
+    Verifies that the async batch path aggregates both providers like the sync path, and maps
+    provider errors onto the same CityWeatherData exceptions, per city.
+    """
+    fresh_timestamp = int(time.time()) - 60
+
+    def weather_api_side_effect(city_name, deadline=NO_DEADLINE):
+        if city_name == "Atlantis":
+            raise WeatherApiCityNotFoundError()
+        if city_name == "Down":
+            raise WeatherApiRequestError(None)
+        return MagicMock(spec=WeatherApiResponse, latitude=10.0, longitude=20.0, temp_c=30.0,
+                         last_update_epoch=fresh_timestamp, condition_text="Clear")
+
+    mock_weather_api.side_effect = weather_api_side_effect
+    mock_open_meteo.return_value = MagicMock(spec=OpenMeteoResponse, latitude=10.0, longitude=20.0, temp_c=32.0,
+                                             time=time.strftime('%Y-%m-%dT%H:%M', time.gmtime(fresh_timestamp)),
+                                             weather_code=0)
+
+    results = asyncio.run(fetch_city_weather_data_batch_async(["Test City", "Atlantis", "Down", "test city"]))
+
+    assert list(results) == ["Test City", "Atlantis", "Down"]
+    assert results["Test City"].temp_c == 31.0
+    assert isinstance(results["Atlantis"], CityWeatherDataCityNotFoundError)
+    assert isinstance(results["Down"], CityWeatherDataRequestError)
+    with pytest.raises(CityWeatherDataCityNotFoundError):
+        asyncio.run(fetch_city_weather_data_async("Atlantis"))
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo_batch')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_batch_fetch_requests_open_meteo_once_for_known_coordinates(mock_open_meteo, mock_open_meteo_batch,
+                                                                    mock_weather_api):
+    """
+    Verifies that the cities of a batch whose coordinates are known share one batched OpenMeteo request,
+    in the sync and async paths, that a location missing from its answer only loses its OpenMeteo data,
+    and that a city with unknown coordinates is still enriched by a request of its own.
+    """
+    fresh_timestamp = int(time.time()) - 60
+    fresh_time = time.strftime('%Y-%m-%dT%H:%M', time.gmtime(fresh_timestamp))
+    mock_weather_api.side_effect = lambda city_name, deadline=NO_DEADLINE: MagicMock(
+        spec=WeatherApiResponse, latitude=50.0, longitude=60.0, temp_c=30.0, last_update_epoch=fresh_timestamp,
+        condition_text="Clear")
+    mock_open_meteo_batch.return_value = [
+        MagicMock(spec=OpenMeteoResponse, latitude=10.0, longitude=20.0, temp_c=32.0, time=fresh_time, weather_code=0),
+        OpenMeteoRequestError(None)]
+    mock_open_meteo.return_value = MagicMock(spec=OpenMeteoResponse, latitude=50.0, longitude=60.0, temp_c=34.0,
+                                             time=fresh_time, weather_code=0)
+
+    for fetch_batch in (fetch_city_weather_data_batch,
+                        lambda city_names: asyncio.run(fetch_city_weather_data_batch_async(city_names))):
+        geocode_cache.get_geocode_cache().clear()
+        clear_city_weather_cache()
+        geocode_cache.get_geocode_cache().put("Paris", 10.0, 20.0)
+        geocode_cache.get_geocode_cache().put("Rome", 30.0, 40.0)
+        mock_open_meteo_batch.reset_mock()
+        mock_open_meteo.reset_mock()
+
+        results = fetch_batch(["Paris", "Rome", "Cold City"])
+
+        mock_open_meteo_batch.assert_called_once_with([(10.0, 20.0), (30.0, 40.0)], NO_DEADLINE)
+        mock_open_meteo.assert_called_once_with(50.0, 60.0, NO_DEADLINE)
+        assert {city_name: data.temp_c for city_name, data in results.items()} == \
+            {"Paris": 31.0, "Rome": 30.0, "Cold City": 32.0}
+
+
+@pytest.mark.parametrize("age_seconds, expected_ttl", [
+    (60, 14 * 60),  # fresh data: expires when the providers are expected to update
+    (20 * 60, 60),  # providers overdue: kept for the minimum TTL
+    (STALE_CUTOFF_NUM_SECONDS - 10, 10),  # about to become stale: never kept past the stale cutoff
+])
+def test_city_weather_data_expiry(age_seconds, expected_ttl):
+    """Validates that cache expiry is derived from the data's last update time and the stale cutoff."""
+    now = 1_700_000_000
+    data = CityWeatherData(32.0, 34.0, now - age_seconds, 20.0, WeatherCondition.CLEAR)
+
+    assert get_city_weather_data_expiry(data, now) == now + expected_ttl
+
+
+@pytest.mark.parametrize("weather_code, expected_output", [
+    (0, WeatherCondition.CLEAR),
+    (2, WeatherCondition.PARTIALLY_CLOUDY),
+    (45, WeatherCondition.FOG),
+    (65, WeatherCondition.HEAVY_RAIN),
+    (71, WeatherCondition.LIGHT_SNOW),
+    (82, WeatherCondition.HEAVY_RAIN),
+    (95, WeatherCondition.UNRECOGNIZED),  # thunderstorm has no normalized condition
+    (42, WeatherCondition.UNRECOGNIZED),  # not a WMO code listed in the table
+    (None, WeatherCondition.UNRECOGNIZED),
+])
+def test_open_meteo_weather_code_mappings(weather_code, expected_output):
+    """Verifies that OpenMeteo weather codes map to WeatherCondition enums through the preloaded codes table."""
+    response = OpenMeteoResponse(32.0, 34.0, "2024-01-01T12:00", 20.0, weather_code)
+
+    assert convert_weather_service_response_to_weather_data(response).weather_condition == [expected_output]
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_concurrent_lookups_of_a_city_share_one_fetch(mock_open_meteo, mock_weather_api):
+    """Verifies that concurrent cache misses of the same city trigger a single provider fetch."""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    release = threading.Event()
+    fresh_timestamp = int(time.time()) - 60
+
+    def weather_api_side_effect(city_name, deadline=NO_DEADLINE):
+        assert release.wait(timeout=5)
+        return MagicMock(spec=WeatherApiResponse, latitude=10.0, longitude=20.0, temp_c=30.0,
+                         last_update_epoch=fresh_timestamp, condition_text="Clear")
+
+    mock_weather_api.side_effect = weather_api_side_effect
+    mock_open_meteo.side_effect = OpenMeteoRequestError(None)
+    coalesced_before = get_city_fetch_coalescing_stats()["coalesced"]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(fetch_city_weather_data, name) for name in ("Rome", "rome", "ROME ", "Rome")]
+        while get_city_fetch_coalescing_stats()["coalesced"] < coalesced_before + 3:
+            time.sleep(0.001)
+        release.set()
+
+    assert len({repr(future.result()) for future in futures}) == 1
+    assert {future.result().cache_status for future in futures} == {CacheStatus.MISS}
+    assert mock_weather_api.call_count == 1
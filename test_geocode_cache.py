@@ -0,0 +1,63 @@
+"""Unit tests for the two-tier city geocoding cache.
+
+These tests validate that coordinates are keyed by normalized city name,
+that the persistent tier survives a fresh in-process tier (as a new container
+would see it), that the in-process tier stays bounded, and that storage
+failures of the DynamoDB tier are never raised.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+from geocode_cache import DynamoDbGeocodeStore, GeocodeCache, SqliteGeocodeStore
+
+
+def test_geocode_cache_normalizes_city_names():
+    """Ensures different spellings of the same city name share one cache entry."""
+    cache = GeocodeCache(max_size=10)
+    cache.put("New York", 40.71, -74.01)
+
+    assert cache.get("  new   YORK ") == (40.71, -74.01)
+    assert cache.get("Newark") is None
+
+
+def test_geocode_cache_persistent_tier_outlives_memory_tier(tmp_path):
+    """Verifies that coordinates written through one cache are found by another cache sharing its store."""
+    path = str(tmp_path / "geocodes.sqlite3")
+    GeocodeCache(max_size=10, store=SqliteGeocodeStore(path)).put("Tel Aviv", 32.08, 34.78)
+
+    assert GeocodeCache(max_size=10, store=SqliteGeocodeStore(path)).get("tel aviv") == (32.08, 34.78)
+
+
+def test_geocode_cache_memory_tier_is_bounded():
+    """Validates that the least recently used city is evicted once the in-process tier is full."""
+    cache = GeocodeCache(max_size=2)
+    cache.put("London", 51.52, -0.11)
+    cache.put("Paris", 48.87, 2.33)
+    cache.get("London")
+    cache.put("Rome", 41.9, 12.48)
+
+    assert cache.get("Paris") is None
+    assert cache.get("London") == (51.52, -0.11)
+    assert cache.get("Rome") == (41.9, 12.48)
+
+
+@pytest.mark.parametrize("error", [
+    ReadTimeoutError(endpoint_url="https://dynamodb.eu-north-1.amazonaws.com"),
+    ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException'}}, 'GetItem'),
+])
+def test_dynamodb_geocode_store_falls_back_on_storage_failures(error):
+    """
+    Checks that failures of the DynamoDB tier, service errors as well as the SDK's own (e.g. a read
+    timeout), are reported as a miss and a dropped write, and are never raised.
+    """
+    table = MagicMock()
+    table.get_item.side_effect = table.put_item.side_effect = error
+
+    with patch('aws_clients.get_dynamodb_table', return_value=table):
+        cache = GeocodeCache(store=DynamoDbGeocodeStore("CityGeocodes"))
+
+    assert cache.get("London") is None
+    cache.put("London", 51.52, -0.11)
+    assert cache.get("London") == (51.52, -0.11)
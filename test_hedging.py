@@ -0,0 +1,85 @@
+"""Unit tests for the hedged provider requests."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from hedging import HedgingPolicy, hedged_call
+from weather_api import is_healthy_response
+
+
+def test_hedged_call_returns_first_response_and_skips_fast_calls():
+    """
+    Verifies that a call completing before the hedge delay is not duplicated, and that a slow call is
+    duplicated after the delay, the faster duplicate's result being returned.
+    """
+    policy = HedgingPolicy(initial_delay_seconds=0.05)
+    calls = []
+    release_primary = threading.Event()
+
+    def call():
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            release_primary.wait(timeout=5)
+            return "primary"
+        return "hedge"
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert hedged_call(executor, policy, lambda: "fast") == "fast"
+        assert policy.stats()["hedged"] == 0
+
+        assert hedged_call(executor, policy, call) == "hedge"
+        release_primary.set()
+
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.05
+    assert policy.stats() == {"delay_ms": 50.0, "hedged": 1, "hedge_wins": 1}
+
+
+def test_hedging_delay_follows_latency_percentile():
+    """Verifies that, once enough latencies were observed, the hedge delay is their configured percentile."""
+    policy = HedgingPolicy(percentile=95, initial_delay_seconds=1, min_delay_seconds=0.01, min_samples=20)
+    for latency_ms in range(1, 20):
+        policy.latencies.record(latency_ms / 1000)
+    assert policy.get_delay_seconds() == 1
+
+    for latency_ms in range(20, 101):
+        policy.latencies.record(latency_ms / 1000)
+    assert policy.get_delay_seconds() == pytest.approx(0.095)
+
+
+def make_response(status_code: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+def test_hedged_call_waits_for_a_success_over_a_faster_failed_response():
+    """
+    Ensures that a fast 503 answer of the hedge does not beat a slower 200 answer of the primary call,
+    and that the first failed answer is returned when both calls fail.
+    """
+    policy = HedgingPolicy(initial_delay_seconds=0.02)
+
+    def call_returning(primary_status, hedge_status):
+        calls = []
+
+        def call():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                return make_response(primary_status)
+            return make_response(hedge_status)
+        return call
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        response = hedged_call(executor, policy, call_returning(200, 503), is_healthy_response)
+        assert response.status_code == 200
+        assert policy.stats()["hedge_wins"] == 0
+
+        response = hedged_call(executor, policy, call_returning(502, 503), is_healthy_response)
+        assert response.status_code == 503
+
+    assert policy.stats()["hedged"] == 2
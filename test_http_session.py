@@ -0,0 +1,63 @@
+"""Unit tests for the shared provider HTTP sessions and their deadline-bound requests."""
+import math
+from unittest.mock import patch
+
+import pytest
+
+import http_session
+from deadline import NO_DEADLINE, Deadline, DeadlineExceededError
+
+PROVIDER_TIMEOUTS = {
+    'PROVIDER_HTTP_CONNECT_TIMEOUT': '0.5',
+    'PROVIDER_HTTP_READ_TIMEOUT': '2',
+    'PROVIDER_HTTP_MAX_RETRIES': '2',
+}
+
+
+@pytest.fixture(autouse=True)
+def provider_timeouts():
+    with patch.dict('os.environ', PROVIDER_TIMEOUTS):
+        yield
+    http_session.close_sessions()
+
+
+def test_request_retries_when_every_attempt_fits_in_the_budget():
+    """
+    Verifies that calls without a deadline, or whose retried attempts all fit in its budget, use the
+    configured timeouts on the retrying session.
+    """
+    for deadline in (NO_DEADLINE, Deadline(8)):
+        session, timeout, capped = http_session.get_deadline_bound_request("provider", deadline)
+
+        assert session is http_session.get_session("provider")
+        assert timeout == (0.5, 2.0)
+        assert not capped
+
+
+def test_request_is_made_once_when_only_one_attempt_fits_in_the_budget():
+    """
+    Ensures that a budget between one attempt and the retried total gives a single attempt with the
+    configured timeouts, so the call cannot outlive the deadline.
+    """
+    session, timeout, capped = http_session.get_deadline_bound_request("provider", Deadline(3.5))
+
+    assert session is http_session.get_session("provider", retries=False)
+    assert session.get_adapter("https://").max_retries.total == 0
+    assert timeout == (0.5, 2.0)
+    assert not capped
+
+
+def test_request_timeout_is_scaled_to_a_budget_shorter_than_one_attempt():
+    """
+    Checks that a budget shorter than one attempt scales its connect plus read timeout down to the
+    budget, and that a call is not started once almost no budget is left.
+    """
+    session, timeout, capped = http_session.get_deadline_bound_request("provider", Deadline(1.25))
+
+    assert session is http_session.get_session("provider", retries=False)
+    assert math.isclose(sum(timeout), 1.25, rel_tol=1e-3)
+    assert math.isclose(timeout[0] / timeout[1], 0.25)
+    assert capped
+
+    with pytest.raises(DeadlineExceededError):
+        http_session.get_deadline_bound_request("provider", Deadline(0.01))
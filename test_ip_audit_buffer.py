@@ -0,0 +1,123 @@
+"""Unit tests for the write-behind buffer of the IP audit trail.
+
+These tests validate that updates of the same IP are coalesced into a single
+write, and that the background flusher writes buffered updates once enough
+IPs are pending or once the oldest update is old enough, even after a write raised.
+"""
+import atexit
+import signal
+import threading
+
+from ip_audit_buffer import IpAuditWriteBuffer
+
+
+class RecordingWriter:
+    """A write function recording its calls, and signaling once the expected number of writes happened."""
+    def __init__(self, expected_writes: int = 1):
+        self.writes = []
+        self.expected_writes = expected_writes
+        self.done = threading.Event()
+
+    def __call__(self, ip, last_access_timestamp, new_cities):
+        self.writes.append((ip, last_access_timestamp, new_cities))
+        if len(self.writes) >= self.expected_writes:
+            self.done.set()
+        return True
+
+
+def test_flush_coalesces_updates_per_ip():
+    """Verifies that updates of the same IP buffered between flushes are written once, most recent city first."""
+    writer = RecordingWriter()
+    buffer = IpAuditWriteBuffer(writer, max_batch_size=100, max_age_seconds=60)
+
+    buffer.record("1.2.3.4", 100, ["Paris"], ["Paris"])
+    buffer.record("1.2.3.4", 101, ["Rome"], ["Rome", "Paris"])
+
+    assert buffer.get_known_fields("1.2.3.4") == (101, ["Rome", "Paris"])
+    assert buffer.flush() == 0
+    assert writer.writes == [("1.2.3.4", 101, ["Rome", "Paris"])]
+    assert buffer.pending_count() == 0
+
+
+def test_flusher_writes_once_batch_size_is_reached():
+    """Ensures the background flusher writes the buffer as soon as max_batch_size IPs are pending."""
+    writer = RecordingWriter(expected_writes=2)
+    buffer = IpAuditWriteBuffer(writer, max_batch_size=2, max_age_seconds=60)
+
+    buffer.record("1.1.1.1", 100, ["Paris"], ["Paris"])
+    buffer.record("2.2.2.2", 100, ["Rome"], ["Rome"])
+
+    assert writer.done.wait(timeout=5)
+
+
+def test_flusher_writes_once_oldest_update_is_due():
+    """Validates that a lone buffered update is written after max_age_seconds, including after a previous flush."""
+    writer = RecordingWriter()
+    buffer = IpAuditWriteBuffer(writer, max_batch_size=100, max_age_seconds=0.05)
+
+    buffer.record("1.1.1.1", 100, ["Paris"], ["Paris"])
+    assert writer.done.wait(timeout=5)
+
+    writer.done.clear()
+    writer.expected_writes = 2
+    buffer.record("1.1.1.1", 101, ["Rome"], ["Rome", "Paris"])
+    assert writer.done.wait(timeout=5)
+    assert writer.writes == [("1.1.1.1", 100, ["Paris"]), ("1.1.1.1", 101, ["Rome"])]
+
+
+def test_flusher_survives_a_raising_write():
+    """Checks that a write raising an exception is counted as a failure, and that the flusher keeps writing."""
+    writer = RecordingWriter()
+
+    def write(ip, last_access_timestamp, new_cities):
+        writer(ip, last_access_timestamp, new_cities)
+        if ip == "1.1.1.1":
+            raise ConnectionError("connection reset")
+        return True
+
+    buffer = IpAuditWriteBuffer(write, max_batch_size=100, max_age_seconds=0.05)
+
+    buffer.record("1.1.1.1", 100, ["Paris"], ["Paris"])
+    assert writer.done.wait(timeout=5)  # raised in the flusher thread
+
+    writer.done.clear()
+    writer.expected_writes = 2
+    buffer.record("2.2.2.2", 101, ["Rome"], ["Rome"])
+    assert writer.done.wait(timeout=5)
+    assert [ip for ip, _, _ in writer.writes] == ["1.1.1.1", "2.2.2.2"]
+
+    idle_buffer = IpAuditWriteBuffer(write, max_batch_size=100, max_age_seconds=60)
+    idle_buffer.record("1.1.1.1", 102, ["Oslo"], ["Oslo", "Paris"])
+    idle_buffer.record("2.2.2.2", 102, ["Oslo"], ["Oslo", "Rome"])
+    assert idle_buffer.flush() == 1
+
+
+def test_flush_if_due_only_writes_once_oldest_update_is_due():
+    """Validates that the end-of-invocation flush leaves young updates buffered, and writes due ones."""
+    writer = RecordingWriter()
+    buffer = IpAuditWriteBuffer(writer, max_batch_size=100, max_age_seconds=60)
+
+    buffer.record("1.1.1.1", 100, ["Paris"], ["Paris"])
+    assert buffer.flush_if_due() == 0
+    assert buffer.pending_count() == 1
+
+    buffer.max_age_seconds = 0
+    assert buffer.flush_if_due() == 0
+    assert writer.writes == [("1.1.1.1", 100, ["Paris"])]
+
+
+def test_sigterm_flushes_without_exiting_when_previously_ignored():
+    """Ensures a SIGTERM previously ignored (SIG_IGN) only flushes the buffer, instead of exiting."""
+    writer = RecordingWriter()
+    buffer = IpAuditWriteBuffer(writer, max_batch_size=100, max_age_seconds=60)
+    original_handler = signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    try:
+        buffer.install_shutdown_hooks()
+        buffer.record("1.1.1.1", 100, ["Paris"], ["Paris"])
+
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+
+        assert writer.writes == [("1.1.1.1", 100, ["Paris"])]
+    finally:
+        signal.signal(signal.SIGTERM, original_handler)
+        atexit.unregister(buffer.flush)
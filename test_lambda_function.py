@@ -0,0 +1,255 @@
+"""Unit tests for the Lambda handler and its DynamoDB audit trail.
+
+These tests validate the HTTP responses produced by the handler, with the
+RequestIPLogs table and the weather data layer mocked out, as well as the
+shape of the audit trail updates sent to DynamoDB.
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import lambda_function
+from benchmarks.stubs import InMemoryIpTable
+from city_weather_data import (CityWeatherData, WeatherCondition, CityWeatherDataCityNotFoundError,
+                               CityWeatherDataRequestError, CacheStatus)
+
+
+@pytest.fixture
+def context():
+    """A minimal AWS Lambda context object."""
+    return MagicMock(aws_request_id="test-request-id", **{'get_remaining_time_in_millis.return_value': 30_000})
+
+
+@pytest.fixture
+def ip_table():
+    """Replaces the RequestIPLogs table with a mock, returning an IP's previous audit trail values."""
+    table = MagicMock()
+    table.update_item.return_value = {
+        'Attributes': {'LastAccessTimestamp': 1_700_000_000, 'recent_cities': ["Paris", "Paris", "Rome"]}
+    }
+    with patch.object(lambda_function, 'get_ip_table', return_value=table):
+        yield table
+
+
+def make_event(city=None, ip="1.2.3.4"):
+    """Builds a Lambda Function URL event."""
+    return {
+        'queryStringParameters': {'city': city} if city else {},
+        'requestContext': {'http': {'sourceIp': ip}},
+    }
+
+
+@patch('city_weather_data.fetch_city_weather_data')
+def test_handler_success_uses_single_db_round_trip(mock_fetch, ip_table, context):
+    """
+    Verifies that a successful request updates the audit trail with a single DynamoDB call,
+    and reports the previous access time and city history returned by that same call.
+    """
+    mock_fetch.return_value = CityWeatherData(32.0, 34.0, 1_700_000_000, 20.0, WeatherCondition.CLEAR) \
+        .with_cache_status(CacheStatus.STALE)
+
+    response = lambda_function.lambda_handler(make_event("London"), context)
+    body = json.loads(response['body'])
+
+    assert response['statusCode'] == 200
+    assert body['cache_status'] == "stale"
+    assert body['last_access'] == "2023-11-14T22:13:20+00:00"
+    assert body['recent_cities'] == ["Paris", "Rome"]
+    assert ip_table.update_item.call_count == 1
+    assert ip_table.update_item.call_args.kwargs['ReturnValues'] == "UPDATED_OLD"
+    ip_table.get_item.assert_not_called()
+
+
+@patch('city_weather_data.fetch_city_weather_data')
+def test_handler_first_access_has_no_previous_values(mock_fetch, ip_table, context):
+    """Ensures that an IP's first access is reported without a previous access time or history."""
+    ip_table.update_item.return_value = {}
+    mock_fetch.side_effect = CityWeatherDataCityNotFoundError()
+
+    response = lambda_function.lambda_handler(make_event("Atlantis"), context)
+    body = json.loads(response['body'])
+
+    assert response['statusCode'] == 404
+    assert body['last_access'] == "N / A"
+    assert body['recent_cities'] == []
+
+
+@patch('city_weather_data.fetch_city_weather_data')
+def test_handler_provider_failure_returns_503(mock_fetch, ip_table, context):
+    """Validates that a primary provider failure is reported as 503 Service Unavailable."""
+    mock_fetch.side_effect = CityWeatherDataRequestError(None)
+
+    response = lambda_function.lambda_handler(make_event("London"), context)
+
+    assert response['statusCode'] == 503
+    assert json.loads(response['body'])['last_access'] == "2023-11-14T22:13:20+00:00"
+
+
+@patch('http_session.get_session')
+def test_handler_near_timeout_fails_fast_without_calling_providers(mock_get_session, ip_table, context):
+    """
+    Verifies that when the invocation's remaining time is (almost) used up by the time the weather
+    data is fetched, the request is answered with a 503 without sending any provider request.
+    """
+    context.get_remaining_time_in_millis.return_value = 350
+
+    response = lambda_function.lambda_handler(make_event("Deadline City"), context)
+
+    assert response['statusCode'] == 503
+    assert ip_table.update_item.call_count == 1
+    mock_get_session.assert_not_called()
+
+
+def test_handler_missing_city_returns_400(ip_table, context):
+    """Ensures a request without the 'city' parameter is rejected without touching DynamoDB."""
+    response = lambda_function.lambda_handler(make_event(), context)
+
+    assert response['statusCode'] == 400
+    ip_table.update_item.assert_not_called()
+
+
+def test_update_ip_fields_caps_history_and_trims_oversized_list(ip_table):
+    """
+    Verifies that the returned history is capped to RECENT_CITIES_MAX_LENGTH entries, and that
+    once the stored list exceeds the trim threshold, a conditional REMOVE trims it back.
+    """
+    stored_cities = [f"City{i}" for i in range(lambda_function.RECENT_CITIES_TRIM_THRESHOLD)]
+    ip_table.update_item.return_value = {'Attributes': {'LastAccessTimestamp': 1, 'recent_cities': stored_cities}}
+
+    _, recent_cities, success = lambda_function.update_ip_fields_in_db("1.2.3.4", 2, "London")
+
+    assert success
+    assert recent_cities == ["London"] + stored_cities[:lambda_function.RECENT_CITIES_MAX_LENGTH - 1]
+    assert ip_table.update_item.call_count == 2
+
+    trim_kwargs = ip_table.update_item.call_args.kwargs
+    assert trim_kwargs['UpdateExpression'].startswith(
+        f"REMOVE recent_cities[{lambda_function.RECENT_CITIES_MAX_LENGTH}], ")
+    assert trim_kwargs['ExpressionAttributeValues'] == {':n': lambda_function.RECENT_CITIES_TRIM_THRESHOLD + 1}
+
+
+def test_update_ip_fields_keeps_history_bounded_under_large_batches():
+    """
+    Ensures that batches larger than the trim threshold, in both sync and write-behind writes, never
+    grow the stored history past RECENT_CITIES_TRIM_THRESHOLD entries.
+    """
+    table = InMemoryIpTable()
+    batch = [f"City{i}" for i in range(lambda_function.BATCH_MAX_CITIES)]
+
+    with patch.object(lambda_function, 'get_ip_table', return_value=table):
+        for timestamp in range(10):
+            _, recent_cities, success = lambda_function.update_ip_fields_in_db("1.2.3.4", timestamp, batch)
+            assert success
+            assert recent_cities == batch[:lambda_function.RECENT_CITIES_MAX_LENGTH]
+            assert len(table.items["1.2.3.4"]['recent_cities']) <= lambda_function.RECENT_CITIES_TRIM_THRESHOLD
+
+            assert lambda_function.write_buffered_ip_fields_to_db("5.6.7.8", timestamp, batch)
+            assert len(table.items["5.6.7.8"]['recent_cities']) <= lambda_function.RECENT_CITIES_TRIM_THRESHOLD
+
+
+@patch('city_weather_data.fetch_city_weather_data')
+def test_handler_batch_from_repeated_city_params(mock_fetch, ip_table, context):
+    """
+    Verifies that repeated 'city' parameters are de-duplicated by normalized name, fetched
+    independently (one failing city does not fail the others), and audited with a single update.
+    """
+    def fetch_side_effect(city, coordinates=None, stage_timer=None, deadline=None, open_meteo_fetch=None):
+        if city == "Atlantis":
+            raise CityWeatherDataCityNotFoundError()
+        return CityWeatherData(32.0, 34.0, 1_700_000_000, 20.0, WeatherCondition.CLEAR)
+
+    mock_fetch.side_effect = fetch_side_effect
+    event = make_event() | {'rawQueryString': "city=London&city=Atlantis&city=london&city=New%20York"}
+
+    response = lambda_function.lambda_handler(event, context)
+    body = json.loads(response['body'])
+
+    assert response['statusCode'] == 200
+    assert list(body['results']) == ["London", "New York"]
+    assert body['errors']["Atlantis"]["status"] == 404
+    assert mock_fetch.call_count == 3
+    assert ip_table.update_item.call_count == 1
+    assert ip_table.update_item.call_args.kwargs['ExpressionAttributeValues'][':c'] == \
+        ["London", "Atlantis", "New York"]
+    assert body['recent_cities'] == ["Paris", "Rome"]
+
+
+@patch('city_weather_data.fetch_city_weather_data')
+def test_handler_batch_from_json_post_body(mock_fetch, ip_table, context):
+    """Ensures cities can be posted as a JSON body, which is always answered as a batch."""
+    mock_fetch.return_value = CityWeatherData(32.0, 34.0, 1_700_000_000, 20.0, WeatherCondition.CLEAR)
+    event = make_event() | {'body': json.dumps({"cities": ["Paris"]})}
+    event['requestContext']['http']['method'] = "POST"
+
+    response = lambda_function.lambda_handler(event, context)
+
+    assert response['statusCode'] == 200
+    assert list(json.loads(response['body'])['results']) == ["Paris"]
+
+
+@pytest.mark.parametrize("body", ["not json", json.dumps(["Paris"]), json.dumps({"cities": "Paris"})])
+def test_handler_batch_rejects_invalid_body(body, ip_table, context):
+    """Validates that malformed batch bodies are rejected with 400 Bad Request."""
+    event = make_event() | {'body': body}
+    event['requestContext']['http']['method'] = "POST"
+
+    response = lambda_function.lambda_handler(event, context)
+
+    assert response['statusCode'] == 400
+    ip_table.update_item.assert_not_called()
+
+
+@patch('stage_timing.STAGE_TIMINGS_ENABLED', True)
+@patch('city_weather_data.fetch_city_weather_data')
+def test_handler_emits_stage_timings_as_single_emf_record(mock_fetch, ip_table, context, capsys):
+    """Verifies that, when enabled, the stage timings of an invocation are logged as one EMF record."""
+    mock_fetch.return_value = CityWeatherData(32.0, 34.0, 1_700_000_000, 20.0, WeatherCondition.CLEAR)
+
+    lambda_function.lambda_handler(make_event("London"), context)
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith('{"_aws"')]
+    assert len(records) == 1
+    assert records[0]["RequestId"] == "test-request-id"
+    assert records[0]["StatusCode"] == 200
+    assert {"parse_request_ms", "dynamodb_update_ms", "fetch_ms", "serialization_ms", "total_ms"} <= set(records[0])
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@patch('city_weather_data.fetch_city_weather_data')
+def test_handler_encodes_weather_as_json_object(mock_fetch, use_orjson, ip_table, context):
+    """
+    Ensures the weather data is embedded in the response body as a JSON object, encoded once
+    (not as an escaped JSON string), identically with the orjson and standard library backends.
+    """
+    mock_fetch.return_value = CityWeatherData(32.0, 34.0, 1_700_000_000, 20.0, WeatherCondition.CLEAR)
+
+    if use_orjson:
+        pytest.importorskip("orjson")
+        response = lambda_function.lambda_handler(make_event("Zürich"), context)
+    else:
+        with patch('json_codec.orjson', None):
+            response = lambda_function.lambda_handler(make_event("Zürich"), context)
+
+    assert '"city":"Zürich"' in response['body']
+    assert json.loads(response['body'])['weather'] == {
+        "latitude": 32.0, "longitude": 34.0, "last_update": "2023-11-14T22:13:20+00:00",
+        "temp_c": "20.00", "weather_condition": mock_fetch.return_value.to_dict()["weather_condition"],
+    }
+
+
+@patch('city_weather_data.fetch_city_weather_data_async')
+def test_asyncio_handler_matches_sync_responses(mock_fetch_async, ip_table, context):
+    """Ensures the async entry point audits the request once and answers like the sync handler."""
+    mock_fetch_async.return_value = CityWeatherData(32.0, 34.0, 1_700_000_000, 20.0, WeatherCondition.CLEAR)
+
+    response = lambda_function.asyncio_lambda_handler(make_event("London"), context)
+    body = json.loads(response['body'])
+
+    assert response['statusCode'] == 200
+    assert body['weather']['temp_c'] == "20.00"
+    assert body['recent_cities'] == ["Paris", "Rome"]
+    assert ip_table.update_item.call_count == 1
+
+    mock_fetch_async.side_effect = CityWeatherDataCityNotFoundError()
+    assert lambda_function.asyncio_lambda_handler(make_event("Atlantis"), context)['statusCode'] == 404
@@ -0,0 +1,120 @@
+"""Unit tests for the OpenMeteo provider module."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+import circuit_breaker
+from open_meteo import (OpenMeteoRequestError, OpenMeteoResponse, clear_open_meteo_cache, fetch_data_open_meteo,
+                        fetch_data_open_meteo_batch, get_open_meteo_cache_stats, quantize_coordinates)
+
+
+@pytest.fixture(autouse=True)
+def reset_breakers_and_cache():
+    circuit_breaker.reset_circuit_breakers()
+    clear_open_meteo_cache()
+    yield
+    circuit_breaker.reset_circuit_breakers()
+
+
+def location_data(latitude: float, longitude: float) -> dict:
+    return {"latitude": latitude, "longitude": longitude,
+            "current_weather": {"time": "2024-05-01T12:00", "temperature": latitude, "weathercode": 2}}
+
+
+@patch('open_meteo.OPEN_METEO_BATCH_MAX_LOCATIONS', 2)
+@patch('http_session.get_deadline_bound_request')
+def test_batch_fetch_splits_locations_into_chunks(mock_get_request):
+    """
+    Verifies that a batch is requested in chunks of comma-separated coordinates, that each location gets
+    its own response in order (a single-location chunk being answered with a bare object), and that a
+    failed chunk only fails its own locations.
+    """
+    def get_side_effect(url, timeout):
+        if "latitude=3.0,4.0&" in url:
+            raise requests.exceptions.ConnectionError("connection reset")
+        response = MagicMock()
+        if "latitude=1.0,2.0&longitude=10.0,20.0&" in url:
+            response.json.return_value = [location_data(1.0, 10.0), location_data(2.0, 20.0)]
+        else:
+            response.json.return_value = location_data(5.0, 50.0)
+        return response
+
+    session = MagicMock()
+    session.get.side_effect = get_side_effect
+    mock_get_request.return_value = (session, (1, 2), False)
+
+    results = fetch_data_open_meteo_batch([(1.0, 10.0), (2.0, 20.0), (3.0, 30.0), (4.0, 40.0), (5.0, 50.0)])
+
+    assert session.get.call_count == 3
+    assert [type(result) for result in results] == [OpenMeteoResponse, OpenMeteoResponse, OpenMeteoRequestError,
+                                                    OpenMeteoRequestError, OpenMeteoResponse]
+    assert [(result.latitude, result.temp_c) for result in results if isinstance(result, OpenMeteoResponse)] == \
+        [(1.0, 1.0), (2.0, 2.0), (5.0, 5.0)]
+
+
+@pytest.mark.parametrize("body", [
+    [location_data(1.0, 10.0)],
+    [location_data(1.0, 10.0), "not an object"],
+    [location_data(1.0, 10.0), {"current_weather": []}],
+])
+@patch('http_session.get_deadline_bound_request')
+def test_batch_fetch_fails_only_its_locations_on_a_malformed_answer(mock_get_request, body):
+    """
+    Ensures that a malformed batch answer (a result missing, or not an object) is raised as an
+    OpenMeteoRequestError of the batch's locations, and counted as a failure of the provider.
+    """
+    session = MagicMock()
+    session.get.return_value.json.return_value = body
+    mock_get_request.return_value = (session, (1, 2), False)
+
+    results = fetch_data_open_meteo_batch([(1.0, 10.0), (2.0, 20.0)])
+
+    assert all(isinstance(result, OpenMeteoRequestError) for result in results)
+    assert isinstance(results[0].error, ValueError)
+    assert circuit_breaker.get_circuit_breaker("open_meteo").stats()["consecutive_failures"] == 1
+
+
+@pytest.mark.parametrize("latitude, longitude, expected_grid_point", [
+    (48.8566, 2.3522, (48.85, 2.35)),
+    (48.8249, 2.3751, (48.8, 2.4)),
+    (-33.8688, 151.2093, (-33.85, 151.2)),
+])
+def test_coordinates_are_snapped_to_the_grid(latitude, longitude, expected_grid_point):
+    """Validates that coordinates are snapped to the nearest point of the grid, without float noise."""
+    assert quantize_coordinates(latitude, longitude, 0.05) == expected_grid_point
+
+
+@patch('http_session.get_deadline_bound_request')
+def test_neighbouring_lookups_share_one_request_per_grid_point(mock_get_request):
+    """
+    Verifies that lookups snapped to the same grid point are served by a single request for that
+    point, single and batched alike, and that the cache reports its hit rate.
+    """
+    def get_side_effect(url, timeout):
+        response = MagicMock()
+        latitudes = url.split("latitude=")[1].split("&")[0].split(",")
+        longitudes = url.split("longitude=")[1].split("&")[0].split(",")
+        locations = [location_data(float(latitude), float(longitude))
+                     for latitude, longitude in zip(latitudes, longitudes)]
+        response.json.return_value = locations if len(locations) > 1 else locations[0]
+        return response
+
+    session = MagicMock()
+    session.get.side_effect = get_side_effect
+    mock_get_request.return_value = (session, (1, 2), False)
+    stats_before = get_open_meteo_cache_stats()
+
+    first = fetch_data_open_meteo(48.8566, 2.3522)
+    neighbour = fetch_data_open_meteo(48.8601, 2.3390)
+    assert neighbour is first
+    assert "latitude=48.85&longitude=2.35&" in session.get.call_args.args[0]
+
+    results = fetch_data_open_meteo_batch([(48.8530, 2.3499), (51.5074, -0.1278), (51.5155, -0.1419)])
+
+    assert session.get.call_count == 2
+    assert "latitude=51.5&longitude=-0.15&" in session.get.call_args.args[0]
+    assert results[0] is first and results[1] is results[2]
+    stats = get_open_meteo_cache_stats()
+    assert (stats["hits"] - stats_before["hits"], stats["misses"] - stats_before["misses"]) == (2, 2)
+    assert 0 < stats["hit_rate"] <= 1
@@ -0,0 +1,137 @@
+"""Unit tests for the popularity-driven cache prewarming job."""
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import aws_clients
+import geocode_cache
+import prewarm_cache
+from city_weather_data import (CityWeatherData, WeatherCondition, cache_city_weather_data,
+                               clear_city_weather_cache)
+from deadline import NO_DEADLINE
+from open_meteo import OpenMeteoResponse
+from weather_api import WeatherApiCityNotFoundError, WeatherApiResponse
+from weather_cache import MemoryWeatherCacheStore, SharedWeatherEntry
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Isolates tests from the coordinates and results cached by previous tests."""
+    geocode_cache.get_geocode_cache().clear()
+    clear_city_weather_cache()
+
+
+@pytest.fixture
+def ip_table():
+    """A RequestIPLogs table whose scan answers two pages of histories."""
+    table = MagicMock()
+    table.scan.side_effect = [
+        {'Items': [{'recent_cities': ["Paris", "Rome", "paris"]}, {'recent_cities': ["Rome", "Oslo"]}],
+         'LastEvaluatedKey': {'ip': "1.2.3.4"}},
+        {'Items': [{'recent_cities': ["  PARIS ", "Atlantis"]}, {}]},
+    ]
+    with patch.object(aws_clients, 'get_dynamodb_table', return_value=table) as mock_get_table:
+        yield table
+    mock_get_table.assert_called_with("RequestIPLogs")
+
+
+def test_top_cities_are_counted_by_normalized_name_across_pages(ip_table):
+    """
+    Verifies that the histories of every scanned page are counted by normalized city name, under
+    their first spelling seen, and that only the IPs seen since the given time are scanned.
+    """
+    assert prewarm_cache.get_top_cities(2, since_timestamp=1_700_000_000) == ["Paris", "Rome"]
+
+    first_scan_kwargs, second_scan_kwargs = (call.kwargs for call in ip_table.scan.call_args_list)
+    assert first_scan_kwargs['ExpressionAttributeValues'] == {':since': 1_700_000_000}
+    assert second_scan_kwargs['ExclusiveStartKey'] == {'ip': "1.2.3.4"}
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo_batch')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_prewarm_refreshes_expired_top_cities_and_reports(mock_open_meteo, mock_open_meteo_batch, mock_weather_api,
+                                                          ip_table):
+    """
+    Verifies that the job skips the cities still fresh in the cache, fetches the others (the OpenMeteo
+    data of those with known coordinates in one batched request) into the cache, and reports the outcomes.
+    """
+    fresh_timestamp = int(time.time()) - 60
+    fresh_time = time.strftime('%Y-%m-%dT%H:%M', time.gmtime(fresh_timestamp))
+
+    def weather_api_side_effect(city_name, deadline=NO_DEADLINE):
+        if city_name == "Atlantis":
+            raise WeatherApiCityNotFoundError()
+        return MagicMock(spec=WeatherApiResponse, latitude=1.0, longitude=2.0, temp_c=30.0,
+                         last_update_epoch=fresh_timestamp, condition_text="Clear")
+
+    mock_weather_api.side_effect = weather_api_side_effect
+    mock_open_meteo.return_value = MagicMock(spec=OpenMeteoResponse, latitude=1.0, longitude=2.0, temp_c=32.0,
+                                             time=fresh_time, weather_code=0)
+    mock_open_meteo_batch.return_value = [mock_open_meteo.return_value] * 2
+    cache_city_weather_data("paris", CityWeatherData(1.0, 2.0, fresh_timestamp, 20.0, WeatherCondition.CLEAR))
+    geocode_cache.get_geocode_cache().put("Rome", 10.0, 20.0)
+    geocode_cache.get_geocode_cache().put("Oslo", 30.0, 40.0)
+
+    report = prewarm_cache.prewarm(top_n=10, lookback_hours=1, max_workers=4)
+
+    assert {name: report[name] for name in ("cities", "refreshed", "fresh", "refreshing_elsewhere", "failed")} == \
+        {"cities": 4, "refreshed": 2, "fresh": 1, "refreshing_elsewhere": 0, "failed": 1}
+    assert report["duration_ms"] >= 0
+    mock_open_meteo_batch.assert_called_once_with([(10.0, 20.0), (30.0, 40.0)], NO_DEADLINE)
+    assert {call.args[0] for call in mock_weather_api.call_args_list} == {"Rome", "Oslo", "Atlantis"}
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_prewarm_refreshes_results_expiring_before_next_run_and_survives_errors(mock_open_meteo, mock_weather_api,
+                                                                                ip_table):
+    """
+    Ensures that a cached result whose soft TTL ends before the next run is refreshed, unless the interval
+    is shorter, and that an unexpected error only fails its own city.
+    """
+    expiring_timestamp = int(time.time()) - 800
+
+    def weather_api_side_effect(city_name, deadline=NO_DEADLINE):
+        if city_name == "Rome":
+            raise RuntimeError("unexpected payload")
+        return MagicMock(spec=WeatherApiResponse, latitude=1.0, longitude=2.0, temp_c=30.0,
+                         last_update_epoch=int(time.time()), condition_text="Clear")
+
+    mock_weather_api.side_effect = weather_api_side_effect
+    mock_open_meteo.return_value = MagicMock(spec=OpenMeteoResponse, latitude=1.0, longitude=2.0, temp_c=32.0,
+                                             time=time.strftime('%Y-%m-%dT%H:%M', time.gmtime()), weather_code=0)
+    cache_city_weather_data("paris", CityWeatherData(1.0, 2.0, expiring_timestamp, 20.0, WeatherCondition.CLEAR))
+
+    report = prewarm_cache.prewarm(top_n=2, lookback_hours=1, max_workers=2, interval_seconds=60)
+    assert (report["fresh"], report["refreshed"], report["failed"]) == (1, 0, 1)
+
+    ip_table.scan.side_effect = [{'Items': [{'recent_cities': ["Paris", "Rome", "Paris"]}]}]
+    report = prewarm_cache.prewarm(top_n=2, lookback_hours=1, max_workers=2, interval_seconds=600)
+    assert (report["fresh"], report["refreshed"], report["failed"]) == (0, 1, 1)
+
+
+@patch('weather_api.fetch_data_weather_api')
+@patch('open_meteo.fetch_data_open_meteo')
+def test_prewarm_refreshes_shared_results_expiring_before_next_run(mock_open_meteo, mock_weather_api, ip_table):
+    """
+    Verifies that, with a shared tier, a result it holds whose soft TTL ends before the next run is fetched
+    from the providers and written back, rather than served from the shared tier as fresh.
+    """
+    now = int(time.time())
+    mock_weather_api.return_value = MagicMock(spec=WeatherApiResponse, latitude=1.0, longitude=2.0, temp_c=30.0,
+                                              last_update_epoch=now, condition_text="Clear")
+    mock_open_meteo.return_value = MagicMock(spec=OpenMeteoResponse, latitude=1.0, longitude=2.0, temp_c=32.0,
+                                             time=time.strftime('%Y-%m-%dT%H:%M', time.gmtime(now)), weather_code=0)
+    store = MemoryWeatherCacheStore()
+    expiring_data = CityWeatherData(1.0, 2.0, now - 800, 20.0, WeatherCondition.CLEAR)
+    store.put("paris", SharedWeatherEntry(json.dumps(expiring_data.to_record()), now - 800, now + 100, now + 3600))
+
+    with patch('weather_cache.get_weather_cache_store', return_value=store):
+        report = prewarm_cache.prewarm(top_n=1, lookback_hours=1, max_workers=2, interval_seconds=600)
+
+    assert (report["fresh"], report["refreshed"]) == (0, 1)
+    mock_weather_api.assert_called_once()
+    assert store.get("paris").last_update_epoch > now - 800
@@ -0,0 +1,49 @@
+"""Unit tests for the long-running HTTP server mode (WSGI adapter)."""
+import io
+import json
+from unittest.mock import MagicMock, patch
+from wsgiref.util import setup_testing_defaults
+
+import lambda_function
+import server
+from city_weather_data import CityWeatherData, WeatherCondition
+
+
+def call_app(path="/", query="", method="GET", body=b"", remote_addr="1.2.3.4"):
+    """Calls the WSGI application, returning (status, headers, body)."""
+    environ = {'PATH_INFO': path, 'QUERY_STRING': query, 'REQUEST_METHOD': method, 'REMOTE_ADDR': remote_addr,
+               'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body)}
+    setup_testing_defaults(environ)
+    captured = {}
+
+    def start_response(status, headers):
+        captured['status'], captured['headers'] = status, dict(headers)
+
+    response_body = b"".join(server.app(environ, start_response))
+    return captured['status'], captured['headers'], response_body
+
+
+@patch('city_weather_data.fetch_city_weather_data_batch')
+def test_app_translates_requests_and_responses(mock_fetch_batch):
+    """
+    Verifies that a request is served through lambda_handler with the query string, method,
+    body and client IP it carried, and that the handler's response is returned as is.
+    """
+    mock_fetch_batch.return_value = {"London": CityWeatherData(51.5, -0.1, 1_700_000_000, 12.0,
+                                                               WeatherCondition.CLEAR)}
+    table = MagicMock()
+    table.update_item.return_value = {}
+
+    with patch.object(lambda_function, 'get_ip_table', return_value=table):
+        status, headers, body = call_app(method="POST", body=json.dumps({"cities": ["London"]}).encode())
+
+    assert status == "200 OK"
+    assert headers['Content-Type'] == "application/json"
+    assert json.loads(body)['results']["London"]['temp_c'] == "12.00"
+    assert table.update_item.call_args.kwargs['Key'] == {'ip': "1.2.3.4"}
+
+
+def test_app_answers_health_checks_and_client_errors():
+    """Ensures health checks are answered directly, and handler errors keep their status codes."""
+    assert call_app(path="/health")[0] == "200 OK"
+    assert call_app(query="")[0] == "400 Bad Request"
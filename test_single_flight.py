@@ -0,0 +1,64 @@
+"""Unit tests for the single-flight coalescing of concurrent identical calls."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_call_result_and_exception():
+    """
+    Verifies that concurrent callers of the same key wait for a single call and share its
+    result, that its exception is raised to every caller, and that the key is then released.
+    """
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_call(value):
+        calls.append(value)
+        assert release.wait(timeout=5)
+        if value == "error":
+            raise ValueError(value)
+        return value
+
+    for value in ("ok", "error"):
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flight.do, "London", slow_call, value) for _ in range(5)]
+            # let every follower join the in-flight call before it completes
+            while flight.stats()["coalesced"] < (4 if value == "ok" else 8):
+                time.sleep(0.001)
+            release.set()
+        release.clear()
+
+        if value == "ok":
+            assert [future.result() for future in futures] == ["ok"] * 5
+        else:
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+
+    assert calls == ["ok", "error"]
+    assert flight.stats() == {"calls": 2, "coalesced": 8, "in_flight": 0}
+
+
+def test_concurrent_coroutines_share_one_call():
+    """Ensures coroutines awaiting the same key share one call, while different keys run their own."""
+    flight = SingleFlight()
+    calls = []
+
+    async def slow_call(city):
+        calls.append(city)
+        await asyncio.sleep(0.01)
+        return city.upper()
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async(city, slow_call, city)
+                                      for city in ("paris", "paris", "rome", "paris")))
+
+    assert asyncio.run(main()) == ["PARIS", "PARIS", "ROME", "PARIS"]
+    assert sorted(calls) == ["paris", "rome"]
+    assert flight.stats() == {"calls": 2, "coalesced": 2, "in_flight": 0}
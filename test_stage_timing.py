@@ -0,0 +1,42 @@
+"""Unit tests for the per-invocation stage timing instrumentation."""
+import time
+
+from stage_timing import NULL_STAGE_TIMER, StageTimer
+
+
+def test_stage_timer_accumulates_stages_and_builds_emf_record():
+    """
+    Verifies that repeated stages accumulate, that a stage raising is still timed, and that
+    the EMF record declares every stage as a metric alongside the given properties.
+    """
+    timer = StageTimer()
+    with timer.stage("weather_api"):
+        time.sleep(0.01)
+    with timer.stage("weather_api"):
+        time.sleep(0.01)
+    try:
+        with timer.stage("open_meteo"):
+            raise ValueError()
+    except ValueError:
+        pass
+
+    record = timer.to_emf({"RequestId": "abc"}, namespace="Test")
+
+    assert timer.durations["weather_api"] >= 0.02
+    assert list(timer.durations) == ["weather_api", "open_meteo"]
+    metrics = record["_aws"]["CloudWatchMetrics"][0]
+    assert metrics["Namespace"] == "Test"
+    assert [metric["Name"] for metric in metrics["Metrics"]] == ["weather_api_ms", "open_meteo_ms"]
+    assert record["weather_api_ms"] >= 20
+    assert record["RequestId"] == "abc"
+
+
+def test_null_stage_timer_records_nothing(capsys):
+    """Ensures the timer used when stage timing is disabled neither records nor emits anything."""
+    with NULL_STAGE_TIMER.stage("weather_api"):
+        pass
+    NULL_STAGE_TIMER.add("open_meteo", 1.0)
+    NULL_STAGE_TIMER.emit()
+
+    assert NULL_STAGE_TIMER.durations == {}
+    assert capsys.readouterr().out == ""
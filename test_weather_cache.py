@@ -0,0 +1,74 @@
+"""Unit tests for the shared tier of the aggregated weather cache.
+
+These tests validate the stand-in stores (in-memory and SQLite) against the contract of the
+DynamoDB one: conditional writes never replace newer data, expired entries are not served,
+and a city's refresh lease is held by a single caller until written, released or expired.
+"""
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from weather_cache import (DynamoDbWeatherCacheStore, MemoryWeatherCacheStore, SharedWeatherEntry,
+                           SqliteWeatherCacheStore)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Each stand-in store."""
+    if request.param == "memory":
+        return MemoryWeatherCacheStore()
+    return SqliteWeatherCacheStore(str(tmp_path / "weather.sqlite3"))
+
+
+def make_entry(last_update_epoch, data="{}", ttl_seconds=600):
+    now = time.time()
+    return SharedWeatherEntry(data, last_update_epoch, now + ttl_seconds / 2, now + ttl_seconds)
+
+
+def test_store_writes_are_conditional_on_newer_data(store):
+    """Ensures a write of older data than the stored one is rejected, and expired entries are not served."""
+    assert store.get("london") is None
+    assert store.put("london", make_entry(1_700_000_100, data='{"v": 2}'))
+    assert not store.put("london", make_entry(1_700_000_000, data='{"v": 1}'))
+    assert store.get("london").data == '{"v": 2}'
+
+    assert store.put("paris", make_entry(1_700_000_000, ttl_seconds=-1))
+    assert store.get("paris") is None
+
+
+def test_store_lease_is_exclusive_until_written_released_or_expired(store):
+    """Verifies that a single caller holds a city's refresh lease, until its write, release or expiry."""
+    assert store.try_acquire_lease("rome", lease_seconds=60)
+    assert not store.try_acquire_lease("rome", lease_seconds=60)
+    assert store.get("rome") is None  # a lease alone is not an entry
+
+    store.put("rome", make_entry(1_700_000_000))
+    assert store.try_acquire_lease("rome", lease_seconds=60)
+
+    store.release_lease("rome")
+    assert store.try_acquire_lease("rome", lease_seconds=-1)
+    assert store.try_acquire_lease("rome", lease_seconds=60)
+
+
+@pytest.mark.parametrize("error", [
+    EndpointConnectionError(endpoint_url="https://dynamodb.eu-west-1.amazonaws.com"),
+    ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException'}}, 'GetItem'),
+])
+def test_dynamodb_store_falls_back_on_storage_failures(error):
+    """
+    Checks that failures of the DynamoDB store, service errors as well as the SDK's own (e.g. a
+    connection failure), are reported as a miss, a dropped write and a granted lease, and are never raised.
+    """
+    table = MagicMock()
+    for method in (table.get_item, table.put_item, table.update_item):
+        method.side_effect = error
+
+    with patch('aws_clients.get_dynamodb_table', return_value=table):
+        store = DynamoDbWeatherCacheStore("CityWeatherCache")
+
+    assert store.get("london") is None
+    assert not store.put("london", make_entry(1_700_000_000))
+    assert store.try_acquire_lease("london")
+    store.release_lease("london")
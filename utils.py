@@ -61,3 +61,43 @@ def remove_adjacent_dups(seq: Iterable[Any]) -> List[Any]:
             ['A', 'B', 'C', 'D', 'A']
     """
     return [key for key, _ in groupby(seq)]
+
+
+def normalize_city_name(city_name: str) -> str:
+    """
+        Normalizes a city name into a stable key for caching and de-duplication.
+
+        Surrounding whitespace is stripped, inner whitespace runs are collapsed into
+        a single space and the result is case-folded.
+
+        Args:
+            city_name (str): The city name as provided by the user.
+
+        Returns:
+            str: The normalized city name.
+
+        Example:
+            >>> normalize_city_name("  New   YORK ")
+            'new york'
+    """
+    return " ".join(city_name.split()).casefold()
+
+
+def remove_city_name_dups(city_names: Iterable[str]) -> List[str]:
+    """
+        Removes city names that normalize to the same city, while preserving order.
+
+        Args:
+            city_names (Iterable[str]): City names, possibly spelled differently.
+
+        Returns:
+            List[str]: The first spelling of each distinct city, in order of first appearance.
+
+        Example:
+            >>> remove_city_name_dups(["London", "Paris", "london ", "PARIS", "Rome"])
+            ['London', 'Paris', 'Rome']
+    """
+    city_names_by_key = {}
+    for city_name in city_names:
+        city_names_by_key.setdefault(normalize_city_name(city_name), city_name)
+    return list(city_names_by_key.values())
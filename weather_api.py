@@ -13,10 +13,52 @@ The module follows a clean separation of concerns:
 
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
 
 import requests
+
+import async_workers
+import circuit_breaker
+import hedging
+import http_session
+from deadline import NO_DEADLINE, Deadline, DeadlineExceededError
 from weather_service import WeatherServiceError
 
+PROVIDER_NAME = "weather_api"
+DEFAULT_WEATHER_API_BASE_URL = "https://api.weatherapi.com/v1"
+
+# Hedged requests: when a request is still running after the WEATHER_API_HEDGE_PERCENTILE latency of the
+# recent requests (WEATHER_API_HEDGE_INITIAL_DELAY_MS until enough were observed), a duplicate is sent
+# and the first response wins. Disabled by default, as hedged requests count against the API quota.
+WEATHER_API_HEDGING_ENABLED = os.getenv('WEATHER_API_HEDGING_ENABLED', 'false').lower() == 'true'
+_hedging_policy = hedging.HedgingPolicy(
+    percentile=float(os.getenv('WEATHER_API_HEDGE_PERCENTILE', 95)),
+    initial_delay_seconds=float(os.getenv('WEATHER_API_HEDGE_INITIAL_DELAY_MS', 300)) / 1000)
+_hedging_executor = ThreadPoolExecutor(max_workers=int(os.getenv('WEATHER_API_HEDGE_MAX_WORKERS', 16)),
+                                       thread_name_prefix="weather-api-hedge")
+
+# Every condition text WeatherAPI documents (https://www.weatherapi.com/docs/weather_conditions.json),
+# used to precompute their normalization ahead of the first request.
+WEATHER_API_CONDITION_TEXTS = (
+    "Sunny", "Clear", "Partly cloudy", "Partly Cloudy", "Cloudy", "Overcast", "Mist", "Fog", "Freezing fog",
+    "Patchy rain possible", "Patchy rain nearby", "Patchy snow possible", "Patchy snow nearby",
+    "Patchy sleet possible", "Patchy sleet nearby", "Patchy freezing drizzle possible",
+    "Patchy freezing drizzle nearby", "Thundery outbreaks possible", "Thundery outbreaks in nearby",
+    "Blowing snow", "Blizzard", "Patchy light drizzle", "Light drizzle", "Freezing drizzle",
+    "Heavy freezing drizzle", "Patchy light rain", "Light rain", "Moderate rain at times", "Moderate rain",
+    "Heavy rain at times", "Heavy rain", "Light freezing rain", "Moderate or heavy freezing rain", "Light sleet",
+    "Moderate or heavy sleet", "Patchy light snow", "Light snow", "Patchy moderate snow", "Moderate snow",
+    "Patchy heavy snow", "Heavy snow", "Ice pellets", "Light rain shower", "Moderate or heavy rain shower",
+    "Torrential rain shower", "Light sleet showers", "Moderate or heavy sleet showers", "Light snow showers",
+    "Moderate or heavy snow showers", "Light showers of ice pellets", "Moderate or heavy showers of ice pellets",
+    "Patchy light rain with thunder", "Patchy light rain in area with thunder", "Moderate or heavy rain with thunder",
+    "Moderate or heavy rain in area with thunder", "Patchy light snow with thunder",
+    "Patchy light snow in area with thunder", "Moderate or heavy snow with thunder",
+    "Moderate or heavy snow in area with thunder",
+)
+
 
 class WeatherApiError(WeatherServiceError):
     """Base exception for errors originating from the WeatherAPI service."""
@@ -32,13 +74,16 @@ class WeatherApiRequestError(WeatherApiError):
     """Raised when a network or protocol-level error occurs during an API request.
 
         Attributes:
-            error: The underlying requests exception that triggered this error.
+            error: The underlying requests exception that triggered this error, or a CircuitOpenError
+                (DeadlineExceededError) if the request was not sent because the provider's circuit is open
+                (because too little of the request's budget was left).
     """
-    def __init__(self, error: requests.exceptions.HTTPError | requests.exceptions.RequestException):
+    def __init__(self, error: requests.exceptions.RequestException | circuit_breaker.CircuitOpenError
+                 | DeadlineExceededError):
         """Initializes the error with the original requests exception.
 
                 Args:
-                    error: The source HTTPError or RequestException.
+                    error: The source HTTPError or RequestException, or a CircuitOpenError or DeadlineExceededError.
         """
         self.error = error
 
@@ -122,7 +167,7 @@ class WeatherApiResponse:
         )
 
 
-def fetch_data_weather_api(city_name: str) -> WeatherApiResponse:
+def fetch_data_weather_api(city_name: str, deadline: Deadline = NO_DEADLINE) -> WeatherApiResponse:
     """Fetches real-time weather data from the WeatherAPI service.
 
         Connects to the WeatherAPI external endpoint to retrieve city location
@@ -131,6 +176,7 @@ def fetch_data_weather_api(city_name: str) -> WeatherApiResponse:
 
         Args:
             city_name: The name of the city to query (e.g., "London" or "Tel Aviv").
+            deadline: The request's deadline, to which the call's timeouts are capped.
 
         Returns:
             A WeatherApiResponse object populated with location metadata and current weather conditions.
@@ -138,13 +184,31 @@ def fetch_data_weather_api(city_name: str) -> WeatherApiResponse:
         Raises:
             WeatherApiCityNotFoundError: If the API returns a 1006 error code
                 indicating the city was not found.
-            WeatherApiRequestError: If a network error occurs or the API
-                returns a non-success status code.
+            WeatherApiRequestError: If a network error occurs, the API
+                returns a non-success status code, the provider's circuit is open,
+                or the deadline is (almost) reached.
     """
     WEATHER_API_KEY = os.getenv('WEATHER_API_KEY')
-    WEATHER_API_ENDPOINT = f"https://api.weatherapi.com/v1/current.json?key={WEATHER_API_KEY}&q={city_name}"
+    WEATHER_API_BASE_URL = os.getenv('WEATHER_API_BASE_URL', DEFAULT_WEATHER_API_BASE_URL)
+    WEATHER_API_ENDPOINT = f"{WEATHER_API_BASE_URL}/current.json?key={WEATHER_API_KEY}&q={city_name}"
+
     try:
-        response = requests.get(WEATHER_API_ENDPOINT)
+        session, timeout, timeout_capped = http_session.get_deadline_bound_request(PROVIDER_NAME, deadline)
+    except DeadlineExceededError as e:
+        raise WeatherApiRequestError(e)
+
+    breaker = circuit_breaker.get_circuit_breaker(PROVIDER_NAME)
+    if not breaker.allow_request():
+        raise WeatherApiRequestError(circuit_breaker.CircuitOpenError(PROVIDER_NAME))
+
+    try:
+        # Hedging is skipped while the circuit is probing a recovering provider
+        if WEATHER_API_HEDGING_ENABLED and breaker.state is circuit_breaker.CircuitState.CLOSED:
+            response = hedging.hedged_call(_hedging_executor, _hedging_policy,
+                                           lambda: timed_get(session, WEATHER_API_ENDPOINT, timeout),
+                                           is_healthy_response)
+        else:
+            response = timed_get(session, WEATHER_API_ENDPOINT, timeout)
 
         # Raise an exception for bad status codes (4xx or 5xx)
         response.raise_for_status()
@@ -166,10 +230,18 @@ def fetch_data_weather_api(city_name: str) -> WeatherApiResponse:
         condition_text = condition_dict.get("text", None)
         condition_code = condition_dict.get("code", None)
 
+        breaker.record_success()
         return WeatherApiResponse(city_name, country_name, latitude, longitude, last_updated_epoch, temp_c,
                                   condition_text, condition_code)
 
     except (requests.exceptions.HTTPError, requests.exceptions.RequestException) as err:
+        if timeout_capped and isinstance(err, requests.exceptions.Timeout):
+            breaker.record_cancelled()
+        elif http_session.is_provider_failure(err):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
         if (err.response is not None
             and err.response.content is not None
             and json.loads(err.response.content.decode('utf-8'))
@@ -177,3 +249,39 @@ def fetch_data_weather_api(city_name: str) -> WeatherApiResponse:
             raise WeatherApiCityNotFoundError()
         else:
             raise WeatherApiRequestError(err)
+    except Exception:
+        # e.g. a malformed body: the outcome must still be recorded, or a probe would stay in flight
+        breaker.record_failure()
+        raise
+
+
+def timed_get(session: requests.Session, url: str, timeout: Tuple[float, float]) -> requests.Response:
+    """GETs a WeatherAPI URL, recording the latency of successful responses for hedging."""
+    start = time.perf_counter()
+    response = session.get(url, timeout=timeout)
+    if response.ok:
+        _hedging_policy.latencies.record(time.perf_counter() - start)
+    return response
+
+
+def get_hedging_stats() -> dict:
+    """Returns the current hedge delay and hedge counters of WeatherAPI requests."""
+    return _hedging_policy.stats()
+
+
+def is_healthy_response(response: requests.Response) -> bool:
+    """Returns whether a response is an answer of a healthy provider, i.e. neither a 5xx nor a 429 one."""
+    return response.status_code < 500 and response.status_code != 429
+
+
+async def fetch_data_weather_api_async(city_name: str, deadline: Deadline = NO_DEADLINE) -> WeatherApiResponse:
+    """Asynchronous variant of fetch_data_weather_api, with the same results and exceptions.
+
+        The request is made on the provider's pooled session from a worker thread (see async_workers),
+        so the event loop is free to serve other requests while waiting for the provider.
+
+        Raises:
+            WeatherApiCityNotFoundError: If the city was not found.
+            WeatherApiRequestError: If a network error occurs or the API returns a non-success status code.
+    """
+    return await async_workers.run_blocking(fetch_data_weather_api, city_name, deadline)
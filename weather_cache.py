@@ -0,0 +1,290 @@
+"""Shared Aggregated Weather Cache Module.
+
+The in-process cache of aggregated results only serves the container that filled it, while
+hundreds of concurrent containers each fetch the same cities from the providers. This module
+provides a shared tier, consulted (after the in-process tier) before calling the providers,
+and keyed by normalized city name: a DynamoDB table using native TTL to drop expired entries,
+or a local SQLite file / in-memory stand-in (e.g. for local runs and tests).
+
+Entries carry the same soft TTL and stale cutoff (hard expiry) as the in-process tier. To
+avoid a thundering herd of containers refreshing the same city at once, a container first
+takes the city's refresh lease, with a conditional write: only the holder of the lease calls
+the providers, while the others serve the stale entry, or briefly wait for the holder's write
+when there is none. Writes are conditional too, so older data never replaces newer data.
+
+Configuration (environment variables):
+    WEATHER_CACHE_BACKEND: 'none' (no shared tier, default), 'memory', 'sqlite' or 'dynamodb'.
+    WEATHER_CACHE_SQLITE_PATH: SQLite file of the 'sqlite' backend (default '<tmp>/weather_cache.sqlite3').
+    WEATHER_CACHE_TABLE: DynamoDB table of the 'dynamodb' backend, with 'city' as the Partition Key
+        and TTL enabled on the 'expires_at' attribute (default 'CityWeatherCache').
+    WEATHER_CACHE_LEASE_SECONDS: Time a refresh lease is held before others may take it over (default 10).
+    WEATHER_CACHE_LEASE_WAIT_SECONDS: Time a container waits for the lease holder's write when nothing is
+        cached, before calling the providers itself (default 2).
+"""
+
+import abc
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Optional
+
+import aws_clients
+
+DEFAULT_TABLE_NAME = "CityWeatherCache"
+WEATHER_CACHE_LEASE_SECONDS = float(os.getenv('WEATHER_CACHE_LEASE_SECONDS', 10))
+WEATHER_CACHE_LEASE_WAIT_SECONDS = float(os.getenv('WEATHER_CACHE_LEASE_WAIT_SECONDS', 2))
+
+
+class SharedWeatherEntry:
+    """An aggregated result stored in the shared tier.
+
+        Attributes:
+            data: The serialized result (see CityWeatherData.to_record).
+            last_update_epoch: The result's last update time, ordering the writes of a city.
+            soft_expires_at: Unix epoch time after which the result should be refreshed.
+            expires_at: Unix epoch time after which the result must not be served anymore.
+    """
+    def __init__(self, data: str, last_update_epoch: int, soft_expires_at: float, expires_at: float):
+        self.data = data
+        self.last_update_epoch = last_update_epoch
+        self.soft_expires_at = soft_expires_at
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(last_update_epoch={self.last_update_epoch!r}, "
+                f"soft_expires_at={self.soft_expires_at!r}, expires_at={self.expires_at!r})")
+
+
+class WeatherCacheStore(abc.ABC):
+    """Interface of a shared weather cache store, keyed by normalized city name.
+
+        Implementations must never raise on storage failures: a failed lookup is reported as
+        a miss, a failed write is dropped, and a failed lease acquisition grants the lease,
+        as the shared tier is only an optimization.
+    """
+    @abc.abstractmethod
+    def get(self, city_key: str) -> Optional[SharedWeatherEntry]:
+        """Returns the live (not yet expired) entry of a normalized city name, or None."""
+
+    @abc.abstractmethod
+    def put(self, city_key: str, entry: SharedWeatherEntry) -> bool:
+        """Stores an entry, unless newer data is already stored, releasing the city's lease.
+
+            Returns:
+                Whether the entry was written.
+        """
+
+    @abc.abstractmethod
+    def try_acquire_lease(self, city_key: str, lease_seconds: float = WEATHER_CACHE_LEASE_SECONDS) -> bool:
+        """Takes the refresh lease of a city, unless another caller holds an unexpired one."""
+
+    @abc.abstractmethod
+    def release_lease(self, city_key: str):
+        """Releases the refresh lease of a city (e.g. after a failed fetch)."""
+
+
+class MemoryWeatherCacheStore(WeatherCacheStore):
+    """A process-local WeatherCacheStore, standing in for a shared one (e.g. in tests)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, SharedWeatherEntry] = {}
+        self._leases: Dict[str, float] = {}
+
+    def get(self, city_key: str) -> Optional[SharedWeatherEntry]:
+        with self._lock:
+            entry = self._entries.get(city_key)
+        return entry if entry is not None and time.time() < entry.expires_at else None
+
+    def put(self, city_key: str, entry: SharedWeatherEntry) -> bool:
+        with self._lock:
+            stored = self._entries.get(city_key)
+            if stored is not None and stored.last_update_epoch > entry.last_update_epoch:
+                return False
+            self._entries[city_key] = entry
+            self._leases.pop(city_key, None)
+            return True
+
+    def try_acquire_lease(self, city_key: str, lease_seconds: float = WEATHER_CACHE_LEASE_SECONDS) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._leases.get(city_key, 0) > now:
+                return False
+            self._leases[city_key] = now + lease_seconds
+            return True
+
+    def release_lease(self, city_key: str):
+        with self._lock:
+            self._leases.pop(city_key, None)
+
+
+class SqliteWeatherCacheStore(WeatherCacheStore):
+    """A WeatherCacheStore backed by a local SQLite file, shared by the processes of a host."""
+    def __init__(self, path: str):
+        """Opens (and creates if needed) the SQLite database at path."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS weather (city TEXT PRIMARY KEY, data TEXT, "
+                                     "last_update_epoch INTEGER, soft_expires_at REAL, expires_at REAL, "
+                                     "lease_until REAL)")
+
+    def get(self, city_key: str) -> Optional[SharedWeatherEntry]:
+        try:
+            with self._lock:
+                row = self._connection.execute("SELECT data, last_update_epoch, soft_expires_at, expires_at "
+                                               "FROM weather WHERE city = ? AND data IS NOT NULL AND expires_at > ?",
+                                               (city_key, time.time())).fetchone()
+            return SharedWeatherEntry(*row) if row else None
+        except sqlite3.Error as e:
+            print(f"Error reading weather of '{city_key}' from SQLite: {e}")
+            return None
+
+    def put(self, city_key: str, entry: SharedWeatherEntry) -> bool:
+        try:
+            with self._lock, self._connection:
+                cursor = self._connection.execute(
+                    "INSERT INTO weather (city, data, last_update_epoch, soft_expires_at, expires_at, lease_until) "
+                    "VALUES (?, ?, ?, ?, ?, NULL) ON CONFLICT (city) DO UPDATE SET data = excluded.data, "
+                    "last_update_epoch = excluded.last_update_epoch, soft_expires_at = excluded.soft_expires_at, "
+                    "expires_at = excluded.expires_at, lease_until = NULL "
+                    "WHERE weather.last_update_epoch IS NULL OR weather.last_update_epoch <= excluded.last_update_epoch",
+                    (city_key, entry.data, entry.last_update_epoch, entry.soft_expires_at, entry.expires_at))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Error writing weather of '{city_key}' to SQLite: {e}")
+            return False
+
+    def try_acquire_lease(self, city_key: str, lease_seconds: float = WEATHER_CACHE_LEASE_SECONDS) -> bool:
+        now = time.time()
+        try:
+            with self._lock, self._connection:
+                cursor = self._connection.execute(
+                    "INSERT INTO weather (city, lease_until) VALUES (?, ?) ON CONFLICT (city) DO UPDATE "
+                    "SET lease_until = excluded.lease_until WHERE weather.lease_until IS NULL OR weather.lease_until <= ?",
+                    (city_key, now + lease_seconds, now))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Error taking the weather lease of '{city_key}' in SQLite: {e}")
+            return True
+
+    def release_lease(self, city_key: str):
+        try:
+            with self._lock, self._connection:
+                self._connection.execute("UPDATE weather SET lease_until = NULL WHERE city = ?", (city_key,))
+        except sqlite3.Error as e:
+            print(f"Error releasing the weather lease of '{city_key}' in SQLite: {e}")
+
+
+def is_conditional_check_failure(error: Exception) -> bool:
+    """Returns whether a DynamoDB error is the failure of a write's condition, rather than of the call."""
+    return getattr(error, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+
+
+class DynamoDbWeatherCacheStore(WeatherCacheStore):
+    """A WeatherCacheStore backed by a DynamoDB table with 'city' as the Partition Key.
+
+        DynamoDB's TTL deletes expired items within a few days at most, so expiry is also checked on read.
+        A lease taken on a city without an entry creates an item without data, which expires with the lease.
+    """
+    def __init__(self, table_name: str):
+        """Binds the store to a DynamoDB table. boto3 is imported here, only when this backend is used."""
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        # Client errors are the service's answers, BotoCore errors the SDK's own (e.g. a connection failure)
+        self._errors = (ClientError, BotoCoreError)
+        self.table = aws_clients.get_dynamodb_table(table_name)
+
+    def get(self, city_key: str) -> Optional[SharedWeatherEntry]:
+        try:
+            item = self.table.get_item(Key={'city': city_key}, ConsistentRead=True).get('Item')
+        except self._errors as e:
+            print(f"Error reading weather of '{city_key}' from DynamoDB: {e}")
+            return None
+
+        if not item or 'data' not in item or time.time() >= float(item['expires_at']):
+            return None
+        return SharedWeatherEntry(item['data'], int(item['last_update_epoch']), float(item['soft_expires_at']),
+                                  float(item['expires_at']))
+
+    def put(self, city_key: str, entry: SharedWeatherEntry) -> bool:
+        try:
+            # DynamoDB numbers must be passed as Decimals, and TTL attributes must hold integer epoch seconds
+            self.table.put_item(
+                Item={'city': city_key, 'data': entry.data, 'last_update_epoch': entry.last_update_epoch,
+                      'soft_expires_at': Decimal(str(entry.soft_expires_at)), 'expires_at': int(entry.expires_at)},
+                ConditionExpression="attribute_not_exists(last_update_epoch) OR last_update_epoch <= :t",
+                ExpressionAttributeValues={':t': entry.last_update_epoch})
+            return True
+        except self._errors as e:
+            if not is_conditional_check_failure(e):
+                print(f"Error writing weather of '{city_key}' to DynamoDB: {e}")
+            return False
+
+    def try_acquire_lease(self, city_key: str, lease_seconds: float = WEATHER_CACHE_LEASE_SECONDS) -> bool:
+        now = time.time()
+        try:
+            self.table.update_item(
+                Key={'city': city_key},
+                UpdateExpression="SET lease_until = :until, expires_at = if_not_exists(expires_at, :until_epoch)",
+                ConditionExpression="attribute_not_exists(lease_until) OR lease_until <= :now",
+                ExpressionAttributeValues={':until': Decimal(str(now + lease_seconds)), ':now': Decimal(str(now)),
+                                           ':until_epoch': int(now + lease_seconds) + 1})
+            return True
+        except self._errors as e:
+            if is_conditional_check_failure(e):
+                return False
+            print(f"Error taking the weather lease of '{city_key}' in DynamoDB: {e}")
+            return True
+
+    def release_lease(self, city_key: str):
+        try:
+            self.table.update_item(Key={'city': city_key}, UpdateExpression="REMOVE lease_until",
+                                   ConditionExpression="attribute_exists(city)")
+        except self._errors as e:
+            if not is_conditional_check_failure(e):
+                print(f"Error releasing the weather lease of '{city_key}' in DynamoDB: {e}")
+
+
+def create_store_from_env() -> Optional[WeatherCacheStore]:
+    """Creates the shared weather cache store selected by the WEATHER_CACHE_BACKEND environment variable.
+
+        Raises:
+            ValueError: If WEATHER_CACHE_BACKEND holds an unknown backend name.
+    """
+    backend = os.getenv('WEATHER_CACHE_BACKEND', 'none').lower()
+
+    if backend == 'none':
+        return None
+    elif backend == 'memory':
+        return MemoryWeatherCacheStore()
+    elif backend == 'sqlite':
+        return SqliteWeatherCacheStore(os.getenv('WEATHER_CACHE_SQLITE_PATH',
+                                                 os.path.join(tempfile.gettempdir(), "weather_cache.sqlite3")))
+    elif backend == 'dynamodb':
+        return DynamoDbWeatherCacheStore(os.getenv('WEATHER_CACHE_TABLE', DEFAULT_TABLE_NAME))
+    else:
+        raise ValueError(f"Unknown WEATHER_CACHE_BACKEND: {backend!r}")
+
+
+_store: Optional[WeatherCacheStore] = None
+_store_created = False
+_store_lock = threading.Lock()
+
+
+def get_weather_cache_store() -> Optional[WeatherCacheStore]:
+    """Returns the process-wide shared weather cache store, creating it from the environment on first use.
+
+        Returns:
+            The store, or None when no shared tier is configured.
+    """
+    global _store, _store_created
+    if not _store_created:
+        with _store_lock:
+            if not _store_created:
+                _store = create_store_from_env()
+                _store_created = True
+    return _store